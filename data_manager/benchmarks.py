@@ -0,0 +1,555 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmarks for the data_manager load and write paths.
+
+Run against real job listings, e.g.
+
+    python -m data_manager.benchmarks loaders "1234 - DETAILED TICKET LISTING (1-7-26).xlsx"
+    python -m data_manager.benchmarks inserts "1234 - DETAILED TICKET LISTING (1-7-26).xlsx"
+    python -m data_manager.benchmarks data-rows "1234 - DETAILED TICKET LISTING (1-7-26).xlsx"
+    python -m data_manager.benchmarks table-view --rows 50000
+    python -m data_manager.benchmarks e-tickets "S:\\Jobs\\1234" --materials 3 30
+    python -m data_manager.benchmarks e-ticket-pdfs "S:\\Jobs\\1234" --backends native excel
+    python -m data_manager.benchmarks bid-index --folders 5000
+    python -m data_manager.benchmarks ticket-scans --files 10000
+    python -m data_manager.benchmarks job-packet "\\\\FRC2\\...\\Bids\\1234 - Job\\TICKETS" 1234
+"""
+import os
+import sys
+import time
+import shutil
+import tempfile
+import tracemalloc
+import argparse
+from pathlib import Path
+
+
+def measure(func, *args, **kwargs):
+    """
+    Time one call of func, then repeat it under tracemalloc for peak memory.
+    Returns (seconds, peak_bytes, result).
+    """
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    func(*args, **kwargs)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return elapsed, peak, result
+
+
+def print_row(label, elapsed, peak=None, detail=""):
+    memory = f"{peak / 2**20:8.1f} MiB" if peak is not None else " " * 12
+    print(f"{label:<24} {elapsed * 1000:10.1f} ms  {memory}  {detail}")
+
+
+def benchmark_loaders(paths):
+    """Compare the pandas full-sheet read with the streaming read-only loader."""
+    from data_manager.excel_manager import ExcelManager
+
+    for path in paths:
+        manager = ExcelManager(path)
+        print(path)
+
+        for label, loader in (
+            ("pandas read_excel", manager._read_dataframe_pandas),
+            ("openpyxl streaming", manager._read_dataframe_streaming),
+        ):
+            elapsed, peak, df = measure(loader, path)
+            print_row(label, elapsed, peak, f"{df.shape[0]} rows x {df.shape[1]} cols")
+
+
+def sample_tickets(manager, count, materials_per_ticket=3):
+    """Synthetic tickets using the labor rates and materials of a loaded listing."""
+    material_names = list(manager.material_map.keys()) or ["NOT A MATERIAL"]
+    tickets = []
+
+    for number in range(count):
+        materials = [
+            {
+                "material": material_names[(number + offset) % len(material_names)],
+                "quantity": str(offset + 1),
+                "units": "EA",
+                "sell price": "0",
+            }
+            for offset in range(materials_per_ticket)
+        ]
+
+        tickets.append({
+            "Job Number": manager.job_number,
+            "Job Name": manager.job_name,
+            "Job Address": manager.job_address,
+            "Ticket Number": f"B{number:05d}",
+            "Date": "01/15/26",
+            "Signature": "YES",
+            "Type": "REGULAR",
+            "Installers": "Benchmark",
+            "Work Location": "Benchmark",
+            "Description": "Benchmark ticket",
+            "Labor": {
+                category: {"hours": "2", "rate": rate["rate"]}
+                for category, rate in manager.labor_map.items()
+            },
+            "Materials": materials,
+        })
+
+    return tickets
+
+
+def benchmark_inserts(path, counts=(1, 10, 100)):
+    """Ticket throughput of one insert_ticket per ticket against insert_tickets."""
+    from data_manager.excel_manager import ExcelManager
+
+    print(path)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        work_path = Path(temp_dir) / Path(path).name
+
+        for count in counts:
+            for label, batched in (("insert_ticket loop", False), ("insert_tickets", True)):
+                shutil.copy(path, work_path)
+                manager = ExcelManager(str(work_path))
+                manager.load()
+                tickets = sample_tickets(manager, count)
+
+                start = time.perf_counter()
+                if batched:
+                    manager.insert_tickets(tickets)
+                else:
+                    for ticket in tickets:
+                        manager.insert_ticket(ticket)
+                elapsed = time.perf_counter() - start
+
+                print_row(f"{label} x{count}", elapsed, detail=f"{count / elapsed:8.1f} tickets/s")
+
+
+def scan_data_rows(df, first_row):
+    """The old row-at-a-time scan, kept as the baseline for get_data_rows."""
+    count = 0
+    for index in range(first_row, len(df)):
+        if not any(bool(cell) for cell in df.iloc[index].fillna(0)):
+            break
+        count += 1
+    return count
+
+
+def benchmark_data_rows(path, row_count=10000):
+    """Data-row boundary detection on the listing's tickets repeated to row_count rows."""
+    import warnings
+    import pandas as pd
+    from data_manager.excel_manager import ExcelManager
+
+    manager = ExcelManager(path)
+    manager.load()
+
+    df = manager.dataframe
+    first_row = manager.header_row + 1
+    ticket_rows = df.iloc[manager.data_rows]
+
+    if ticket_rows.empty:
+        print(f"{path} has no ticket rows to repeat")
+        return
+
+    repeats = -(-row_count // len(ticket_rows))
+    body = pd.concat([ticket_rows] * repeats).iloc[:row_count]
+    trailing = pd.DataFrame(index=range(10), columns=df.columns)
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", FutureWarning)
+        manager.dataframe = pd.concat([df.iloc[:first_row], body, trailing], ignore_index=True)
+
+    print(f"{path} ({row_count} ticket rows)")
+
+    elapsed, peak, rows = measure(manager.get_data_rows)
+    print_row("get_data_rows", elapsed, peak, f"{len(rows)} rows")
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", FutureWarning)
+        elapsed, peak, count = measure(scan_data_rows, manager.dataframe, first_row)
+    print_row("row-by-row scan", elapsed, peak, f"{count} rows")
+
+
+def synthetic_listing(row_count):
+    """A ticket_listing shaped frame with row_count random tickets."""
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(0)
+    dates = pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 730, row_count), unit="D")
+
+    labor_sell = rng.uniform(0, 5000, row_count).round(2)
+    material_sell = rng.uniform(0, 3000, row_count).round(2)
+
+    df = pd.DataFrame({
+        "Date": dates.strftime("%m/%d/%Y"),
+        "Signature": rng.choice(["YES", "NO"], row_count),
+        "Type\n(Regular, Extra)": rng.choice(["REGULAR", "EXTRA"], row_count),
+        "Description": [f"Ticket description {number}" for number in range(row_count)],
+        "Labor Sell": labor_sell,
+        "Labor Cost": (labor_sell * 0.7).round(2),
+        "Material Sell": material_sell,
+        "Material Cost": (material_sell * 0.7).round(2),
+    })
+    df["Total Sell"] = df["Labor Sell"] + df["Material Sell"]
+    df["Total Cost"] = df["Labor Cost"] + df["Material Cost"]
+    df.index = pd.Index([f"{number:06d}" for number in range(row_count)], name="Ticket #")
+
+    return df
+
+
+def benchmark_table_view(row_count=50000, scroll_steps=200):
+    """Scripted scrolling, sorting and filtering of the Ticket Listings table."""
+    from qtpy.QtCore import Qt
+    from qtpy.QtWidgets import QApplication
+    from qt6_app import FRCTicketGUI
+
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    window = FRCTicketGUI()
+    table = window.ticket_listing_table
+    df = synthetic_listing(row_count)
+
+    print(f"Ticket Listings table ({row_count} rows)")
+
+    start = time.perf_counter()
+    window.populate_table(table, df, currency_cols=list(df.columns[4:]), index_labels=list(df.index))
+    window.tabs.setEnabled(True)
+    window.show()
+    app.processEvents()
+    print_row("populate + first paint", time.perf_counter() - start)
+
+    def scroll():
+        bar = table.verticalScrollBar()
+        frame_times = []
+
+        for step in range(scroll_steps + 1):
+            start = time.perf_counter()
+            bar.setValue(bar.maximum() * step // scroll_steps)
+            table.viewport().repaint()
+            app.processEvents()
+            frame_times.append(time.perf_counter() - start)
+
+        return frame_times
+
+    frame_times = scroll()
+    print_row("scroll", sum(frame_times), detail=f"{max(frame_times) * 1000:.1f} ms worst of {len(frame_times)} frames")
+
+    for column_name in ("Total Sell", "Date", "Description"):
+        column = list(df.columns).index(column_name)
+        start = time.perf_counter()
+        table.sortByColumn(column, Qt.DescendingOrder)
+        app.processEvents()
+        print_row(f"sort {column_name}", time.perf_counter() - start)
+
+    frame_times = scroll()
+    print_row("scroll sorted", sum(frame_times), detail=f"{max(frame_times) * 1000:.1f} ms worst of {len(frame_times)} frames")
+
+    start = time.perf_counter()
+    window.ticket_listing_proxy.set_filters(ticket_type="EXTRA", signature="YES", date_from="2025-01-01")
+    app.processEvents()
+    print_row("filter", time.perf_counter() - start, detail=f"{window.ticket_listing_proxy.rowCount()} rows shown")
+
+    window.close()
+
+
+def sample_e_ticket(number, material_count):
+    """An AddTicketDialog style ticket with every labor category and material_count materials."""
+    return {
+        "Job Number": "000000",
+        "Job Name": "Benchmark Job",
+        "Ticket Number": f"B{number:05d}",
+        "Job Address": "Benchmark",
+        "Date": "01/15/26",
+        "Signature": "YES",
+        "Type": "REGULAR",
+        "Installers": "Benchmark",
+        "Work Location": "Benchmark",
+        "Description": "Benchmark ticket",
+        "Labor": {
+            category: {"hours": "2", "rate": "100"}
+            for category in ("RT", "OT", "DT", "OT DIFF", "DT DIFF")
+        },
+        "Materials": [
+            {"material": f"BENCHMARK MATERIAL {index}", "quantity": "1", "units": "EA", "sell price": "10"}
+            for index in range(material_count)
+        ],
+    }
+
+
+def benchmark_e_tickets(folder, material_counts=(3, 30), ticket_count=20):
+    """Per-ticket e-ticket generation, parsing the template every time against the cached copy."""
+    from data_manager.e_ticket_creator import ETicketCreator, TEMPLATE_NAME
+
+    template = Path(folder) / TEMPLATE_NAME
+    print(template)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        shutil.copy(template, Path(temp_dir) / TEMPLATE_NAME)
+
+        for material_count in material_counts:
+            for label, cached in (("parse each", False), ("cached", True)):
+                ETicketCreator._template_cache.clear()
+
+                start = time.perf_counter()
+                for number in range(ticket_count):
+                    if not cached:
+                        ETicketCreator._template_cache.clear()
+                    ETicketCreator(temp_dir, sample_e_ticket(number, material_count)).load_ticket()
+                elapsed = time.perf_counter() - start
+
+                print_row(f"{label} ({material_count} mat)", elapsed / ticket_count,
+                          detail=f"{ticket_count / elapsed:8.1f} tickets/s")
+
+
+def benchmark_e_ticket_pdfs(folder, backends=("native",), material_counts=(3, 30), ticket_count=10):
+    """Per-ticket PDF export of e-ticket workbooks through each excel_to_pdf backend."""
+    from data_manager.e_ticket_creator import ETicketCreator, TEMPLATE_NAME
+    from data_manager.pdf_creator import excel_to_pdf, e_ticket_to_pdf
+
+    template = Path(folder) / TEMPLATE_NAME
+    print(template)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        shutil.copy(template, Path(temp_dir) / TEMPLATE_NAME)
+
+        for material_count in material_counts:
+            tickets = [sample_e_ticket(number, material_count) for number in range(ticket_count)]
+            workbooks = [ETicketCreator(temp_dir, ticket).load_ticket() for ticket in tickets]
+
+            for backend in backends:
+                start = time.perf_counter()
+                for workbook in workbooks:
+                    excel_to_pdf(workbook, backend=backend)
+                elapsed = time.perf_counter() - start
+
+                print_row(f"{backend} ({material_count} mat)", elapsed / ticket_count,
+                          detail=f"{ticket_count / elapsed:8.1f} tickets/s")
+
+            start = time.perf_counter()
+            for ticket in tickets:
+                e_ticket_to_pdf(temp_dir, ticket, Path(temp_dir) / f"{ticket['Ticket Number']}.pdf")
+            elapsed = time.perf_counter() - start
+
+            print_row(f"from ticket ({material_count} mat)", elapsed / ticket_count,
+                      detail=f"{ticket_count / elapsed:8.1f} tickets/s, no workbook written")
+
+
+def glob_bid_folder(root, job_number):
+    """find_bid_folder before the index: up to two globs of the bids share per lookup."""
+    matches = list(root.glob(f"{job_number} -*"))
+    if not matches:
+        matches = list(root.glob(f"{job_number}-*"))
+    if not matches:
+        raise FileNotFoundError(job_number)
+    return matches[0]
+
+
+def benchmark_bid_index(folder_count=5000, lookups=200, root=None):
+    """
+    Bid folder lookups by globbing against BidFolderIndex. Without root, a
+    stand-in bids folder with folder_count job folders is made in a temp dir.
+    """
+    from data_manager.bid_index import BidFolderIndex
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        if root is None:
+            root = Path(temp_dir) / "Bids"
+            root.mkdir()
+            for number in range(folder_count):
+                separator = "-" if number % 10 == 0 else " - "
+                (root / f"{number:06d}{separator}Benchmark Job {number}").mkdir()
+
+        root = Path(root)
+        job_numbers = sorted({name.split("-", 1)[0].strip() for name in os.listdir(root) if "-" in name})
+        print(f"{root}: {len(job_numbers)} job folders")
+
+        sample = [job_numbers[(index * 7919) % len(job_numbers)] for index in range(lookups)]
+
+        start = time.perf_counter()
+        for job_number in sample:
+            glob_bid_folder(root, job_number)
+        elapsed = time.perf_counter() - start
+        print_row("glob", elapsed / lookups, detail=f"{lookups} lookups")
+
+        index_dir = Path(temp_dir) / "index"
+
+        index = BidFolderIndex(root, index_dir=index_dir)
+        elapsed, _, _ = measure(index.scan)
+        print_row("index scan", elapsed)
+
+        scans = index.scans
+        start = time.perf_counter()
+        for job_number in sample:
+            index.find(job_number)
+        elapsed = time.perf_counter() - start
+        print_row("index lookup", elapsed / lookups, detail=f"{lookups} lookups, {index.scans - scans} scans")
+
+        start = time.perf_counter()
+        reloaded = BidFolderIndex(root, index_dir=index_dir)
+        reloaded.find(sample[0])
+        elapsed = time.perf_counter() - start
+        print_row("index reload", elapsed, detail=f"from disk, {reloaded.scans} scans")
+
+        mismatched = [job_number for job_number in sample
+                      if index.find(job_number) != glob_bid_folder(root, job_number)]
+        if mismatched:
+            print(f"Index and glob disagree on {len(mismatched)} jobs, e.g. {mismatched[0]}")
+
+
+def glob_ticket_file(job_folder, ticket_number):
+    """find_ticket_file before the index: up to two globs of the job folder per lookup."""
+    for pattern in (f"TICKET {ticket_number} SIGNED*.pdf", f"TICKET {ticket_number} UNSIGNED*.pdf"):
+        matches = list(job_folder.glob(pattern))
+        if matches:
+            return matches[0]
+    raise FileNotFoundError(ticket_number)
+
+
+def benchmark_ticket_scans(file_count=10000, lookups=200):
+    """Scanned ticket lookups in a stand-in job folder, globbing against TicketScanIndex."""
+    from data_manager.ticket_scan_index import TicketScanIndex
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        job_folder = Path(temp_dir)
+        for number in range(file_count):
+            status = "UNSIGNED" if number % 4 == 0 else "SIGNED"
+            (job_folder / f"TICKET {number:06d} {status} 01-15-26.pdf").touch()
+
+        sample = [f"{(index * 7919) % file_count:06d}" for index in range(lookups)]
+        print(f"{job_folder}: {file_count} scans")
+
+        start = time.perf_counter()
+        for ticket_number in sample:
+            glob_ticket_file(job_folder, ticket_number)
+        elapsed = time.perf_counter() - start
+        print_row("glob", elapsed / lookups, detail=f"{lookups} lookups")
+
+        index = TicketScanIndex(job_folder)
+        elapsed, _, _ = measure(index.refresh)
+        print_row("index listing", elapsed)
+
+        start = time.perf_counter()
+        for ticket_number in sample:
+            index.find(ticket_number)
+        elapsed = time.perf_counter() - start
+        print_row("index lookup", elapsed / lookups, detail=f"{lookups} lookups, {index.scans} listings")
+
+        (job_folder / f"TICKET {file_count:06d} SIGNED 01-16-26.pdf").touch()
+        start = time.perf_counter()
+        index.find(f"{file_count:06d}")
+        elapsed = time.perf_counter() - start
+        print_row("index after new scan", elapsed, detail=f"{index.scans} listings")
+
+        mismatched = [ticket_number for ticket_number in sample
+                      if index.find(ticket_number) != glob_ticket_file(job_folder, ticket_number)]
+        if mismatched:
+            print(f"Index and glob disagree on {len(mismatched)} tickets, e.g. {mismatched[0]}")
+
+
+def benchmark_job_packet(tickets_folder, job_number):
+    """A job's filed tickets merged by PdfWriter.append against the streaming job packet."""
+    from PyPDF2 import PdfWriter
+    from data_manager.job_packet import build_job_packet, find_filed_tickets
+
+    tickets = find_filed_tickets(tickets_folder, job_number)
+    print(f"{tickets_folder}: {len(tickets)} tickets")
+
+    def pdf_writer(output_path):
+        writer = PdfWriter()
+        for date, ticket_number, path in tickets:
+            writer.append(str(path), outline_item=f"Ticket {ticket_number}")
+        with open(output_path, "wb") as f:
+            writer.write(f)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for label, build in (
+            ("PdfWriter.append", pdf_writer),
+            ("job packet", lambda output_path: build_job_packet(job_number, output_path,
+                                                                 tickets_folder=tickets_folder)),
+        ):
+            output_path = Path(temp_dir) / "packet.pdf"
+            elapsed, peak, _ = measure(build, output_path)
+            print_row(label, elapsed, peak, f"{output_path.stat().st_size / 2**20:.1f} MiB")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="FRC data_manager benchmarks")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    loaders = subparsers.add_parser("loaders", help="Workbook load time and peak memory")
+    loaders.add_argument("paths", nargs="+")
+
+    inserts = subparsers.add_parser("inserts", help="Ticket insert throughput")
+    inserts.add_argument("path")
+    inserts.add_argument("--counts", type=int, nargs="+", default=[1, 10, 100])
+
+    data_rows = subparsers.add_parser("data-rows", help="Ticket row boundary detection")
+    data_rows.add_argument("path")
+    data_rows.add_argument("--rows", type=int, default=10000)
+
+    table_view = subparsers.add_parser("table-view", help="Ticket table scroll, sort and filter (needs a display, "
+                                                          "or QT_QPA_PLATFORM=offscreen)")
+    table_view.add_argument("--rows", type=int, default=50000)
+
+    e_tickets = subparsers.add_parser("e-tickets", help="E-ticket workbook generation, given the folder "
+                                                        "holding the e-ticket template")
+    e_tickets.add_argument("folder")
+    e_tickets.add_argument("--materials", type=int, nargs="+", default=[3, 30])
+    e_tickets.add_argument("--tickets", type=int, default=20)
+
+    e_ticket_pdfs = subparsers.add_parser("e-ticket-pdfs", help="E-ticket PDF export per backend, given the folder "
+                                                                "holding the e-ticket template")
+    e_ticket_pdfs.add_argument("folder")
+    e_ticket_pdfs.add_argument("--backends", nargs="+", default=["native"])
+    e_ticket_pdfs.add_argument("--materials", type=int, nargs="+", default=[3, 30])
+    e_ticket_pdfs.add_argument("--tickets", type=int, default=10)
+
+    bid_index = subparsers.add_parser("bid-index", help="Bid folder lookups, against a stand-in bids folder "
+                                                        "unless --root is given")
+    bid_index.add_argument("--folders", type=int, default=5000)
+    bid_index.add_argument("--lookups", type=int, default=200)
+    bid_index.add_argument("--root", default=None)
+
+    ticket_scans = subparsers.add_parser("ticket-scans", help="Scanned ticket lookups, against a stand-in "
+                                                              "job folder")
+    ticket_scans.add_argument("--files", type=int, default=10000)
+    ticket_scans.add_argument("--lookups", type=int, default=200)
+
+    job_packet = subparsers.add_parser("job-packet", help="Job packet merge, given a TICKETS folder and job number")
+    job_packet.add_argument("tickets_folder")
+    job_packet.add_argument("job_number")
+
+    args = parser.parse_args(argv)
+
+    if args.benchmark == "loaders":
+        benchmark_loaders(args.paths)
+
+    elif args.benchmark == "inserts":
+        benchmark_inserts(args.path, args.counts)
+
+    elif args.benchmark == "data-rows":
+        benchmark_data_rows(args.path, args.rows)
+
+    elif args.benchmark == "table-view":
+        benchmark_table_view(args.rows)
+
+    elif args.benchmark == "e-tickets":
+        benchmark_e_tickets(args.folder, args.materials, args.tickets)
+
+    elif args.benchmark == "e-ticket-pdfs":
+        benchmark_e_ticket_pdfs(args.folder, args.backends, args.materials, args.tickets)
+
+    elif args.benchmark == "bid-index":
+        benchmark_bid_index(args.folders, args.lookups, args.root)
+
+    elif args.benchmark == "ticket-scans":
+        benchmark_ticket_scans(args.files, args.lookups)
+
+    elif args.benchmark == "job-packet":
+        benchmark_job_packet(args.tickets_folder, args.job_number)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+"""
+Index of the bids share: job number -> bid folder.
+
+Listing the share over the VPN takes seconds, so the index is built from a
+single directory scan and kept on local disk between runs. Once it is older
+than its TTL it is rescanned in the background while lookups keep using the
+old copy. A job number it doesn't know rescans straight away, since the bid
+folder may have been created after the last scan.
+"""
+import os
+import json
+import time
+import hashlib
+import threading
+from pathlib import Path
+
+BIDS_FOLDER = Path(r"\\FRC2\otherapps\Doc_Arch\Project Folders\0 Structure\Bids")
+
+# Bump when the saved index changes shape so old files are ignored
+INDEX_VERSION = 1
+
+DEFAULT_TTL = 15 * 60
+
+# A miss this soon after the last scan is reported without scanning again
+MIN_RESCAN_INTERVAL = 30
+
+
+def default_index_dir():
+    base = os.environ.get("LOCALAPPDATA") or Path.home() / ".cache"
+    return Path(base) / "FRC_GUI" / "bid_index"
+
+
+def job_key(name):
+    """Job number of a folder named "<job> - <name>" or "<job>-<name>", else None."""
+    if "-" not in name:
+        return None
+
+    job_number = name.split("-", 1)[0].strip()
+    return job_number or None
+
+
+class BidFolderIndex:
+    def __init__(self, root=BIDS_FOLDER, index_dir=None, ttl=DEFAULT_TTL):
+        self.root = Path(root)
+        self.ttl = ttl
+
+        key = hashlib.sha1(str(self.root).lower().encode("utf-8")).hexdigest()
+        self.index_path = Path(index_dir or default_index_dir()) / f"{key}.json"
+
+        self.folders = {}
+        self.scanned_at = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.scans = 0
+
+        self._lock = threading.Lock()
+        self._scan_lock = threading.Lock()
+        self._refresh_thread = None
+
+        self._load()
+
+    def find(self, job_number, rescan=False):
+        """
+        Bid folder for job_number. Doesn't touch the share unless the job is
+        unknown or rescan is set, e.g. because the folder it returned before
+        has since been renamed.
+        """
+        job_number = str(job_number).strip()
+
+        if rescan:
+            self.scan()
+
+        elif self.is_stale():
+            self.refresh_async()
+
+        name = self.folders.get(job_number)
+
+        if name is None:
+            self.misses += 1
+            self.scan(if_older_than=MIN_RESCAN_INTERVAL)
+            name = self.folders.get(job_number)
+
+        else:
+            self.hits += 1
+
+        if name is None:
+            raise FileNotFoundError(
+                f"'{job_number}' not found in {self.root}"
+            )
+
+        return self.root / name
+
+    def is_stale(self):
+        return time.time() - self.scanned_at >= self.ttl
+
+    def scan(self, if_older_than=None):
+        """
+        List the share once and replace the index. With if_older_than, skip
+        the scan when the index is at least that fresh, which is also the
+        case when another thread finished a scan while this one waited.
+        Returns True if it scanned.
+        """
+        with self._scan_lock:
+            if if_older_than is not None and time.time() - self.scanned_at < if_older_than:
+                return False
+
+            start = time.perf_counter()
+            candidates = {}
+
+            with os.scandir(self.root) as entries:
+                for entry in entries:
+                    job_number = job_key(entry.name)
+                    if job_number and entry.is_dir():
+                        candidates.setdefault(job_number, []).append(entry.name)
+
+            # Same preference as the old globs: "<job> -*" before "<job>-*"
+            self.folders = {
+                job_number: min(names, key=lambda name: (not name.startswith(job_number + " -"), name))
+                for job_number, names in candidates.items()
+            }
+            self.scanned_at = time.time()
+            self.scans += 1
+
+            print(f"Indexed {len(self.folders)} bid folders in {time.perf_counter() - start:.1f} s")
+
+            self._save()
+            return True
+
+    def refresh_async(self):
+        """Rescan in a background thread, unless one is already running."""
+        with self._lock:
+            if self._refresh_thread is not None and self._refresh_thread.is_alive():
+                return
+
+            self._refresh_thread = threading.Thread(target=self._refresh, name="bid-index", daemon=True)
+            self._refresh_thread.start()
+
+    def wait(self, timeout=None):
+        """Wait for a background refresh to finish."""
+        thread = self._refresh_thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def _refresh(self):
+        try:
+            self.scan(if_older_than=self.ttl)
+        except OSError as e:
+            print(f"Could not refresh bid folder index: {e}")
+
+    def _load(self):
+        try:
+            with open(self.index_path, encoding="utf-8") as f:
+                saved = json.load(f)
+
+        except FileNotFoundError:
+            return
+
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable bid folder index {self.index_path.name}: {e}")
+            return
+
+        if saved.get("version") != INDEX_VERSION or saved.get("root") != str(self.root):
+            return
+
+        self.folders = saved["folders"]
+        self.scanned_at = saved["scanned_at"]
+
+    def _save(self):
+        temp_path = self.index_path.with_suffix(".tmp")
+
+        try:
+            self.index_path.parent.mkdir(parents=True, exist_ok=True)
+
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump({
+                    "version": INDEX_VERSION,
+                    "root": str(self.root),
+                    "scanned_at": self.scanned_at,
+                    "folders": self.folders,
+                }, f)
+
+            os.replace(temp_path, self.index_path)
+
+        except OSError as e:
+            print(f"Could not save bid folder index: {e}")
+            temp_path.unlink(missing_ok=True)
+
+
+_default_index = None
+_default_index_lock = threading.Lock()
+
+
+def default_index():
+    """The shared index of BIDS_FOLDER, loaded on first use."""
+    global _default_index
+
+    with _default_index_lock:
+        if _default_index is None:
+            _default_index = BidFolderIndex()
+
+        return _default_index
@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+"""
+E-ticket workbooks for many tickets at once, written in parallel.
+
+    python -m data_manager.e_ticket_batch "S:\\Jobs\\1234" tickets.json --workers 4
+
+tickets.json holds a list of tickets shaped like the ones AddTicketDialog
+builds. Every workbook is written into the folder holding the e-ticket
+template, as "<Job Number> - <Ticket Number>.xlsx".
+"""
+import os
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# Each worker holds its own copy of the template, so more workers than this
+# mostly adds memory and disk contention
+DEFAULT_MAX_WORKERS = 4
+
+
+def e_ticket_name(ticket):
+    return f"{ticket['Job Number']} - {ticket['Ticket Number']}.xlsx"
+
+
+def create_e_ticket(folder, ticket):
+    """
+    Write one ticket's e-ticket workbook. Runs in a worker process, so it
+    only returns plain data.
+    """
+    from data_manager.e_ticket_creator import ETicketCreator
+
+    start = time.perf_counter()
+
+    ETicketCreator(str(folder), ticket).load_ticket()
+
+    return {
+        "ticket_number": ticket["Ticket Number"],
+        "path": str(Path(folder) / e_ticket_name(ticket)),
+        "seconds": time.perf_counter() - start,
+        "error": None,
+    }
+
+
+def _failed(ticket, error):
+    return {
+        "ticket_number": ticket.get("Ticket Number"),
+        "path": None,
+        "seconds": 0.0,
+        "error": error,
+    }
+
+
+def create_e_tickets(folder, tickets, max_workers=None, progress=None):
+    """
+    Write an e-ticket workbook for every ticket, using up to max_workers
+    processes. Returns one result per ticket in the order given, whatever
+    order they finish in. A ticket that fails has its error set instead.
+
+    progress(done, total, result) is called as each ticket finishes, and
+    for tickets turned away before the batch starts.
+    """
+    from data_manager.e_ticket_creator import TEMPLATE_NAME
+
+    template = Path(folder) / TEMPLATE_NAME
+    if not template.exists():
+        raise FileNotFoundError(f"File not found: {template}")
+
+    tickets = list(tickets)
+    results = [None] * len(tickets)
+    done = 0
+
+    def finished(index, result):
+        nonlocal done
+        results[index] = result
+        done += 1
+        if progress:
+            progress(done, len(tickets), result)
+
+    pending = []
+    names = set()
+
+    for index, ticket in enumerate(tickets):
+        try:
+            name = e_ticket_name(ticket)
+        except KeyError as e:
+            finished(index, _failed(ticket, f"Missing {e}"))
+            continue
+
+        # Two workers writing the same file would race, so only the first
+        # wins. Windows file names ignore case.
+        if name.casefold() in names:
+            finished(index, _failed(ticket, f"Duplicate of an earlier ticket: {name}"))
+        else:
+            names.add(name.casefold())
+            pending.append(index)
+
+    max_workers = max_workers or min(os.cpu_count() or 1, DEFAULT_MAX_WORKERS)
+    max_workers = min(max_workers, max(len(pending), 1))
+
+    if max_workers == 1:
+        for index in pending:
+            try:
+                result = create_e_ticket(folder, tickets[index])
+            except Exception as e:
+                result = _failed(tickets[index], f"{type(e).__name__}: {e}")
+            finished(index, result)
+
+        return results
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(create_e_ticket, folder, tickets[index]): index for index in pending}
+
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                result = _failed(tickets[index], f"{type(e).__name__}: {e}")
+            finished(index, result)
+
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write e-ticket workbooks for a list of tickets")
+    parser.add_argument("folder", help="Folder holding the e-ticket template")
+    parser.add_argument("tickets", help="JSON file with a list of tickets")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    with open(args.tickets, encoding="utf-8") as f:
+        tickets = json.load(f)
+
+    print(f"Writing {len(tickets)} e-tickets to {args.folder}")
+
+    def report(done, total, result):
+        status = result["error"] or f"{result['seconds']:.2f} s"
+        print(f"  [{done}/{total}] {result['ticket_number']}: {status}")
+
+    start = time.perf_counter()
+    results = create_e_tickets(args.folder, tickets, max_workers=args.workers, progress=report)
+    elapsed = time.perf_counter() - start
+
+    failed = [result for result in results if result["error"]]
+    written = len(results) - len(failed)
+
+    print(f"{written} written, {len(failed)} failed in {elapsed:.1f} s "
+          f"({written / elapsed if elapsed else 0:.1f} tickets/s)")
+
+    for result in failed:
+        print(f"  {result['ticket_number']}: {result['error']}")
+
+    sys.exit(1 if failed else 0)
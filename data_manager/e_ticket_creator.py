@@ -4,44 +4,137 @@ Created on Sat Nov 22 12:04:44 2025
 
 @author: plopez
 """
+import pickle
 from pathlib import Path
 
+TEMPLATE_NAME = "E-ticket Replacement EDITABLE - PYTHON.xlsx"
+
+# The first labor line; further labor lines are inserted below it
+LABOR_ROW = 17
+
+# Merged ranges don't move when rows are inserted, so those from this row
+# down are removed up front and _format_footer merges the footer again.
+FOOTER_START_ROW = 32
+
+# Labels the ticket sections are found by, and the column each sits in
+TEMPLATE_ANCHORS = {
+    "Material Used:": "A",
+    "Total Hours": "G",
+    "Total Material": "G",
+    "Total Ticket": "G",
+    "Work Status": "A",
+    "Authorization Status": "A",
+    "Field Supervisor": "A",
+    "Project Manager": "A",
+}
+
+
+class ETicketTemplate:
+    """
+    The e-ticket template parsed once, with its footer unmerged and anchor
+    rows found. clone() gives each ticket its own copy of the workbook.
+    """
+    def __init__(self, path, signature, workbook, anchor_rows):
+        self.path = path
+        self.signature = signature
+        self.anchor_rows = anchor_rows
+        self._pickled = pickle.dumps(workbook, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def clone(self):
+        # Unpickling is several times faster than load_workbook or deepcopy
+        wb = pickle.loads(self._pickled)
+
+        # The row/column dimension holders are defaultdicts, which lose their
+        # factory and worksheet link when pickled
+        for ws in wb.worksheets:
+            for holder, factory in ((ws.row_dimensions, ws._add_row),
+                                    (ws.column_dimensions, ws._add_column)):
+                holder.worksheet = ws
+                holder.default_factory = factory
+
+        return wb
+
+
 class ETicketCreator:
+    # Resolved template path -> ETicketTemplate, shared by every creator in the process
+    _template_cache = {}
+
     def __init__(self, file_path=None, incoming_ticket=None):
         self.file_path = file_path;
         self.workbook = None
         self.incoming_ticket = incoming_ticket;
         
-    def load_ticket(self):
-        from openpyxl import load_workbook
+    def load_ticket(self, output_folder=None):
+        """Fill in the e-ticket and save it to output_folder, by default the template's folder."""
+        wb = self.build_workbook()
+        
+        save_path =  Path(output_folder or self.file_path) / f"{self.incoming_ticket['Job Number']} - {self.incoming_ticket['Ticket Number']}.xlsx"
+        
+        wb.save(save_path)
         
+        return save_path
+        
+    def build_workbook(self):
+        """The filled-in e-ticket workbook, without saving it."""
         if not self.file_path:
             raise ValueError("No folder provided!")
             
-        path = Path(self.file_path) / "E-ticket Replacement EDITABLE - PYTHON.xlsx"
+        path = Path(self.file_path) / TEMPLATE_NAME
         if not path.exists():
             raise FileNotFoundError(f"File not found: {path}")
         
-        path = self._ensure_xlsx_copy(path)
-        wb = load_workbook(path)
+        template = self._load_template(path)
+        wb = template.clone()
         ws = wb.active
+
+        labor = self._active_labor()
+        materials = self.incoming_ticket["Materials"]
+
+        self.rows = self._layout_rows(ws, template.anchor_rows, len(labor), len(materials))
         
         self._insert_job_info(ws)
-        
-        self._unmerge_from_row(ws, start_row=32)
 
-        self._insert_labor(ws)
+        self._insert_labor(ws, labor)
         
-        self._insert_materials(ws)
+        self._insert_materials(ws, materials)
         
         self._calculate_ticket_total(ws)
         
         self._format_footer(ws)
         
-        save_path =  Path(self.file_path) / f"{self.incoming_ticket['Job Number']} - {self.incoming_ticket['Ticket Number']}.xlsx"
+        self.workbook = wb
         
-        wb.save(save_path)
+        return wb
         
+    def _load_template(self, path):
+        """
+        The parsed template at path, reused until the file's size or
+        modification time changes.
+        """
+        from openpyxl import load_workbook
+
+        path = path.resolve()
+        stat = path.stat()
+        signature = (stat.st_mtime_ns, stat.st_size)
+
+        template = self._template_cache.get(path)
+        if template is not None and template.signature == signature:
+            return template
+
+        wb = load_workbook(self._ensure_xlsx_copy(path))
+        ws = wb.active
+
+        self._unmerge_from_row(ws, start_row=FOOTER_START_ROW)
+
+        anchor_rows = {
+            label: self._find_material_row(ws, label, column)
+            for label, column in TEMPLATE_ANCHORS.items()
+        }
+
+        template = ETicketTemplate(path, signature, wb, anchor_rows)
+        self._template_cache[path] = template
+
+        return template
     
     def _ensure_xlsx_copy(self, path):
         """
@@ -90,7 +183,7 @@ class ETicketCreator:
         
         ws['B10']= self.incoming_ticket["Description"]
         
-    def _insert_labor(self, ws):
+    def _active_labor(self):
         labor_object = self.incoming_ticket["Labor"]
         
         category_map = {
@@ -116,35 +209,56 @@ class ETicketCreator:
                         "rate": rt_object["rate"]
                         }
                 }
-        
-        iterator = iter(active_labor)
-        first_key = next(iterator)
-        
-        # Write first labor entry into row 17
-        ws['B17'] = round(self._safe_float(active_labor[first_key]["hours"]), 1)
-        ws['C17'] = first_key
-        ws['F17'] = round(self._safe_float(active_labor[first_key]["rate"]),2)
-        ws['I17'] = "=B17*F17"
-        
-        # Insert Additional Labor Rows
-        current_row = 17
-        for key in iterator:
-           current_row += 1
-           ws.insert_rows(current_row)
-           
-           self._copy_and_insert_row(ws, 17, current_row)
-           
-           ws.merge_cells(start_row=current_row, end_row=current_row, 
-                          start_column=3, end_column=4)
-           
-           ws[f'B{current_row}'] = round(self._safe_float(active_labor[key]["hours"]), 1)
-           ws[f'C{current_row}'] = key
-           ws[f'F{current_row}'] = round(self._safe_float(active_labor[key]["rate"]),2)
-           ws[f'I{current_row}'] = f'=B{current_row}*F{current_row}'
-           
-        ws[f'I{current_row+2}'] = f'=SUM(I17:I{current_row})'
+            
+        return active_labor
+    
+    def _layout_rows(self, ws, anchor_rows, labor_count, material_count):
+        """
+        Make room for every labor and material line in one pass over the
+        sheet, and return where each anchor row ends up.
+        """
+        missing = [label for label, row in anchor_rows.items() if row is None]
+        if missing:
+            raise ValueError(f"E-ticket template is missing: {', '.join(missing)}")
+        
+        first_material_row = anchor_rows["Material Used:"] + 1
+        extra_labor = labor_count - 1
+        extra_materials = max(material_count - 1, 0)
+        
+        def shifted(row):
+            return (row
+                    + (extra_labor if row > LABOR_ROW else 0)
+                    + (extra_materials if row > first_material_row else 0))
+        
+        # Bottom up, so each cell moves onto a row that has already been
+        # vacated. Like insert_rows, merged ranges and row heights stay put.
+        for row, column in sorted(ws._cells, reverse=True):
+            offset = shifted(row) - row
+            if offset:
+                ws._move_cell(row, column, offset, 0)
+        
+        rows = {label: shifted(row) for label, row in anchor_rows.items()}
+        rows["First Material"] = shifted(first_material_row)
+        
+        return rows
+        
+    def _insert_labor(self, ws, active_labor):
+        # The first labor line uses the template's row 17, the rest copy it
+        for offset, (key, labor) in enumerate(active_labor.items()):
+            current_row = LABOR_ROW + offset
+            
+            if offset:
+                self._copy_and_insert_row(ws, LABOR_ROW, current_row)
+                
+                ws.merge_cells(start_row=current_row, end_row=current_row, 
+                               start_column=3, end_column=4)
+            
+            ws[f'B{current_row}'] = round(self._safe_float(labor["hours"]), 1)
+            ws[f'C{current_row}'] = key
+            ws[f'F{current_row}'] = round(self._safe_float(labor["rate"]), 2)
+            ws[f'I{current_row}'] = f'=B{current_row}*F{current_row}'
            
-        
+        ws[f'I{self.rows["Total Hours"]}'] = f'=SUM(I{LABOR_ROW}:I{current_row})'
         
     def _copy_and_insert_row(self, worksheet, src_row, dest_row, max_col=9):
         from copy import copy
@@ -156,46 +270,48 @@ class ETicketCreator:
             dest_cell.value = src_cell.value
             
             if src_cell.has_style:
-                dest_cell.font = copy(src_cell.font)
-                dest_cell.border = copy(src_cell.border)
-                dest_cell.fill = copy(src_cell.fill)
-                dest_cell.number_format = src_cell.number_format
-                dest_cell.protection = copy(src_cell.protection)
-                dest_cell.alignment = copy(src_cell.alignment)
+                # Share the source's font, border, fill etc. by index rather
+                # than copying each style object into the workbook again
+                dest_cell._style = copy(src_cell._style)
+                
+    def _merge_like_row(self, ws, src_row, dest_row, start_column, end_column):
+        """
+        Merge dest_row the way merge_cells already merged src_row. The
+        merged cells take src_row's finished styles, which skips
+        merge_cells re-deriving the same borders for every line.
+        """
+        from copy import copy
+        from openpyxl.cell.cell import MergedCell
+        from openpyxl.worksheet.merge import MergedCellRange
+        from openpyxl.utils import get_column_letter
+        
+        ws.merged_cells.add(MergedCellRange(
+            ws, f"{get_column_letter(start_column)}{dest_row}:{get_column_letter(end_column)}{dest_row}"))
+        
+        for col in range(start_column + 1, end_column + 1):
+            merged_cell = MergedCell(ws, row=dest_row, column=col)
+            merged_cell._style = copy(ws.cell(row=src_row, column=col)._style)
+            ws._cells[(dest_row, col)] = merged_cell
                 
-    def _insert_materials(self, ws):
-        material_object = self.incoming_ticket["Materials"]
+    def _insert_materials(self, ws, material_object):
+        total_material_row = self.rows["Total Material"]
         
         if not material_object:
-           total_material_row = self._find_material_row(ws, "Total Material", column="G")
            ws[f'I{total_material_row}'] = 0
            return
        
-        start_row = self._find_material_row(ws) + 1
+        start_row = self.rows["First Material"]
         
-        if start_row is None:
-            raise ValueError("Material starting row not found")
+        for offset, material in enumerate(material_object):
+            current_row = start_row + offset
             
-        # First Material Row
-        ws[f'B{start_row}'] = material_object[0]["quantity"]
-        ws[f'C{start_row}'] = material_object[0]["material"]
-        ws[f'F{start_row}'] = round(self._safe_float(material_object[0]["sell price"]), 2)
-        ws[f'G{start_row}'] = material_object[0]["units"]
-        ws[f'I{start_row}'] = f'=B{start_row} * F{start_row}'
-        
-        ws.row_dimensions[start_row].height = 25
-        
-        ws.merge_cells(start_row=start_row, end_row=start_row, 
-                       start_column=3, end_column=4)
-      
-        # Any Material After 1
-        current_row = start_row
-        
-        for material in material_object[1:]:
-            current_row += 1
-            ws.insert_rows(current_row)
-            
-            self._copy_and_insert_row(ws, start_row, current_row)
+            if offset:
+                self._copy_and_insert_row(ws, start_row, current_row)
+                self._merge_like_row(ws, start_row, current_row, 
+                                     start_column=3, end_column=4)
+            else:
+                ws.merge_cells(start_row=current_row, end_row=current_row, 
+                               start_column=3, end_column=4)
             
             ws[f'B{current_row}'] = material["quantity"]
             ws[f'C{current_row}'] = material["material"]
@@ -204,28 +320,19 @@ class ETicketCreator:
             ws[f'I{current_row}'] = f'=B{current_row} * F{current_row}'
             
             ws.row_dimensions[current_row].height = 25
-            
-            ws.merge_cells(start_row=current_row, end_row=current_row, 
-                           start_column=3, end_column=4)
-        
         
         # Create the material total summary
-        total_material_row = self._find_material_row(ws, "Total Material", column="G")
         ws[f'I{total_material_row}'] = f'=SUM(I{start_row}:I{current_row})'
         
-        
-        
     def _calculate_ticket_total(self, ws):
-        labor_total_row = self._find_material_row(ws, "Total Hours", column='G')
-        material_total_row = self._find_material_row(ws, "Total Material", column='G')
-        ticket_total_row = self._find_material_row(ws, "Total Ticket", column='G')
+        labor_total_row = self.rows["Total Hours"]
+        material_total_row = self.rows["Total Material"]
+        ticket_total_row = self.rows["Total Ticket"]
         
         formula = f'=I{labor_total_row}+I{material_total_row}'
         ws[f'I{ticket_total_row}'] = formula
         ws.row_dimensions[ticket_total_row].height = 15
         
-
-        
     def _find_material_row(self, ws, search_term="Material Used:", column="A"):
         for row in range(1,50):
             check_value = ws[f'{column}{row}'].value
@@ -237,7 +344,7 @@ class ETicketCreator:
     def _format_footer(self, ws):
         
         # Find the row you want to merge cells for
-        ws_row = self._find_material_row(ws, search_term="Work Status")
+        ws_row = self.rows["Work Status"]
         
         self._unmerge_row(ws, ws_row)
                 
@@ -252,7 +359,7 @@ class ETicketCreator:
         ws.row_dimensions[ws_row].height = 15
         
         # as Row
-        as_row = self._find_material_row(ws, search_term="Authorization Status")
+        as_row = self.rows["Authorization Status"]
         
         self._unmerge_row(ws, as_row)
                 
@@ -266,7 +373,7 @@ class ETicketCreator:
         ws.row_dimensions[as_row+2].height = 15
         
         # fs_row
-        fs_row = self._find_material_row(ws, search_term="Field Supervisor")
+        fs_row = self.rows["Field Supervisor"]
         
         for row in range(ws_row - 1, fs_row):
             ws.row_dimensions[row].height = 15
@@ -282,7 +389,7 @@ class ETicketCreator:
         ws.row_dimensions[fs_row].height = 25
        
         # pm_row
-        pm_row = self._find_material_row(ws, search_term="Project Manager")
+        pm_row = self.rows["Project Manager"]
         self._unmerge_row(ws, pm_row)
         ws.merge_cells(start_row=pm_row, end_row=pm_row, 
                        start_column=1, end_column=2)
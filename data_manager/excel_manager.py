@@ -1,11 +1,32 @@
+import threading
+import numpy as np
 import pandas as pd
 from pathlib import Path
 from openpyxl import load_workbook
+from openpyxl.cell.cell import ERROR_CODES
+from data_manager.xlsx_patch import append_rows, UnsupportedSheetLayout
+from data_manager import sheet_layout
+from data_manager.sheet_layout import load_layout, sheet_column
  
 
 class ExcelManager: 
-    def __init__(self, file_path=None):
+    # Number of times any manager has parsed a workbook from disk.
+    parse_count = 0
+    
+    def __init__(self, file_path=None, snapshot_cache=None):
         self.file_path = file_path;
+        self.snapshot_cache = snapshot_cache
+        self.snapshot = None
+        # Snapshot fingerprint of the file as it was when dataframe was read
+        self.fingerprint = None
+        # (size, mtime) of the file dataframe matches, None when unknown
+        self.disk_stat = None
+        # Bumped by every insert, so a re-read started before one can be told apart
+        self.insert_count = 0
+        # Sheet row -> values written by insert_tickets but not yet mirrored
+        # in dataframe, see record_written_rows
+        self.unrecorded_rows = {}
+        self._rows_lock = threading.Lock()
         self.job_number = None
         self.job_name = None
         self.job_address = None
@@ -15,8 +36,10 @@ class ExcelManager:
         self.labor_map = {}
         self.nte = None
         self.headers = []
-        self.data_rows = [];
+        # Frame row positions of the ticket rows below the header
+        self.data_rows = range(0)
         self.header_row = 13
+        self.layout = None
         
     def load(self):
         if not self.file_path:
@@ -26,28 +49,153 @@ class ExcelManager:
         if not path.exists():
             raise FileNotFoundError(f"File not found: {path}")
             
-        raw_df = pd.read_excel(path, engine=self.get_excel_engine(), header=None)
+        # Reuse the parsed frames if the workbook hasn't changed. The
+        # fingerprint is taken before reading, so a save landing mid-read
+        # leaves the snapshot stale rather than caching old frames as new.
+        self.disk_stat = self._disk_stat(path)
+        self.fingerprint = self._fingerprint(path)
+        self.snapshot = self.snapshot_cache.get(path, self.fingerprint) if self.snapshot_cache else None
         
-        self.dataframe = raw_df.iloc[:, 6:]
+        if self.snapshot:
+            self.dataframe = self.snapshot["dataframe"]
+        else:
+            self.dataframe = self._read_dataframe(path)
         
-        self.job_number = self.dataframe.iloc[1,8]
-        self.job_name = self.dataframe.iloc[2,8]
-        self. job_address = self.dataframe.iloc[3,8]
-        self.nte = self.dataframe.iloc[1, 5]
+        self.layout = load_layout(self.dataframe)
+        self.header_row = self.layout.header_row
+        
+        self.job_number = self.dataframe.iloc[sheet_layout.JOB_NUMBER_CELL]
+        self.job_name = self.dataframe.iloc[sheet_layout.JOB_NAME_CELL]
+        self.job_address = self.dataframe.iloc[sheet_layout.JOB_ADDRESS_CELL]
+        self.nte = self.dataframe.iloc[sheet_layout.NTE_CELL]
 
         self.get_headers()
         
-        self.get_labor_map()
-        
         # Can eventually be removed using get_material_map
         self.get_materials()
         
-        self.get_material_map()
+        if self.snapshot:
+            self.labor_map = self.snapshot["labor_map"]
+            self.material_map = self.snapshot["material_map"]
+        else:
+            self.get_labor_map()
+            self.get_material_map()
         
         self.get_data_rows()
         
         return self.dataframe
     
+    def _read_dataframe(self, path):
+        """Parse the workbook from disk. Every parse goes through here."""
+        ExcelManager.parse_count += 1
+        
+        if self.get_excel_engine() == "openpyxl":
+            return self._read_dataframe_streaming(path)
+        
+        return self._read_dataframe_pandas(path)
+    
+    def _read_dataframe_pandas(self, path):
+        """Full sheet read through pandas. Used for .xls files."""
+        raw_df = pd.read_excel(path, engine=self.get_excel_engine(), header=None)
+        
+        return raw_df.iloc[:, 6:]
+    
+    def _read_dataframe_streaming(self, path, first_col=7):
+        """
+        Read the first sheet with openpyxl in read-only mode, skipping
+        columns A-F and the formatted-but-empty rows after the last ticket.
+        Produces the same frame as _read_dataframe_pandas.
+        
+        Every column from G on is kept. The material block runs to the end
+        of the sheet, the frames are sliced by position, and read-only mode
+        parses each row's cells whatever max_col is, so a narrower read
+        would save nothing.
+        """
+        wb = load_workbook(path, read_only=True, data_only=True, keep_links=False)
+        
+        try:
+            ws = wb.worksheets[0]
+            
+            # As pandas does: the saved <dimension> can be wrong, and would
+            # cut off the columns past it
+            ws.reset_dimensions()
+            
+            rows = []
+            pending_empty_rows = []
+            
+            for row_values in ws.iter_rows(min_col=first_col, values_only=True):
+                row = [self._convert_cell(value) for value in row_values]
+                
+                # Drop trailing empty cells like pandas does
+                while row and row[-1] is None:
+                    row.pop()
+                    
+                # Hold empty rows back until we know more data follows them.
+                # Cells holding 0 or False are data.
+                if all(value is None for value in row):
+                    pending_empty_rows.append(row)
+                    continue
+                
+                pending_empty_rows.append(row)
+                rows.extend([np.nan if value is None else value for value in pending_row]
+                            for pending_row in pending_empty_rows)
+                pending_empty_rows = []
+                
+        finally:
+            wb.close()
+        
+        # Pad ragged rows so missing cells read as NaN
+        width = max((len(row) for row in rows), default=0)
+        for row in rows:
+            row.extend([np.nan] * (width - len(row)))
+        
+        df = pd.DataFrame(rows)
+        df.columns = range(first_col - 1, first_col - 1 + len(df.columns))
+        
+        return df
+    
+    def _convert_cell(self, value):
+        """Match the cell conversion pandas applies when reading with openpyxl."""
+        if value is None or value == "":
+            return None
+        
+        if isinstance(value, str) and value in ERROR_CODES:
+            return None
+        
+        if isinstance(value, float) and value.is_integer():
+            return int(value)
+        
+        return value
+    
+    def _fingerprint(self, path):
+        return self.snapshot_cache.fingerprint(path) if self.snapshot_cache else None
+    
+    def _disk_stat(self, path):
+        try:
+            stat = Path(path).stat()
+        except OSError:
+            return None
+        
+        return (stat.st_size, stat.st_mtime_ns)
+    
+    def changed_on_disk(self):
+        """False while the file is the one dataframe was read from or last written as."""
+        return self.disk_stat is None or self._disk_stat(self.file_path) != self.disk_stat
+    
+    def save_snapshot(self, frames):
+        """Cache the parsed workbook together with frames built from it."""
+        if self.snapshot_cache is None or self.fingerprint is None:
+            return
+        
+        self.snapshot = {
+            "dataframe": self.dataframe,
+            "labor_map": self.labor_map,
+            "material_map": self.material_map,
+            **frames,
+            }
+        
+        self.snapshot_cache.put(self.file_path, self.snapshot, self.fingerprint)
+    
     def get_excel_engine(self):
         extension = Path(self.file_path).suffix.lower()
         
@@ -77,34 +225,48 @@ class ExcelManager:
         
         return self.headers
     
-    def get_materials(self, start_col=67, header_row = 6):
+    def get_materials(self, start_col=None, header_row=None):
         if self.dataframe is None:
             raise ValueError("Excel file not loaded yet. Call load() first.")
+        
+        start_col = self.layout.first_material_column if start_col is None else start_col
+        header_row = self.layout.material_header_row if header_row is None else header_row
             
         row_values = self.dataframe.iloc[header_row, start_col:]
         self.materials = [material for material in row_values if pd.notna(material)]
         
         return self.materials
     
-    def get_material_map(self, start_col=67, header_row = 6):
+    def get_material_map(self, start_col=None, header_row=None):
+        self.material_map = {}
+        
+        start_col = self.layout.first_material_column if start_col is None else start_col
+        header_row = self.layout.material_header_row if header_row is None else header_row
+        
+        # Price and units rows sit at the same offsets from the names in every template
+        price_row = header_row + (self.layout.material_price_row - self.layout.material_header_row)
+        units_row = header_row + (self.layout.material_units_row - self.layout.material_header_row)
 
         material_row_values = self.dataframe.iloc[header_row, start_col:]
-        price_row_values = self.dataframe.iloc[header_row + 4, start_col:]
+        price_row_values = self.dataframe.iloc[price_row, start_col:]
 
         for col_idx, material in enumerate(material_row_values):
             if pd.notna(material):
                 material_name = str(material).strip()
                 material_price = self._safe_float(price_row_values.iloc[col_idx])
-                material_units = self.dataframe.iloc[header_row - 2, (col_idx+ start_col)]
+                material_units = self.dataframe.iloc[units_row, (col_idx+ start_col)]
                 
                 self.material_map[material_name] = {"Sell Per Unit": material_price, "Units": material_units}
         
         return
     
     def get_labor_map(self):
-        rt = self._safe_float(self.dataframe.iloc[10, 12])
-        ot = self._safe_float(self.dataframe.iloc[10, 13])
-        dt = self._safe_float(self.dataframe.iloc[10, 14])
+        rate_row = self.layout.labor_rate_row
+        rate_columns = self.layout.labor_rate_columns
+        
+        rt = self._safe_float(self.dataframe.iloc[rate_row, rate_columns["RT"]])
+        ot = self._safe_float(self.dataframe.iloc[rate_row, rate_columns["OT"]])
+        dt = self._safe_float(self.dataframe.iloc[rate_row, rate_columns["DT"]])
         
         rt, ot, dt = round(rt, 2), round(ot, 2), round(dt, 2)
     
@@ -118,21 +280,115 @@ class ExcelManager:
 
     
     def get_data_rows (self):
+        """
+        Find the ticket rows: everything after the header row up to the
+        first empty one. Use dataframe.iloc[data_rows] for the rows.
+        """
+        self.data_rows = self._find_data_rows(self.dataframe)
+        
+        return self.data_rows
+    
+    def _find_data_rows(self, dataframe):
+        first_row = self.header_row + 1
         
-        for index in range(self.header_row+1, len(self.dataframe)):
-            data_row = self.dataframe.iloc[index]
+        filled = self._filled_rows(dataframe.iloc[first_row:])
+        empty_rows = np.flatnonzero(~filled)
+        row_count = empty_rows[0] if len(empty_rows) else len(filled)
+        
+        return range(first_row, first_row + int(row_count))
+            
+    def _filled_rows(self, df):
+        """True for rows with any cell that isn't NaN, empty or zero."""
+        values = df.to_numpy(dtype=object)
+        
+        return (pd.notna(values) & values.astype(bool)).any(axis=1)
+    
+    def insert_ticket (self, frc_ticket, record=True):
+        return self.insert_tickets([frc_ticket], record)[0]
+    
+    def insert_tickets(self, tickets, record=True):
+        """
+        Write tickets to consecutive rows after the last data row, opening
+        and saving the workbook once for the whole batch.
+        
+        Returns one result per ticket with the row it was written to and any
+        materials that aren't columns in the listing.
+        
+        With record=False the rows aren't mirrored in dataframe until
+        record_written_rows is called, so a worker thread can write them
+        while the GUI thread keeps reading dataframe. Later inserts still
+        go below them.
+        """
+        if not tickets:
+            return []
+        
+        with self._rows_lock:
+            last_data_row_index = max([self.header_row + len(self.data_rows) + 1, *self.unrecorded_rows])
+        material_columns = self._material_columns()
+        
+        results = []
+        written_rows = {}
+        
+        for offset, ticket_data in enumerate(tickets):
+            new_row = last_data_row_index + 1 + offset
             
-            if self.is_row_empty(data_row):
-                break
+            row_values = {}
+            self._insert_ticket_info(row_values, ticket_data)
+            self._insert_labor(row_values, ticket_data["Labor"])
+            missing_materials = self._insert_materials(row_values, ticket_data["Materials"], material_columns)
             
-            self.data_rows.append(data_row)
+            written_rows[new_row] = row_values
+            results.append({
+                "Ticket Number": ticket_data["Ticket Number"],
+                "Row": new_row,
+                "Missing Materials": missing_materials,
+                })
+        
+        before_write = self._disk_stat(self.file_path)
+        
+        self._write_rows(written_rows)
+        self.insert_count += 1
+        
+        # Our own write doesn't need re-reading, unless the file had already
+        # changed under us
+        if before_write is not None and before_write == self.disk_stat:
+            self.disk_stat = self._disk_stat(self.file_path)
+        
+        with self._rows_lock:
+            self.unrecorded_rows.update(written_rows)
+        
+        if record:
+            self.record_written_rows()
             
-    def is_row_empty(self, row):
-        return not any(bool(cell) for cell in row.fillna(0))
+        return results
     
-    def insert_ticket (self, frc_ticket):
+    def record_written_rows(self, rows=None):
+        """
+        Mirror rows insert_tickets has written in dataframe: the given sheet
+        rows, or every one still waiting. Rows stay in unrecorded_rows until
+        data_rows covers them, so an insert running meanwhile goes below.
+        """
+        with self._rows_lock:
+            rows = self.unrecorded_rows if rows is None else set(rows) & set(self.unrecorded_rows)
+            
+            for new_row in sorted(rows):
+                self._record_ticket_row(new_row, self.unrecorded_rows[new_row])
+                del self.unrecorded_rows[new_row]
+        
+    def _write_rows(self, written_rows):
+        """
+        Patch the rows straight into the sheet XML, falling back to a full
+        openpyxl load and save when the fast path can't handle the file.
+        """
         path = self.ensure_xlsx_copy(self.file_path)
-        ticket_data = frc_ticket
+        
+        if Path(path) == Path(self.file_path):
+            try:
+                append_rows(path, "TICKET TRACKING", written_rows)
+                return
+            
+            except UnsupportedSheetLayout as e:
+                print(f"Fast row append not possible ({e}), saving with openpyxl")
         
         wb=load_workbook(path)
         
@@ -141,18 +397,142 @@ class ExcelManager:
             
         ws = wb["TICKET TRACKING"]
         
-        last_data_row_index = self.header_row + len(self.data_rows) + 1
-        new_row = last_data_row_index + 1
+        for new_row, row_values in written_rows.items():
+            for column, value in row_values.items():
+                ws.cell(row=new_row, column=column, value=value)
         
-        self._insert_ticket_info(ws, new_row, ticket_data)
+        wb.save(self.file_path)
+        wb.close()
+        
+    def _record_ticket_row(self, ticket_row, row_values):
+        """
+        Mirror a row written to the sheet in the loaded dataframe so the next
+        insert lands below it without reloading the workbook.
+        """
+        row_index = ticket_row - 1
         
+        if row_index not in self.dataframe.index:
+            self.dataframe.loc[row_index] = np.nan
         
-        self._insert_labor(ws, new_row, ticket_data["Labor"])
+        for column, value in row_values.items():
+            if column - 1 in self.dataframe.columns:
+                self.dataframe.loc[row_index, column - 1] = self._convert_cell(value)
         
-        self._insert_materials(ws, new_row, ticket_data["Materials"])
+        self.data_rows = range(self.data_rows.start, max(self.data_rows.stop, row_index + 1))
         
-        wb.save(self.file_path)
-        wb.close()
+    def reread(self):
+        """
+        Parse the workbook from disk again, leaving the loaded state alone.
+        Returns (dataframe, source) for replace_dataframe, where source
+        describes the file as it was before the read.
+        
+        The whole sheet is read, not just the ticket rows: same_template
+        needs the job details, rates and materials above them to tell
+        whether the frames can be updated in place.
+        """
+        path = Path(self.file_path)
+        source = {"disk_stat": self._disk_stat(path), "fingerprint": self._fingerprint(path)}
+        
+        return self._read_dataframe(path), source
+    
+    def same_template(self, dataframe):
+        """
+        True when dataframe has the loaded workbook's layout, job details,
+        rates and materials, so only its ticket rows can differ. The to-date
+        totals are formulas over the tickets and aren't compared.
+        """
+        try:
+            if load_layout(dataframe) is not self.layout:
+                return False
+        except ValueError:
+            return False
+        
+        for row, columns in self.layout.job_regions():
+            old_values = self.dataframe.iloc[row, columns]
+            new_values = dataframe.iloc[row, columns]
+            
+            if self._row_key(old_values) != self._row_key(new_values):
+                return False
+            
+        return True
+    
+    def ticket_row_hashes(self, dataframe=None):
+        """
+        {(ticket number, occurrence): (row hash, frame row)} for the ticket
+        rows of dataframe (the loaded one by default). Occurrence tells
+        repeated ticket numbers apart, in sheet order.
+        """
+        dataframe = self.dataframe if dataframe is None else dataframe
+        ticket_column = self.layout.info_columns["Ticket Number"]
+        
+        hashes = {}
+        occurrences = {}
+        
+        rows = self._find_data_rows(dataframe)
+        
+        for position, row in zip(rows, dataframe.iloc[rows].itertuples(index=False, name=None)):
+            ticket_number = row[ticket_column]
+            
+            # Rows without a ticket number never make it into the frames
+            if pd.isna(ticket_number):
+                continue
+            
+            ticket = self._cell_key(ticket_number)
+            occurrence = occurrences.get(ticket, 0)
+            occurrences[ticket] = occurrence + 1
+            
+            hashes[(ticket, occurrence)] = (hash(self._row_key(row)), position)
+            
+        return hashes
+    
+    def _row_key(self, row):
+        """Row values compared by content, so 5, 5.0 and NaN/None line up across reads."""
+        values = [self._cell_key(value) for value in row]
+        
+        while values and values[-1] is None:
+            values.pop()
+            
+        return tuple(values)
+    
+    def _cell_key(self, value):
+        if value is None or (isinstance(value, float) and value != value):
+            return None
+        
+        if isinstance(value, (bool, np.bool_)):
+            return bool(value)
+        
+        if isinstance(value, (int, float, np.number)):
+            return float(value)
+        
+        return str(value)
+    
+    def ticket_from_row(self, row):
+        """A sheet row in the shape AddTicketDialog builds, for TicketDataService.apply_ticket."""
+        layout = self.layout
+        
+        ticket = {field: row.iloc[position] for field, position in layout.info_columns.items()}
+        
+        ticket["Labor"] = {
+            category: {"hours": row.iloc[position]}
+            for category, position in layout.labor_columns.items()
+            }
+        
+        ticket["Materials"] = [
+            {"material": material, "quantity": row.iloc[position]}
+            for material, position in layout.material_columns.items()
+            if self._safe_float(row.iloc[position])
+            ]
+        
+        return ticket
+    
+    def replace_dataframe(self, dataframe, source=None):
+        """Adopt a re-read of the same template as the loaded workbook."""
+        source = source or {}
+        
+        self.dataframe = dataframe
+        self.disk_stat = source.get("disk_stat")
+        self.fingerprint = source.get("fingerprint")
+        self.get_data_rows()
         
     def _safe_float(self, incoming_value):
         try:
@@ -161,34 +541,34 @@ class ExcelManager:
         except(ValueError, TypeError):
             return 0.0
         
-    def _insert_ticket_info(self, worksheet, ticket_row, ticket_object):
-        worksheet.cell(row=ticket_row, column=7, value=ticket_object["Date"])
-        worksheet.cell(row=ticket_row, column=8, value=ticket_object["Signature"])
-        worksheet.cell(row=ticket_row, column=9, value=ticket_object["Ticket Number"])
-        worksheet.cell(row=ticket_row, column=10, value=ticket_object["Type"])
-        worksheet.cell(row=ticket_row, column=11, value=ticket_object["Description"])
-        
-    def _insert_labor(self, worksheet, ticket_row, labor_object):
-        worksheet.cell(row=ticket_row, column=19, value = self._safe_float(labor_object["RT"]["hours"]))
-        worksheet.cell(row=ticket_row, column=20, value = self._safe_float(labor_object["OT"]["hours"]))
-        worksheet.cell(row=ticket_row, column=21, value = self._safe_float(labor_object["DT"]["hours"]))
-        worksheet.cell(row=ticket_row, column=22, value = self._safe_float(labor_object["OT DIFF"]["hours"]))
-        worksheet.cell(row=ticket_row, column=23, value = self._safe_float(labor_object["DT DIFF"]["hours"]))
-        
-    def _insert_materials(self, worksheet, material_row, materials):
+    def _insert_ticket_info(self, row_values, ticket_object):
+        for field, position in self.layout.info_columns.items():
+            row_values[sheet_column(position)] = ticket_object[field]
+        
+    def _insert_labor(self, row_values, labor_object):
+        for category, position in self.layout.labor_columns.items():
+            row_values[sheet_column(position)] = self._safe_float(labor_object[category]["hours"])
+    
+    def _material_columns(self):
+        """Sheet column of each material, from the layout's name -> column map."""
+        return self.layout.material_sheet_columns
+        
+    def _insert_materials(self, row_values, materials, material_columns):
+        missing_materials = []
+        
         for material_object in materials:
             material_name = material_object["material"].strip()
             material_quantity = self._safe_float(material_object["quantity"])
+            
+            column_index = material_columns.get(material_name)
+            
+            if column_index is None:
+                missing_materials.append(material_name)
+                continue
                 
-            try: 
-                column_index = self.headers.index(material_name) + 7
-                
-                worksheet.cell(row=material_row, column=column_index, value=material_quantity)
-                
-            except ValueError:
-                print(F"{material_name} not found in headers.... Skipped!")
-
-        
+            row_values[column_index] = material_quantity
+            
+        return missing_materials
         
     def ensure_xlsx_copy(self, path):
         """
@@ -0,0 +1,382 @@
+# -*- coding: utf-8 -*-
+"""
+One PDF of every filed ticket for a job, for billing.
+
+    python -m data_manager.job_packet 027386 --from 01/01/26 --to 01/31/26 -o "027386 January.pdf"
+
+Tickets are taken from the job's bid folder TICKETS directory, where
+merge_ticket_pdf files them as "<job> <mm-dd-yy> <ticket> SIGNED.pdf", and
+get a bookmark each. Jobs can have hundreds of tickets, so the packet is
+written as it goes: one ticket PDF is open at a time, and its objects go
+straight to the output file. Objects that come out byte-for-byte the same
+as one already written, like the fonts every e-ticket embeds, are written
+once and shared.
+"""
+import os
+import re
+import sys
+import hashlib
+import argparse
+from datetime import datetime
+from pathlib import Path
+
+FILED_TICKET_PATTERN = re.compile(
+    r"^(?P<job>\S+) (?P<date>\d{2}-\d{2}-\d{2}) (?P<ticket>\S+) (?P<status>SIGNED|UNSIGNED)\.pdf$",
+    re.IGNORECASE,
+)
+
+# Catalog, page tree and outline root take the first object numbers
+CATALOG, PAGES, OUTLINES = 1, 2, 3
+
+
+def parse_date(value):
+    """A date, or a "mm/dd/yy" string as the ticket form enters them."""
+    if value is None or not isinstance(value, str):
+        return value
+    return datetime.strptime(value, "%m/%d/%y").date()
+
+
+def find_filed_tickets(tickets_folder, job_number, start=None, end=None, include_unsigned=False):
+    """
+    [(date, ticket number, path)] for the job's filed tickets between start
+    and end inclusive, by date then ticket. A ticket filed both signed and
+    unsigned only counts once, as signed.
+    """
+    start, end = parse_date(start), parse_date(end)
+    chosen = {}
+
+    with os.scandir(tickets_folder) as entries:
+        for entry in entries:
+            match = FILED_TICKET_PATTERN.match(entry.name)
+            if not match or match.group("job") != str(job_number):
+                continue
+
+            signed = match.group("status").upper() == "SIGNED"
+            if not signed and not include_unsigned:
+                continue
+
+            date = datetime.strptime(match.group("date"), "%m-%d-%y").date()
+            if (start and date < start) or (end and date > end):
+                continue
+
+            ticket_number = match.group("ticket")
+            current = chosen.get(ticket_number)
+            if current is None or (signed and not current[0]):
+                chosen[ticket_number] = (signed, date, Path(entry.path))
+
+    return sorted(
+        (date, ticket_number, path) for ticket_number, (_, date, path) in chosen.items()
+    )
+
+
+class PacketWriter:
+    """
+    Appends PDFs to an output file without keeping them open, with an
+    outline entry per appended PDF. Call close() to write the page tree,
+    outline and cross-reference table.
+    """
+
+    def __init__(self, output):
+        self.output = output
+        self.offsets = {}
+        self.next_number = OUTLINES + 1
+        self.page_numbers = []
+        self.bookmarks = []
+        self.catalog = {}
+        self.current_page = None
+        self.shared = {}
+        self.shared_count = 0
+
+        self._copied = {}
+        self._copying = set()
+        self._reserved = set()
+
+        self.output.write(b"%PDF-1.7\n%\xe2\xe3\xcf\xd3\n")
+
+    def append(self, source, title=None, catalog_keys=()):
+        """
+        Copy every page of source to the packet, bookmarked as title if
+        given. catalog_keys are source catalog entries to carry over, e.g.
+        "/Outlines", for when source is the only PDF appended. Returns the
+        page count.
+        """
+        from PyPDF2 import PdfReader
+
+        reader = PdfReader(str(source))
+        if reader.is_encrypted:
+            reader.decrypt("")
+
+        first_page = len(self.page_numbers)
+
+        try:
+            for page in reader.pages:
+                self.current_page = page
+                self.page_numbers.append(self._copy_reference(page.indirect_reference))
+
+            root = reader.trailer["/Root"]
+            for key in catalog_keys:
+                if key in root:
+                    self.catalog[key] = self._copy(root.raw_get(key))
+
+        except Exception:
+            # Leave no half ticket in the packet; what was already written
+            # is just never referenced
+            del self.page_numbers[first_page:]
+            raise
+
+        finally:
+            # Numbers handed out for a source that broke part way still need
+            # an object behind them
+            for number in list(self._reserved):
+                self._write_object(number, b"null")
+
+            # References are only shared within one source, so its objects
+            # can go once it's done
+            self._copied.clear()
+            self._copying.clear()
+            self.current_page = None
+
+        if title is not None and len(self.page_numbers) > first_page:
+            self.bookmarks.append((title, self.page_numbers[first_page]))
+
+        return len(self.page_numbers) - first_page
+
+    def close(self):
+        from PyPDF2.generic import (
+            ArrayObject, DictionaryObject, IndirectObject, NameObject, NullObject, NumberObject, TextStringObject
+        )
+
+        def ref(number):
+            return IndirectObject(number, 0, None)
+
+        self._write(PAGES, DictionaryObject({
+            NameObject("/Type"): NameObject("/Pages"),
+            NameObject("/Kids"): ArrayObject(ref(number) for number in self.page_numbers),
+            NameObject("/Count"): NumberObject(len(self.page_numbers)),
+        }))
+
+        items = [self._reserve() for _ in self.bookmarks]
+        for index, ((title, page_number), number) in enumerate(zip(self.bookmarks, items)):
+            item = DictionaryObject({
+                NameObject("/Title"): TextStringObject(title),
+                NameObject("/Parent"): ref(OUTLINES),
+                NameObject("/Dest"): ArrayObject([ref(page_number), NameObject("/XYZ"), NullObject(), NullObject(), NullObject()]),
+            })
+            if index > 0:
+                item[NameObject("/Prev")] = ref(items[index - 1])
+            if index < len(items) - 1:
+                item[NameObject("/Next")] = ref(items[index + 1])
+            self._write(number, item)
+
+        outlines = DictionaryObject({
+            NameObject("/Type"): NameObject("/Outlines"),
+            NameObject("/Count"): NumberObject(len(items)),
+        })
+        if items:
+            outlines[NameObject("/First")] = ref(items[0])
+            outlines[NameObject("/Last")] = ref(items[-1])
+        self._write(OUTLINES, outlines)
+
+        catalog = DictionaryObject({NameObject(key): value for key, value in self.catalog.items()})
+        catalog[NameObject("/Type")] = NameObject("/Catalog")
+        catalog[NameObject("/Pages")] = ref(PAGES)
+
+        if items or "/Outlines" not in catalog:
+            catalog[NameObject("/Outlines")] = ref(OUTLINES)
+        if items:
+            catalog[NameObject("/PageMode")] = NameObject("/UseOutlines")
+
+        self._write(CATALOG, catalog)
+
+        xref_offset = self.output.tell()
+        size = self.next_number
+
+        self.output.write(f"xref\n0 {size}\n".encode("ascii"))
+        self.output.write(b"0000000000 65535 f \n")
+        for number in range(1, size):
+            self.output.write(f"{self.offsets[number]:010d} 00000 n \n".encode("ascii"))
+
+        self.output.write(
+            f"trailer\n<< /Size {size} /Root {CATALOG} 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n".encode("ascii")
+        )
+
+    def _reserve(self):
+        number = self.next_number
+        self.next_number += 1
+        return number
+
+    def _copy_reference(self, reference):
+        """Output object number for an object of the source being appended."""
+        key = (reference.idnum, reference.generation)
+
+        if key in self._copied:
+            return self._copied[key]
+
+        # Reached again while its own children are being copied, e.g. a
+        # page's annotation pointing back at the page
+        if key in self._copying:
+            number = self._reserve()
+            self._copied[key] = number
+            self._reserved.add(number)
+            return number
+
+        self._copying.add(key)
+        source = reference.get_object()
+        copy = self._copy(source)
+        self._copying.discard(key)
+
+        data = self._serialize(copy)
+
+        if key in self._copied:
+            number = self._copied[key]
+            self._write_object(number, data)
+            return number
+
+        is_page = isinstance(source, dict) and source.get("/Type") == "/Page"
+
+        # Each page has to be its own object in the page tree
+        digest = None if is_page else hashlib.blake2b(data, digest_size=20).digest()
+
+        if digest in self.shared:
+            number = self.shared[digest]
+            self.shared_count += 1
+        else:
+            number = self._reserve()
+            self._write_object(number, data)
+            if digest is not None:
+                self.shared[digest] = number
+
+        self._copied[key] = number
+        return number
+
+    def _copy(self, value):
+        from PyPDF2.generic import (
+            ArrayObject, DecodedStreamObject, DictionaryObject, EncodedStreamObject, IndirectObject,
+            NameObject, StreamObject
+        )
+
+        if isinstance(value, IndirectObject):
+            return IndirectObject(self._copy_reference(value), 0, None)
+
+        if isinstance(value, StreamObject):
+            data, entries = self._stream_contents(value)
+
+            copy = EncodedStreamObject() if "/Filter" in entries else DecodedStreamObject()
+            copy._data = data
+            for key, item in entries.items():
+                copy[NameObject(key)] = self._copy(item)
+            return copy
+
+        if isinstance(value, DictionaryObject):
+            copy = DictionaryObject()
+            for key, item in value.items():
+                # Pages hang off the packet's own page tree instead
+                if key == "/Parent" and value.get("/Type") == "/Page":
+                    continue
+                copy[NameObject(key)] = self._copy(item)
+
+            if value.get("/Type") == "/Page":
+                copy[NameObject("/Parent")] = IndirectObject(PAGES, 0, None)
+
+            return copy
+
+        if isinstance(value, ArrayObject):
+            return ArrayObject(self._copy(item) for item in value)
+
+        return value
+
+    def _stream_contents(self, stream):
+        """
+        Data and dictionary entries to write for a source stream. The data
+        is copied still encoded, so nothing is recompressed.
+        """
+        return stream._data, dict(stream)
+
+    def _serialize(self, value):
+        from io import BytesIO
+
+        stream = BytesIO()
+        value.write_to_stream(stream, None)
+        return stream.getvalue()
+
+    def _write(self, number, value):
+        self._write_object(number, self._serialize(value))
+
+    def _write_object(self, number, data):
+        self._reserved.discard(number)
+        self.offsets[number] = self.output.tell()
+        self.output.write(f"{number} 0 obj\n".encode("ascii"))
+        self.output.write(data)
+        self.output.write(b"\nendobj\n")
+
+
+def build_job_packet(job_number, output_path, start=None, end=None, tickets_folder=None, include_unsigned=False):
+    """
+    Merge the job's filed tickets dated start to end into output_path, with
+    a bookmark per ticket. tickets_folder defaults to the bid folder's
+    TICKETS directory. Returns a summary dict; tickets whose PDF couldn't be
+    read are left out and listed under "skipped".
+    """
+    if tickets_folder is None:
+        from data_manager.pdf_creator import find_bid_folder
+        tickets_folder = find_bid_folder(job_number) / "TICKETS"
+
+    tickets = find_filed_tickets(tickets_folder, job_number, start, end, include_unsigned)
+    if not tickets:
+        raise FileNotFoundError(f"No filed tickets for {job_number} in {tickets_folder}")
+
+    output_path = Path(output_path)
+    temp_path = output_path.with_suffix(".tmp")
+    skipped = []
+
+    try:
+        with open(temp_path, "wb") as f:
+            writer = PacketWriter(f)
+
+            for date, ticket_number, path in tickets:
+                title = f"Ticket {ticket_number} ({date:%m/%d/%y})"
+                try:
+                    writer.append(path, title)
+                except Exception as e:
+                    print(f"Skipping {path.name}: {e}")
+                    skipped.append((path.name, f"{type(e).__name__}: {e}"))
+
+            writer.close()
+
+        os.replace(temp_path, output_path)
+
+    finally:
+        if temp_path.exists():
+            temp_path.unlink()
+
+    return {
+        "path": output_path,
+        "tickets": len(tickets) - len(skipped),
+        "pages": len(writer.page_numbers),
+        "shared_objects": writer.shared_count,
+        "bytes": output_path.stat().st_size,
+        "skipped": skipped,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Merge a job's filed tickets into one bookmarked PDF")
+    parser.add_argument("job_number")
+    parser.add_argument("-o", "--output", required=True)
+    parser.add_argument("--from", dest="start", default=None, help="First ticket date, mm/dd/yy")
+    parser.add_argument("--to", dest="end", default=None, help="Last ticket date, mm/dd/yy")
+    parser.add_argument("--tickets-folder", default=None, help="Instead of the bid folder's TICKETS")
+    parser.add_argument("--include-unsigned", action="store_true")
+    args = parser.parse_args()
+
+    summary = build_job_packet(args.job_number, args.output, args.start, args.end,
+                               args.tickets_folder, args.include_unsigned)
+
+    print(f"{summary['tickets']} tickets, {summary['pages']} pages, "
+          f"{summary['bytes'] / 2**20:.1f} MiB at {summary['path']} "
+          f"({summary['shared_objects']} repeated objects shared)")
+
+    for name, error in summary["skipped"]:
+        print(f"  Skipped {name}: {error}")
+
+    sys.exit(1 if summary["skipped"] else 0)
@@ -7,41 +7,72 @@ Created on Fri Dec 12 10:11:42 2025
 
 import re
 import os
-import win32com.client as win32
 from datetime import datetime
 from pathlib import Path
-from PyPDF2 import PdfWriter
 
-def process_ticket(input_path, date, ticket_status):
-    pdf_location = excel_to_pdf(input_path)
+# "native" draws the PDF in Python, "excel" exports it through Excel (Windows only)
+PDF_BACKENDS = ("native", "excel")
+DEFAULT_PDF_BACKEND = "native"
+
+def process_ticket(input_path, date, ticket_status, backend=None):
+    pdf_location = excel_to_pdf(input_path, backend)
     
+    final_pdf_path = merge_ticket_pdf(pdf_location, input_path, date, ticket_status)
+
+    os.startfile(final_pdf_path)
+
+def merge_ticket_pdf(pdf_location, input_path, date, ticket_status, output_path=None):
+    """
+    Put the e-ticket PDF in front of the job's scanned ticket and file the
+    result in the bid folder, or write it to output_path instead. Returns
+    the merged PDF's path.
+    """
     job_folder = find_job_folder(input_path)
     
-    job_number = job_folder.name
     ticket_number = extract_ticket_number(input_path)
     
     job_ticket = find_ticket_file(job_folder,  ticket_number)
     
-    bid_folder = find_bid_folder(job_number) / "TICKETS"
-    bid_folder.mkdir(exist_ok=True)
-    
-    formatted_date = datetime.strptime(date, "%m/%d/%y").strftime("%m-%d-%y")
-    
-    display_status = "SIGNED" if ticket_status.upper() == "YES" else "UNSIGNED"
-
-    final_pdf_path = str(bid_folder / f"{job_number} {formatted_date} {ticket_number} {display_status}.pdf")
+    if output_path is None:
+        final_pdf_path = filed_ticket_path(input_path, date, ticket_status)
+        
+        try:
+            final_pdf_path.parent.mkdir(exist_ok=True)
+        except FileNotFoundError:
+            # The indexed bid folder was renamed or removed since the last scan
+            final_pdf_path = filed_ticket_path(input_path, date, ticket_status, rescan=True)
+            final_pdf_path.parent.mkdir(exist_ok=True)
+    else:
+        final_pdf_path = Path(output_path)
     
     merge_pdfs(
         str(pdf_location),
         str(job_ticket),
-        final_pdf_path
+        str(final_pdf_path)
         )
 
     print(f"Merged PDF saved at {final_pdf_path}")
+    
+    return str(final_pdf_path)
 
-    os.startfile(final_pdf_path)
+def filed_ticket_path(input_path, date, ticket_status, rescan=False):
+    """
+    Where the merged ticket for the e-ticket at input_path is filed on the
+    bids share. Comes from the bid folder index, so the share itself isn't
+    touched unless rescan is set.
+    """
+    job_number = find_job_folder(input_path).name
+    ticket_number = extract_ticket_number(input_path)
+    
+    bid_folder = find_bid_folder(job_number, rescan=rescan)
+    
+    formatted_date = datetime.strptime(date, "%m/%d/%y").strftime("%m-%d-%y")
+    
+    display_status = "SIGNED" if ticket_status.upper() == "YES" else "UNSIGNED"
+    
+    return bid_folder / "TICKETS" / f"{job_number} {formatted_date} {ticket_number} {display_status}.pdf"
 
-def excel_to_pdf(input_path):
+def excel_to_pdf(input_path, backend=None):
     input_path = Path(input_path).resolve()
 
     pdf_folder = input_path.parent/"pdfs"
@@ -50,32 +81,78 @@ def excel_to_pdf(input_path):
     print(f"saving in folder path {pdf_folder}")
     
     output_pdf = pdf_folder / (input_path.stem + ".pdf")
+    
+    backend = backend or DEFAULT_PDF_BACKEND
+    
+    if backend == "native":
+        _native_pdf(input_path, output_pdf)
+        
+    elif backend == "excel":
+        _excel_pdf(input_path, output_pdf)
+        
+    else:
+        raise ValueError(f"Unknown PDF backend '{backend}', expected one of {', '.join(PDF_BACKENDS)}")
+    
+    print(f"PDF Saved at {output_pdf}")
+    
+    return output_pdf
 
-    excel = win32.Dispatch("Excel.Application")
-    excel.Visible = False
-    excel.DisplayAlerts = False
-
-    print("Opening Excel Workbook")
-    wb = excel.Workbooks.Open(str(input_path))
+def _native_pdf(input_path, output_pdf):
+    from openpyxl import load_workbook
+    from data_manager.sheet_pdf import render_worksheet
+    
+    wb = load_workbook(input_path)
+    # Page 1 only, as the Excel export prints
+    render_worksheet(wb.worksheets[0], output_pdf, max_pages=1)
+
+def _excel_pdf(input_path, output_pdf):
+    import pythoncom
+    import win32com.client as win32
+    
+    # COM has to be initialised on every thread that uses it, and tickets
+    # are exported from the submission queue's worker threads
+    pythoncom.CoInitialize()
+    
+    try:
+        excel = win32.Dispatch("Excel.Application")
+        excel.Visible = False
+        excel.DisplayAlerts = False
+
+        print("Opening Excel Workbook")
+        wb = excel.Workbooks.Open(str(input_path))
+
+        # Export as PDF
+        print("Saving PDF")
+        sheet = wb.Worksheets(1)
+        sheet.ExportAsFixedFormat(
+            Type=0,                # 0 = PDF
+            Filename=str(output_pdf),
+            From = 1,
+            To = 1
+        )
 
-    # Export as PDF
-    print("Saving PDF")
-    sheet = wb.Worksheets(1)
-    sheet.ExportAsFixedFormat(
-        Type=0,                # 0 = PDF
-        Filename=str(output_pdf),
-        From = 1,
-        To = 1
-    )
+        wb.Close()
+        excel.Quit()
+        
+    finally:
+        pythoncom.CoUninitialize()
 
-    wb.Close()
-    excel.Quit()
+def e_ticket_to_pdf(folder, ticket, output_pdf):
+    """
+    Draw a ticket's e-ticket straight to PDF, without writing or reading
+    back the workbook.
+    """
+    from data_manager.e_ticket_creator import ETicketCreator
+    from data_manager.sheet_pdf import render_worksheet
     
-    print(f"PDF Saved at {output_pdf}")
+    wb = ETicketCreator(folder, ticket).build_workbook()
+    render_worksheet(wb.active, output_pdf, max_pages=1)
     
-    return output_pdf
+    return Path(output_pdf)
     
 def merge_pdfs(top_pdf, bottom_pdf, output_path):    
+    from PyPDF2 import PdfWriter
+    
     writer = PdfWriter()
 
     writer.append(top_pdf)
@@ -109,41 +186,19 @@ def find_job_folder(input_path):
         
     return folder_path
 
-def find_bid_folder(job_number):
-    BIDS_FOLDER = Path(r"\\FRC2\otherapps\Doc_Arch\Project Folders\0 Structure\Bids")
-    
-    # Try with space after dash first
-    matches = list(BIDS_FOLDER.glob(f"{job_number} -*"))
+def find_bid_folder(job_number, rescan=False):
+    from data_manager.bid_index import default_index
     
-    # If nothing, try without space
-    if not matches:
-        matches = list(BIDS_FOLDER.glob(f"{job_number}-*"))
-    
-    if not matches:
-        raise FileNotFoundError(
-            f"'{job_number}' not found in {BIDS_FOLDER}"
-        )
-        
-    # Return the first matching folder
-    return matches[0]
+    # Served from the local index, the share is only listed when it's stale
+    # or doesn't know the job yet
+    return default_index().find(job_number, rescan=rescan)
 
 
 def find_ticket_file(job_folder, ticket_number):
-    job_folder = Path(job_folder)
-    
-    patterns = [
-        f"TICKET {ticket_number} SIGNED*.pdf",
-        f"TICKET {ticket_number} UNSIGNED*.pdf"
-    ]
+    from data_manager.ticket_scan_index import scan_index
     
-    for pattern in patterns:
-        matches = list(job_folder.glob(pattern))
-        if matches:
-            return matches[0]
-        
-    raise FileNotFoundError(
-        f"No pdf found for Ticket {ticket_number}"
-        )
+    # The folder is only listed again when its mtime has moved
+    return scan_index(job_folder).find(ticket_number)
 
 if __name__ == "__main__":
     input_file = r"C:\Users\plopez\Desktop\FRC_GUI\data_manager\027386 - 040691.xlsx"
@@ -0,0 +1,280 @@
+# -*- coding: utf-8 -*-
+"""
+Smaller copies of merged ticket PDFs.
+
+    python -m data_manager.pdf_optimizer "027386 01-15-26 040691 SIGNED.pdf" --max-dpi 150
+
+The PDF is rewritten through the job packet writer, so objects repeated
+byte-for-byte, like a font embedded by both the e-ticket and the scan, are
+kept once. On the way, streams are recompressed at the highest zlib level,
+and scan images above max_dpi are scaled down and stored as JPEG. The file
+is only replaced when the rewrite comes out smaller.
+"""
+import os
+import sys
+import zlib
+import shutil
+import argparse
+from pathlib import Path
+
+from data_manager.job_packet import PacketWriter
+
+DEFAULT_MAX_DPI = 150
+JPEG_QUALITY = 75
+
+# Images are only resampled once they are this far over max_dpi, as small
+# reductions cost quality for little saving
+DOWNSAMPLE_THRESHOLD = 1.5
+
+LOSSLESS_FILTERS = ("/FlateDecode", "/LZWDecode", "/ASCIIHexDecode", "/ASCII85Decode")
+
+# Catalog entries a single merged ticket can carry, kept through the rewrite
+CATALOG_KEYS = ("/Outlines", "/Names", "/AcroForm", "/PageLabels", "/PageMode", "/ViewerPreferences")
+
+
+def _filters(stream):
+    filters = stream.get("/Filter", [])
+    if hasattr(filters, "get_object"):
+        filters = filters.get_object()
+    if isinstance(filters, str):
+        filters = [filters]
+    return list(filters)
+
+
+def _color_components(stream):
+    """1 for gray, 3 for RGB, None for color spaces not handled here."""
+    color_space = stream.get("/ColorSpace")
+    if hasattr(color_space, "get_object"):
+        color_space = color_space.get_object()
+
+    if color_space == "/DeviceGray":
+        return 1
+    if color_space == "/DeviceRGB":
+        return 3
+
+    # [/ICCBased <profile>] with 1 or 3 components decodes the same way
+    if isinstance(color_space, list) and len(color_space) == 2 and color_space[0] == "/ICCBased":
+        components = color_space[1].get_object().get("/N")
+        if components in (1, 3):
+            return components
+
+    return None
+
+
+class OptimizingWriter(PacketWriter):
+    def __init__(self, output, max_dpi=DEFAULT_MAX_DPI, jpeg_quality=JPEG_QUALITY):
+        super().__init__(output)
+        self.max_dpi = max_dpi
+        self.jpeg_quality = jpeg_quality
+        self.recompressed = 0
+        self.downsampled = 0
+
+    def _stream_contents(self, stream):
+        data, entries = super()._stream_contents(stream)
+
+        if stream.get("/Subtype") == "/Image" and self.max_dpi:
+            image = self._downsample(stream, entries)
+            if image is not None:
+                self.downsampled += 1
+                return image
+
+        # XMP metadata is meant to stay readable as plain text
+        if stream.get("/Type") == "/Metadata":
+            return data, entries
+
+        return self._recompress(stream, data, entries)
+
+    def _recompress(self, stream, data, entries):
+        filters = _filters(stream)
+        if any(name not in LOSSLESS_FILTERS for name in filters):
+            return data, entries
+
+        try:
+            raw = self._decoded(stream) if filters else data
+        except Exception:
+            return data, entries
+
+        compressed = zlib.compress(raw, 9)
+        if len(compressed) >= len(data):
+            return data, entries
+
+        entries = dict(entries)
+        entries.pop("/DecodeParms", None)
+        entries["/Filter"] = self._name("/FlateDecode")
+
+        self.recompressed += 1
+        return compressed, entries
+
+    def _downsample(self, stream, entries):
+        """(JPEG data, entries) for an image over max_dpi, else None."""
+        width, height = stream.get("/Width"), stream.get("/Height")
+        if not width or not height or self.current_page is None:
+            return None
+
+        # Scans fill the page, so the page size is taken as the image's
+        # drawn size. Images drawn smaller come out above max_dpi, never below.
+        box = self.current_page.mediabox
+        dpi = max(width / (float(box.width) / 72), height / (float(box.height) / 72))
+        if dpi <= self.max_dpi * DOWNSAMPLE_THRESHOLD:
+            return None
+
+        image = self._decode_image(stream)
+        if image is None:
+            return None
+
+        from qtpy.QtCore import Qt, QBuffer, QByteArray, QIODevice
+
+        scale = self.max_dpi / dpi
+        image = image.scaled(max(1, round(width * scale)), max(1, round(height * scale)),
+                             Qt.AspectRatioMode.IgnoreAspectRatio, Qt.TransformationMode.SmoothTransformation)
+
+        buffer_data = QByteArray()
+        buffer = QBuffer(buffer_data)
+        buffer.open(QIODevice.OpenModeFlag.WriteOnly)
+        if not image.save(buffer, "JPEG", self.jpeg_quality):
+            return None
+        buffer.close()
+
+        data = bytes(buffer_data)
+        if len(data) >= len(stream._data):
+            return None
+
+        entries = {
+            key: value for key, value in entries.items()
+            if key not in ("/Filter", "/DecodeParms", "/Length", "/Width", "/Height", "/BitsPerComponent")
+        }
+        entries.update({
+            "/Filter": self._name("/DCTDecode"),
+            "/Width": self._number(image.width()),
+            "/Height": self._number(image.height()),
+            "/BitsPerComponent": self._number(8),
+        })
+        return data, entries
+
+    def _decode_image(self, stream):
+        """
+        The image as a QImage, for 8 bit gray or RGB images stored as JPEG or
+        losslessly. Masks, 1 bit scans and other color spaces give None.
+        """
+        from qtpy.QtGui import QImage
+
+        if any(key in stream for key in ("/ImageMask", "/Mask", "/SMask", "/Decode")):
+            return None
+
+        components = _color_components(stream)
+        if components is None or stream.get("/BitsPerComponent") != 8:
+            return None
+
+        filters = _filters(stream)
+
+        if filters == ["/DCTDecode"]:
+            image = QImage.fromData(stream._data)
+
+        elif all(name in LOSSLESS_FILTERS for name in filters):
+            try:
+                samples = self._decoded(stream)
+            except Exception:
+                return None
+
+            width, height = stream["/Width"], stream["/Height"]
+            if len(samples) < width * height * components:
+                return None
+
+            image_format = QImage.Format.Format_RGB888 if components == 3 else QImage.Format.Format_Grayscale8
+            # copy() so the image no longer points into samples
+            image = QImage(samples, width, height, width * components, image_format).copy()
+
+        else:
+            return None
+
+        if image.isNull():
+            return None
+
+        if components == 1:
+            return image.convertToFormat(QImage.Format.Format_Grayscale8)
+        return image.convertToFormat(QImage.Format.Format_RGB888)
+
+    def _decoded(self, stream):
+        from PyPDF2.filters import decode_stream_data
+
+        return decode_stream_data(stream)
+
+    def _name(self, name):
+        from PyPDF2.generic import NameObject
+        return NameObject(name)
+
+    def _number(self, number):
+        from PyPDF2.generic import NumberObject
+        return NumberObject(number)
+
+
+def optimize_pdf(input_path, output_path=None, max_dpi=DEFAULT_MAX_DPI, jpeg_quality=JPEG_QUALITY):
+    """
+    Write a smaller copy of input_path to output_path, which defaults to
+    replacing input_path. max_dpi=None leaves images alone. If the copy
+    isn't smaller, the original is kept (or copied to output_path).
+    Returns a report with the sizes before and after.
+    """
+    input_path = Path(input_path)
+    output_path = Path(output_path) if output_path else input_path
+    temp_path = output_path.with_name(output_path.name + ".tmp")
+
+    before = input_path.stat().st_size
+
+    try:
+        with open(temp_path, "wb") as f:
+            writer = OptimizingWriter(f, max_dpi, jpeg_quality)
+            writer.append(input_path, catalog_keys=CATALOG_KEYS)
+            writer.close()
+
+        after = temp_path.stat().st_size
+
+        if after < before:
+            os.replace(temp_path, output_path)
+        else:
+            after = before
+            if output_path != input_path:
+                shutil.copyfile(input_path, output_path)
+
+    finally:
+        if temp_path.exists():
+            temp_path.unlink()
+
+    report = {
+        "path": output_path,
+        "before": before,
+        "after": after,
+        "downsampled": writer.downsampled,
+        "recompressed": writer.recompressed,
+        "shared_objects": writer.shared_count,
+    }
+
+    print(f"Optimized {output_path.name}: {describe_sizes(report)}")
+
+    return report
+
+
+def describe_sizes(report):
+    saved = 1 - report["after"] / report["before"] if report["before"] else 0
+    return f"{report['before'] / 2**20:.2f} MiB -> {report['after'] / 2**20:.2f} MiB, {saved:.0%} smaller"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rewrite ticket PDFs smaller")
+    parser.add_argument("paths", nargs="+")
+    parser.add_argument("--max-dpi", type=int, default=DEFAULT_MAX_DPI, help="0 leaves images alone")
+    parser.add_argument("--quality", type=int, default=JPEG_QUALITY)
+    parser.add_argument("--output-folder", default=None, help="Write copies here instead of replacing")
+    args = parser.parse_args()
+
+    failed = 0
+
+    for path in args.paths:
+        output_path = Path(args.output_folder) / Path(path).name if args.output_folder else None
+        try:
+            optimize_pdf(path, output_path, args.max_dpi or None, args.quality)
+        except Exception as e:
+            print(f"Could not optimize {path}: {type(e).__name__}: {e}")
+            failed += 1
+
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+"""
+Summaries of every job listing in a folder, built in parallel.
+
+    python -m data_manager.portfolio "S:\\Jobs\\Active"
+"""
+import os
+import sys
+import time
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+LISTING_PATTERN = "*DETAILED TICKET LISTING*.xls*"
+
+# Straight-time, overtime and double-time hours. The DIFF columns are
+# premiums on hours already counted in these.
+HOURS_CATEGORIES = ("RT", "OT", "DT")
+
+
+def find_listings(folder):
+    """Every ticket listing under folder, skipping Excel's ~$ lock files."""
+    return sorted(
+        path for path in Path(folder).rglob(LISTING_PATTERN)
+        if not path.name.startswith("~$")
+    )
+
+
+def summarize_job(path, use_snapshots=True):
+    """
+    Build one job's TicketDataService and reduce it to the numbers the
+    portfolio shows. Runs in a worker process, so it only returns plain data.
+    """
+    from data_manager.excel_manager import ExcelManager
+    from data_manager.ticket_data_service import TicketDataService
+    from data_manager.snapshot_cache import SnapshotCache
+
+    start = time.perf_counter()
+
+    manager = ExcelManager(str(path), snapshot_cache=SnapshotCache() if use_snapshots else None)
+    service = TicketDataService(str(path), excel_manager=manager)
+
+    listing = service.ticket_listing
+    hours = service.labor_summary.loc["Hours to Date"]
+    catalog = service.material_catalog
+
+    materials = {}
+    for material in catalog.columns:
+        count = _number(catalog.loc["Material Counts to Date", material])
+        if count:
+            materials[str(material).strip()] = {
+                "count": count,
+                "sell": _number(catalog.loc["Sell to Date", material]),
+                "cost": _number(catalog.loc["Cost to Date", material]),
+            }
+
+    return {
+        "path": str(path),
+        "job_number": manager.job_number,
+        "job_name": manager.job_name,
+        "nte": manager.nte,
+        "nte_ratio": service.calculate_nte_ratio(),
+        "tickets": len(listing),
+        "total_sell": _number(listing["Total Sell"].sum()),
+        "total_cost": _number(listing["Total Cost"].sum()),
+        "labor_hours": sum(_number(hours[category]) for category in HOURS_CATEGORIES),
+        "materials": materials,
+        "seconds": time.perf_counter() - start,
+        "error": None,
+    }
+
+
+def _number(value):
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return 0.0
+    return 0.0 if value != value else value
+
+
+def summarize_jobs(paths, max_workers=None):
+    """
+    Yield summarize_job results as each job finishes, one worker process per
+    core. A job that fails yields a summary with its error set instead.
+    Closing the generator cancels the jobs that haven't started.
+    """
+    paths = list(paths)
+    if not paths:
+        return
+
+    max_workers = min(max_workers or os.cpu_count() or 1, len(paths))
+    executor = ProcessPoolExecutor(max_workers=max_workers)
+
+    try:
+        futures = {executor.submit(summarize_job, path): path for path in paths}
+
+        for future in as_completed(futures):
+            try:
+                yield future.result()
+            except Exception as e:
+                yield {"path": str(futures[future]), "error": f"{type(e).__name__}: {e}"}
+
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def job_table(summaries):
+    """One row per job, for display."""
+    import pandas as pd
+
+    rows = [
+        {
+            "Job Number": summary["job_number"],
+            "Job Name": summary["job_name"],
+            "NTE": summary["nte"],
+            "NTE %": summary["nte_ratio"] * 100 if isinstance(summary["nte_ratio"], (int, float)) else summary["nte_ratio"],
+            "Tickets": summary["tickets"],
+            "Total Sell": summary["total_sell"],
+            "Total Cost": summary["total_cost"],
+            "Labor Hours": summary["labor_hours"],
+            "File": Path(summary["path"]).name,
+        }
+        for summary in summaries if not summary["error"]
+    ]
+
+    return pd.DataFrame(rows, columns=[
+        "Job Number", "Job Name", "NTE", "NTE %", "Tickets",
+        "Total Sell", "Total Cost", "Labor Hours", "File",
+    ])
+
+
+def material_totals(summaries):
+    """Material usage summed across jobs, most used first."""
+    import pandas as pd
+
+    totals = {}
+    for summary in summaries:
+        for material, usage in (summary.get("materials") or {}).items():
+            total = totals.setdefault(material, {"Jobs": 0, "Count": 0.0, "Sell": 0.0, "Cost": 0.0})
+            total["Jobs"] += 1
+            total["Count"] += usage["count"]
+            total["Sell"] += usage["sell"]
+            total["Cost"] += usage["cost"]
+
+    df = pd.DataFrame.from_dict(totals, orient="index", columns=["Jobs", "Count", "Sell", "Cost"])
+    df.index.name = "Material"
+
+    return df.sort_values("Count", ascending=False)
+
+
+if __name__ == "__main__":
+    folder = sys.argv[1] if len(sys.argv) > 1 else "."
+    paths = find_listings(folder)
+    print(f"Summarizing {len(paths)} listings in {folder}")
+
+    start = time.perf_counter()
+    summaries = []
+
+    for summary in summarize_jobs(paths):
+        summaries.append(summary)
+
+        if summary["error"]:
+            print(f"  {Path(summary['path']).name}: {summary['error']}")
+        else:
+            print(f"  {Path(summary['path']).name}: {summary['tickets']} tickets, "
+                  f"${summary['total_sell']:,.2f} sell, {summary['seconds']:.1f} s")
+
+    print(f"Done in {time.perf_counter() - start:.1f} s")
+    print(job_table(summaries).to_string(index=False))
+    print(material_totals(summaries).head(20).to_string())
@@ -0,0 +1,274 @@
+# -*- coding: utf-8 -*-
+"""
+Copies files written locally out to the network shares in the background.
+
+Submissions write their e-ticket, its PDF and the merged ticket into a local
+staging folder and hand each file to ShareSync.send with the path it
+belongs at on the share. A single worker thread copies them across, so a
+slow or briefly unavailable share never holds up or fails a submission.
+
+- Copies land under a temporary name and are renamed into place, so the
+  share never shows a half-written file.
+- A failed copy is retried with exponential backoff, for as long as it
+  takes the share to come back.
+- The queue is saved to disk on every change and picked up again on the
+  next start.
+
+Staged files are kept for a few days after they're copied, as a local
+backup, and then pruned.
+"""
+import os
+import json
+import time
+import uuid
+import shutil
+import threading
+from pathlib import Path
+
+DEFAULT_BASE_DELAY = 5
+DEFAULT_MAX_DELAY = 15 * 60
+DEFAULT_KEEP_DAYS = 7
+
+
+def default_staging_dir():
+    base = os.environ.get("LOCALAPPDATA") or Path.home() / ".cache"
+    return Path(base) / "FRC_GUI" / "outbox"
+
+
+class ShareSync:
+    def __init__(self, staging_dir=None, base_delay=DEFAULT_BASE_DELAY, max_delay=DEFAULT_MAX_DELAY,
+                 keep_days=DEFAULT_KEEP_DAYS, on_change=None):
+        """
+        on_change(job) is called from the worker thread whenever a copy is
+        queued, done or failed; job["error"] holds the last failure.
+        """
+        self.staging_dir = Path(staging_dir or default_staging_dir())
+        self.queue_path = self.staging_dir / "queue.json"
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.keep_days = keep_days
+        self.on_change = on_change
+
+        self.jobs = []
+        self.copied = 0
+
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._stopping = False
+        self._thread = None
+
+        self._load()
+
+    def start(self):
+        """Start copying, beginning with whatever a previous run left queued."""
+        self.prune()
+
+        self._stopping = False
+        self._thread = threading.Thread(target=self._work, name="share-sync", daemon=True)
+        self._thread.start()
+
+    def shutdown(self, timeout=None):
+        """Stop after the copy in progress; the rest stay queued for next time."""
+        with self._changed:
+            self._stopping = True
+            self._changed.notify_all()
+
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def staging_folder(self, name):
+        """A new local folder to write one submission's files into."""
+        folder = self.staging_dir / "files" / f"{time.strftime('%Y%m%d-%H%M%S')} {name} {uuid.uuid4().hex[:6]}"
+        folder.mkdir(parents=True)
+        return folder
+
+    def send(self, source, destination):
+        """
+        Queue source to be copied to destination. A queued copy to the same
+        destination is replaced, so the newest file wins.
+        """
+        job = {
+            "id": uuid.uuid4().hex,
+            "source": str(source),
+            "destination": str(destination),
+            "queued_at": time.time(),
+            "attempts": 0,
+            "next_attempt": 0.0,
+            "error": None,
+        }
+
+        with self._changed:
+            self.jobs = [queued for queued in self.jobs if queued["destination"] != job["destination"]]
+            self.jobs.append(job)
+            self._save()
+            self._changed.notify_all()
+
+        self._notify(job)
+        return job
+
+    def pending(self):
+        with self._lock:
+            return [dict(job) for job in self.jobs]
+
+    def retry_now(self):
+        """Try every waiting copy again straight away instead of after its backoff."""
+        with self._changed:
+            for job in self.jobs:
+                job["next_attempt"] = 0.0
+            self._changed.notify_all()
+
+    def wait(self, timeout=None):
+        """Wait until the queue is empty. Returns False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        with self._changed:
+            while self.jobs:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._changed.wait(remaining)
+
+        return True
+
+    def prune(self):
+        """Remove staging folders older than keep_days that have nothing left to copy."""
+        files_dir = self.staging_dir / "files"
+        if not files_dir.exists():
+            return
+
+        cutoff = time.time() - self.keep_days * 24 * 60 * 60
+
+        with self._lock:
+            waiting = {Path(job["source"]).parent for job in self.jobs}
+            waiting |= {folder.parent for folder in waiting}
+
+        for folder in files_dir.iterdir():
+            try:
+                if folder in waiting or folder.stat().st_mtime > cutoff:
+                    continue
+                shutil.rmtree(folder)
+            except OSError as e:
+                print(f"Could not remove staged files {folder.name}: {e}")
+
+    def _work(self):
+        while True:
+            with self._changed:
+                job = self._next_job()
+                while job is None or job["next_attempt"] > time.time():
+                    if self._stopping:
+                        return
+                    timeout = None if job is None else job["next_attempt"] - time.time()
+                    self._changed.wait(timeout)
+                    job = self._next_job()
+
+                if self._stopping:
+                    return
+
+            try:
+                self._copy(job)
+
+            except FileNotFoundError as e:
+                if Path(job["source"]).exists():
+                    self._failed(job, e)
+                else:
+                    # Nothing to retry with, e.g. staging was cleared by hand
+                    print(f"Dropping copy to {job['destination']}, {job['source']} is gone")
+                    job["error"] = f"Staged file missing: {job['source']}"
+                    self._finished(job)
+
+            except OSError as e:
+                self._failed(job, e)
+
+            else:
+                job["error"] = None
+                self.copied += 1
+                self._finished(job)
+
+    def _next_job(self):
+        if not self.jobs:
+            return None
+        return min(self.jobs, key=lambda job: job["next_attempt"])
+
+    def _copy(self, job):
+        destination = Path(job["destination"])
+        temp_path = destination.with_name(f"~{destination.name}.{job['id'][:8]}.tmp")
+
+        # Only the last level, e.g. TICKETS; a missing job folder stays an error
+        destination.parent.mkdir(exist_ok=True)
+
+        try:
+            shutil.copyfile(job["source"], temp_path)
+            os.replace(temp_path, destination)
+
+        except OSError:
+            try:
+                temp_path.unlink(missing_ok=True)
+            except OSError:
+                pass
+            raise
+
+        print(f"Copied {destination.name} to {destination.parent}")
+
+    def _failed(self, job, error):
+        with self._changed:
+            job["attempts"] += 1
+            job["error"] = f"{type(error).__name__}: {error}"
+            delay = min(self.max_delay, self.base_delay * 2 ** (job["attempts"] - 1))
+            job["next_attempt"] = time.time() + delay
+            self._save()
+
+        print(f"Could not copy to {job['destination']} (attempt {job['attempts']}), "
+              f"retrying in {delay:.0f} s: {job['error']}")
+        self._notify(job)
+
+    def _finished(self, job):
+        with self._changed:
+            # A newer send to the same destination may have replaced it
+            if job in self.jobs:
+                self.jobs.remove(job)
+            self._save()
+            self._changed.notify_all()
+
+        self._notify(job)
+
+    def _notify(self, job):
+        if self.on_change:
+            try:
+                self.on_change(job)
+            except Exception:
+                import traceback
+                traceback.print_exc()
+
+    def _load(self):
+        try:
+            with open(self.queue_path, encoding="utf-8") as f:
+                self.jobs = json.load(f)
+
+        except FileNotFoundError:
+            return
+
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable share sync queue {self.queue_path}: {e}")
+            return
+
+        # Copies waiting on a backoff from the last run can go again now
+        for job in self.jobs:
+            job["next_attempt"] = 0.0
+
+        if self.jobs:
+            print(f"{len(self.jobs)} files still to copy to the share from last time")
+
+    def _save(self):
+        """Write the queue; the caller holds the lock."""
+        temp_path = self.queue_path.with_suffix(".tmp")
+
+        try:
+            self.staging_dir.mkdir(parents=True, exist_ok=True)
+
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(self.jobs, f, indent=1)
+
+            os.replace(temp_path, self.queue_path)
+
+        except OSError as e:
+            print(f"Could not save share sync queue: {e}")
@@ -0,0 +1,227 @@
+# -*- coding: utf-8 -*-
+"""
+Where everything lives on a DETAILED TICKET LISTING sheet.
+
+Positions are 0-based over the frame ExcelManager loads, which starts at
+sheet column G. Use sheet_column() to turn a position into the 1-based
+column number openpyxl and the sheet XML use.
+"""
+import hashlib
+import threading
+import pandas as pd
+
+# The loaded frame skips columns A-F
+FIRST_SHEET_COLUMN = 7
+
+# Only the top of the sheet is searched for anchors
+ANCHOR_SEARCH_ROWS = 40
+
+LABOR_CATEGORIES = ("RT", "OT", "DT", "OT DIFF", "DT DIFF")
+
+# (row, column) of the job header cells. They have no labels of their own
+# in the frame, so they stay fixed for the template.
+JOB_NUMBER_CELL = (1, 8)
+JOB_NAME_CELL = (2, 8)
+JOB_ADDRESS_CELL = (3, 8)
+NTE_CELL = (1, 5)
+
+# Template fingerprint -> SheetLayout, least recently used first
+_LAYOUT_CACHE = {}
+_LAYOUT_CACHE_SIZE = 32
+_LAYOUT_CACHE_LOCK = threading.Lock()
+
+
+def sheet_column(position):
+    return position + FIRST_SHEET_COLUMN
+
+
+def load_layout(dataframe):
+    """Detect the layout of a loaded listing, reusing it for identical templates."""
+    header_row = _find_row(dataframe, "Ticket #")
+    material_anchor_row = _find_row(dataframe, "Structure Material #")
+
+    key = _template_fingerprint(dataframe, header_row, material_anchor_row)
+
+    with _LAYOUT_CACHE_LOCK:
+        layout = _LAYOUT_CACHE.pop(key, None)
+
+        if layout is None:
+            layout = SheetLayout(dataframe, header_row, material_anchor_row)
+
+            while len(_LAYOUT_CACHE) >= _LAYOUT_CACHE_SIZE:
+                del _LAYOUT_CACHE[next(iter(_LAYOUT_CACHE))]
+
+        _LAYOUT_CACHE[key] = layout
+
+    return layout
+
+
+def _find_row(dataframe, label):
+    top = dataframe.iloc[:ANCHOR_SEARCH_ROWS]
+    matches = (top == label).any(axis=1).to_numpy().nonzero()[0]
+
+    if not len(matches):
+        raise ValueError(f"Could not find '{label}' in the ticket listing.")
+
+    return int(matches[0])
+
+
+def _find_column(values, label, error_label=None):
+    for position, value in enumerate(values):
+        if _label(value) == label:
+            return position
+
+    raise ValueError(f"Could not find '{error_label or label}' in the ticket listing.")
+
+
+def _label(value):
+    return str(value).strip() if pd.notna(value) else ""
+
+
+def _template_fingerprint(dataframe, header_row, material_anchor_row):
+    """
+    Hash of where the anchors are and the label rows every position is
+    resolved from. A separator per cell and per row keeps the frame width
+    and the row boundaries in the hash.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{header_row}:{material_anchor_row}".encode())
+
+    rows = range(min(header_row, material_anchor_row), header_row + 1)
+    for row in rows:
+        digest.update(b"\x1e")
+        for value in dataframe.iloc[row]:
+            # Numbers are job data (rates, totals), labels are template
+            if isinstance(value, str):
+                digest.update(value.encode("utf-8", "replace"))
+            digest.update(b"\x1f")
+
+    return digest.hexdigest()
+
+
+class SheetLayout:
+    def __init__(self, dataframe, header_row, material_anchor_row):
+        self.header_row = header_row
+        header_values = dataframe.iloc[header_row]
+
+        # Ticket header row: every named column, first occurrence wins
+        self.header_columns = {}
+        for position, value in enumerate(header_values):
+            self.header_columns.setdefault(_label(value), position)
+
+        type_column = next(
+            (position for position, value in enumerate(header_values) if _label(value).startswith("Type")),
+            None,
+        )
+        if type_column is None:
+            raise ValueError("Could not find 'Type' in the ticket listing.")
+
+        self.info_columns = {
+            "Date": _find_column(header_values, "Date"),
+            "Signature": _find_column(header_values, "Signature"),
+            "Ticket Number": _find_column(header_values, "Ticket #"),
+            "Type": type_column,
+            "Description": _find_column(header_values, "Description"),
+        }
+
+        self.labor_columns = {
+            category: _find_column(header_values, category)
+            for category in LABOR_CATEGORIES
+        }
+
+        self._find_labor_block(dataframe)
+        self._find_material_block(dataframe, material_anchor_row)
+
+    def _find_labor_block(self, dataframe):
+        """The RT/OT/DT rate block above the ticket header."""
+        self.labor_block_row, rt_column = self._find_rate_header(dataframe)
+        self.labor_label_column = rt_column - 1
+
+        block_header = dataframe.iloc[self.labor_block_row]
+        self.labor_rate_columns = {
+            category: _find_column(block_header, category, f"labor rate {category}")
+            for category in LABOR_CATEGORIES
+        }
+
+        self.labor_block_rows = self._block_rows(dataframe, self.labor_block_row, self.labor_label_column)
+        self.labor_block_columns = slice(self.labor_label_column, self.labor_rate_columns["DT DIFF"] + 1)
+
+        self.labor_rate_row = self._labelled_row(dataframe, self.labor_block_rows, self.labor_label_column,
+                                                 "Sell Per Unit", "labor Sell Per Unit")
+        self.labor_cost_row = self._labelled_row(dataframe, self.labor_block_rows, self.labor_label_column,
+                                                 "Cost Per Unit (w/Tax)", "labor Cost Per Unit (w/Tax)")
+
+    def _find_rate_header(self, dataframe):
+        for row in range(self.header_row):
+            labels = [_label(value) for value in dataframe.iloc[row]]
+
+            for position in range(len(labels) - 2):
+                if labels[position:position + 3] == ["RT", "OT", "DT"]:
+                    return row, position
+
+        raise ValueError("Could not find the labor rate block in the ticket listing.")
+
+    def _find_material_block(self, dataframe, material_anchor_row):
+        """Material names, units and rates to the right of 'Structure Material #'."""
+        self.material_anchor_row = material_anchor_row
+        self.material_label_column = _find_column(dataframe.iloc[material_anchor_row], "Structure Material #")
+
+        self.material_header_row = material_anchor_row + 1
+        self.material_units_row = self.material_header_row - 2
+        self.first_material_column = self.material_label_column + 1
+
+        self.material_block_rows = self._block_rows(dataframe, self.material_header_row, self.material_label_column)
+        self.material_price_row = self._labelled_row(dataframe, self.material_block_rows, self.material_label_column,
+                                                     "Sell Per Unit", "material Sell Per Unit")
+        self.material_cost_row = self._labelled_row(dataframe, self.material_block_rows, self.material_label_column,
+                                                    "Cost Per Unit (w/Tax)", "material Cost Per Unit (w/Tax)")
+
+        # Material name -> frame position, first occurrence wins
+        self.material_columns = {}
+        material_names = dataframe.iloc[self.material_header_row, self.first_material_column:]
+
+        for offset, material in enumerate(material_names):
+            if pd.notna(material):
+                self.material_columns.setdefault(str(material).strip(), self.first_material_column + offset)
+
+        # Material name -> 1-based sheet column, for writing ticket rows
+        self.material_sheet_columns = {
+            name: sheet_column(position) for name, position in self.material_columns.items()
+        }
+
+        self.first_material = next(
+            (material for material in material_names if pd.notna(material)),
+            None,
+        )
+
+    def job_regions(self):
+        """
+        (row, columns) of every cell above the ticket rows that is typed in
+        rather than totalled from the tickets: job details, rates, units and
+        material names.
+        """
+        labor_rows = (self.labor_block_row, self.labor_cost_row, self.labor_rate_row)
+        material_rows = (self.material_units_row, self.material_anchor_row, self.material_header_row,
+                         self.material_cost_row, self.material_price_row)
+        material_columns = slice(self.material_label_column, None)
+
+        return [
+            *((row, slice(column, column + 1)) for row, column in
+              (JOB_NUMBER_CELL, JOB_NAME_CELL, JOB_ADDRESS_CELL, NTE_CELL)),
+            *((row, self.labor_block_columns) for row in labor_rows),
+            *((row, material_columns) for row in material_rows),
+        ]
+
+    def _block_rows(self, dataframe, start_row, label_column):
+        """Rows from start_row down while the label column has text."""
+        end_row = start_row + 1
+        while end_row < self.header_row and _label(dataframe.iloc[end_row, label_column]):
+            end_row += 1
+        return slice(start_row, end_row)
+
+    def _labelled_row(self, dataframe, rows, label_column, label, error_label):
+        for row in range(rows.start, rows.stop):
+            if _label(dataframe.iloc[row, label_column]) == label:
+                return row
+
+        raise ValueError(f"Could not find '{error_label}' in the ticket listing.")
@@ -0,0 +1,603 @@
+# -*- coding: utf-8 -*-
+"""
+Draws an openpyxl worksheet to PDF without Excel.
+
+Covers what the e-ticket template uses: column widths and row heights,
+merged cells, solid fills, borders, bold text, alignment and wrapping, and
+number/date formats. Formulas are evaluated when they only use + - * /,
+parentheses, cell references and SUM; anything else is left blank.
+
+The PDF is written directly with the standard Helvetica fonts, so nothing
+beyond openpyxl is needed and it runs headless anywhere.
+"""
+import re
+import zlib
+from datetime import date, datetime
+
+from openpyxl.utils import get_column_letter, range_boundaries
+
+# US Letter, in points
+PAGE_SIZE = (612, 792)
+
+DEFAULT_COLUMN_WIDTH = 8.43
+DEFAULT_FONT_SIZE = 11
+CELL_PADDING = 2
+
+BORDER_WIDTHS = {
+    "hair": 0.25, "thin": 0.5, "dotted": 0.5, "dashed": 0.5, "dashDot": 0.5, "dashDotDot": 0.5,
+    "medium": 1.0, "mediumDashed": 1.0, "mediumDashDot": 1.0, "mediumDashDotDot": 1.0,
+    "slantDashDot": 1.0, "double": 1.5, "thick": 1.5,
+}
+
+# Glyph widths (1/1000 em) for ASCII 32-126, from the Helvetica AFM files
+HELVETICA_WIDTHS = [
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,
+]
+HELVETICA_BOLD_WIDTHS = [
+    278, 333, 474, 556, 556, 889, 722, 238, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 333, 333, 584, 584, 584, 611,
+    975, 722, 722, 722, 722, 667, 611, 778, 722, 278, 556, 722, 611, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 333, 278, 333, 584, 556,
+    333, 556, 611, 556, 611, 556, 333, 611, 611, 278, 278, 556, 278, 889, 611, 611,
+    611, 611, 389, 556, 333, 611, 556, 778, 556, 556, 500, 389, 280, 389, 584,
+]
+
+
+def text_width(text, size, bold=False):
+    widths = HELVETICA_BOLD_WIDTHS if bold else HELVETICA_WIDTHS
+    return sum(widths[ord(char) - 32] if 32 <= ord(char) <= 126 else 556 for char in text) * size / 1000
+
+
+class PdfDocument:
+    """Just enough PDF to place text, lines and filled boxes on pages."""
+
+    FONTS = {False: b"F1", True: b"F2"}
+
+    def __init__(self, page_size=PAGE_SIZE):
+        self.width, self.height = page_size
+        self.pages = []
+
+    def new_page(self):
+        self.pages.append([])
+
+    def _draw(self, operation):
+        self.pages[-1].append(operation)
+
+    # Coordinates are from the top left of the page, like the sheet
+    def text(self, x, y, text, size, bold=False, color=(0, 0, 0)):
+        encoded = text.encode("cp1252", "replace")
+        encoded = encoded.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+        self._draw(b"BT %s rg /%s %s Tf %s %s Td (%s) Tj ET" % (
+            _numbers(*color), self.FONTS[bool(bold)], _numbers(size), *_numbers_list(x, self.height - y), encoded))
+
+    def line(self, x1, y1, x2, y2, width=0.5):
+        self._draw(b"%s w %s %s m %s %s l S" % (
+            _numbers(width), *_numbers_list(x1, self.height - y1, x2, self.height - y2)))
+
+    def rect(self, x, y, width, height, fill):
+        self._draw(b"%s rg %s %s %s %s re f" % (
+            _numbers(*fill), *_numbers_list(x, self.height - y - height, width, height)))
+
+    def write(self, path):
+        objects = []
+
+        def add(body):
+            objects.append(body)
+            return len(objects)
+
+        catalog = add(None)
+        pages = add(None)
+        regular = add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>")
+        bold = add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>")
+
+        page_ids = []
+        for operations in self.pages or [[]]:
+            content = zlib.compress(b"\n".join(operations))
+            stream = add(b"<< /Length %d /Filter /FlateDecode >>\nstream\n%s\nendstream" % (len(content), content))
+            page_ids.append(add(
+                b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %s] "
+                b"/Resources << /Font << /F1 %d 0 R /F2 %d 0 R >> >> /Contents %d 0 R >>"
+                % (pages, _numbers(self.width, self.height), regular, bold, stream)))
+
+        objects[catalog - 1] = b"<< /Type /Catalog /Pages %d 0 R >>" % pages
+        objects[pages - 1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+            b" ".join(b"%d 0 R" % page_id for page_id in page_ids), len(page_ids))
+
+        output = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        offsets = []
+        for number, body in enumerate(objects, start=1):
+            offsets.append(len(output))
+            output += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+
+        xref = len(output)
+        output += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+        output += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+        output += b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+            len(objects) + 1, catalog, xref)
+
+        with open(path, "wb") as f:
+            f.write(output)
+
+
+def _numbers_list(*values):
+    return [(f"{value:.2f}".rstrip("0").rstrip(".") or "0").encode("ascii") for value in values]
+
+
+def _numbers(*values):
+    return b" ".join(_numbers_list(*values))
+
+
+def render_worksheet(ws, output_path, page_size=PAGE_SIZE, max_pages=None):
+    """
+    Write ws's print area (or used range) to output_path, fit to the page
+    width. Rows past max_pages pages are left out.
+    """
+    SheetRenderer(ws, page_size, max_pages).render(output_path)
+
+
+class SheetRenderer:
+    def __init__(self, ws, page_size=PAGE_SIZE, max_pages=None):
+        self.ws = ws
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self.min_column, self.min_row, self.max_column, self.max_row = self._print_range()
+
+        # Top left cell -> bottom right of its merge, and every merged cell's bounds
+        self.merged = {}
+        self.covered = {}
+        for merged_range in ws.merged_cells.ranges:
+            self.merged[(merged_range.min_row, merged_range.min_col)] = (merged_range.max_row, merged_range.max_col)
+            for row in range(merged_range.min_row, merged_range.max_row + 1):
+                for column in range(merged_range.min_col, merged_range.max_col + 1):
+                    self.covered[(row, column)] = merged_range.bounds
+
+        self.formulas = FormulaEvaluator(ws)
+
+    def _print_range(self):
+        print_area = self.ws.print_area
+        if print_area:
+            # "'Sheet'!$A$1:$I$50", and only the first range if there are several
+            reference = print_area.split(",")[0].split("!")[-1].replace("$", "")
+            return range_boundaries(reference)
+
+        max_row = self.ws.max_row
+        while max_row > 1 and not any(
+                cell.value is not None or cell.border.bottom.style or cell.border.top.style
+                for cell in self.ws[max_row]):
+            max_row -= 1
+
+        return 1, 1, self.ws.max_column, max_row
+
+    def _column_widths(self):
+        """Column widths in points, from Excel's character widths."""
+        widths = {}
+        default = self.ws.sheet_format.defaultColWidth or DEFAULT_COLUMN_WIDTH
+
+        for dimension in self.ws.column_dimensions.values():
+            if dimension.width and dimension.min and dimension.max:
+                for column in range(dimension.min, dimension.max + 1):
+                    widths[column] = dimension.width
+
+        # Character widths are in Calibri 11 zeros: 7 px each, plus 5 px padding
+        return [
+            (widths.get(column, default) * 7 + 5) * 0.75 if not self._column_hidden(column) else 0
+            for column in range(self.min_column, self.max_column + 1)
+        ]
+
+    def _column_hidden(self, column):
+        letter = get_column_letter(column)
+        return letter in self.ws.column_dimensions and self.ws.column_dimensions[letter].hidden
+
+    def _row_height(self, row):
+        dimension = self.ws.row_dimensions.get(row)
+        if dimension is not None and dimension.hidden:
+            return 0
+        if dimension is not None and dimension.height:
+            return dimension.height
+        return self.ws.sheet_format.defaultRowHeight or 15
+
+    def render(self, output_path):
+        pdf = PdfDocument(self.page_size)
+        margins = self.ws.page_margins
+
+        left, top = margins.left * 72, margins.top * 72
+        usable_width = self.page_size[0] - (margins.left + margins.right) * 72
+        usable_height = self.page_size[1] - (margins.top + margins.bottom) * 72
+
+        column_widths = self._column_widths()
+        scale = min(1.0, usable_width / sum(column_widths))
+
+        self.column_x = [left]
+        for width in column_widths:
+            self.column_x.append(self.column_x[-1] + width * scale)
+
+        # Rows flow onto further pages rather than being cut off
+        self.row_y = {}
+        self.scale = scale
+        page_rows = []
+        y = top
+
+        for row in range(self.min_row, self.max_row + 1):
+            height = self._row_height(row) * scale
+            if page_rows and y + height > top + usable_height:
+                self._draw_page(pdf, page_rows)
+                page_rows = []
+                y = top
+
+                if self.max_pages and len(pdf.pages) >= self.max_pages:
+                    break
+
+            self.row_y[row] = (y, y + height)
+            page_rows.append(row)
+            y += height
+
+        if page_rows:
+            self._draw_page(pdf, page_rows)
+        pdf.write(output_path)
+
+    def _cell_box(self, row, column):
+        max_row, max_column = self.merged.get((row, column), (row, column))
+        max_row = min(max_row, self.max_row)
+        max_column = min(max_column, self.max_column)
+
+        top = self.row_y[row][0]
+        bottom = self.row_y.get(max_row, self.row_y[row])[1]
+        left = self.column_x[column - self.min_column]
+        right = self.column_x[max_column - self.min_column + 1]
+
+        return left, top, right, bottom
+
+    def _page_cells(self, page_rows):
+        for row in page_rows:
+            for column in range(self.min_column, self.max_column + 1):
+                cell = self.ws._cells.get((row, column))
+                if cell is not None:
+                    yield row, column, cell
+
+    def _draw_page(self, pdf, page_rows):
+        pdf.new_page()
+        cells = list(self._page_cells(page_rows))
+
+        for row, column, cell in cells:
+            fill = _fill_color(cell)
+            if fill and ((row, column) in self.merged or (row, column) not in self.covered):
+                left, top, right, bottom = self._cell_box(row, column)
+                pdf.rect(left, top, right - left, bottom - top, fill)
+
+        for row, column, cell in cells:
+            if (row, column) in self.covered and (row, column) not in self.merged:
+                continue
+            self._draw_text(pdf, row, column, cell)
+
+        for row, column, cell in cells:
+            self._draw_borders(pdf, row, column, cell)
+
+    def _draw_text(self, pdf, row, column, cell):
+        value = cell.value
+        if isinstance(value, str) and value.startswith("="):
+            value = self.formulas.value(row, column)
+
+        text = format_value(value, cell.number_format)
+        if not text:
+            return
+
+        font = cell.font
+        size = (font.sz or DEFAULT_FONT_SIZE) * self.scale
+        bold = bool(font.b)
+        color = _rgb(font.color) or (0, 0, 0)
+
+        left, top, right, bottom = self._cell_box(row, column)
+        alignment = cell.alignment
+        horizontal = alignment.horizontal or ("right" if isinstance(value, (int, float)) and
+                                              not isinstance(value, bool) else "left")
+
+        if alignment.wrap_text or bottom - top > size * 2.5:
+            lines = _wrap(text, right - left - 2 * CELL_PADDING, size, bold)
+        else:
+            lines = text.split("\n")
+
+        line_height = size * 1.2
+        block_height = line_height * len(lines)
+
+        if alignment.vertical == "top":
+            y = top + size + CELL_PADDING
+        elif alignment.vertical == "center":
+            y = top + (bottom - top - block_height) / 2 + size
+        else:
+            y = bottom - block_height + size - CELL_PADDING
+
+        for line in lines:
+            width = text_width(line, size, bold)
+
+            if horizontal in ("center", "centerContinuous"):
+                x = left + (right - left - width) / 2
+            elif horizontal == "right":
+                x = right - width - CELL_PADDING
+            else:
+                x = left + CELL_PADDING
+
+            pdf.text(x, y, line, size, bold, color)
+            y += line_height
+
+    def _draw_borders(self, pdf, row, column, cell):
+        border = cell.border
+        left = self.column_x[column - self.min_column]
+        right = self.column_x[column - self.min_column + 1]
+        top, bottom = self.row_y[row]
+
+        # Inside a merged cell only its outer edges are drawn
+        min_column, min_row, max_column, max_row = self.covered.get((row, column), (column, row, column, row))
+
+        for side, outer, x1, y1, x2, y2 in (
+            (border.top, row == min_row, left, top, right, top),
+            (border.bottom, row == max_row, left, bottom, right, bottom),
+            (border.left, column == min_column, left, top, left, bottom),
+            (border.right, column == max_column, right, top, right, bottom),
+        ):
+            if outer and side is not None and side.style:
+                pdf.line(x1, y1, x2, y2, BORDER_WIDTHS.get(side.style, 0.5))
+
+
+def _wrap(text, width, size, bold):
+    lines = []
+    for paragraph in text.split("\n"):
+        line = ""
+        for word in paragraph.split(" "):
+            candidate = f"{line} {word}" if line else word
+            if line and text_width(candidate, size, bold) > width:
+                lines.append(line)
+                line = word
+            else:
+                line = candidate
+        lines.append(line)
+    return lines
+
+
+def _rgb(color):
+    """(r, g, b) in 0-1 for an explicit ARGB colour, None for theme or indexed ones."""
+    if color is None or color.type != "rgb" or not isinstance(color.rgb, str) or len(color.rgb) != 8:
+        return None
+    return tuple(int(color.rgb[index:index + 2], 16) / 255 for index in (2, 4, 6))
+
+
+def _fill_color(cell):
+    fill = cell.fill
+    if fill is None or fill.fill_type != "solid":
+        return None
+
+    color = _rgb(fill.fgColor)
+    return None if color == (1, 1, 1) else color
+
+
+def format_value(value, number_format="General"):
+    if value is None:
+        return ""
+
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+
+    if isinstance(value, (datetime, date)):
+        return format_date(value, number_format)
+
+    if isinstance(value, (int, float)):
+        number_format = number_format or "General"
+
+        if "%" in number_format:
+            return f"{value * 100:.{_decimals(number_format)}f}%"
+
+        if "$" in number_format:
+            return f"{'-' if value < 0 else ''}${abs(value):,.{_decimals(number_format)}f}"
+
+        if "0" in number_format and number_format != "General":
+            grouping = "," if "," in number_format else ""
+            return f"{value:{grouping}.{_decimals(number_format)}f}"
+
+        return f"{value:.10g}"
+
+    return str(value)
+
+
+DATE_TOKEN = re.compile(r'yyyy|yy|mmmm|mmm|mm|m|dddd|ddd|dd|d|hh|h|ss|s|am/pm|"[^"]*"|\\.|.')
+
+
+def format_date(value, number_format):
+    """value in an Excel date format like mm/dd/yy or m/d/yyyy h:mm."""
+    number_format = re.sub(r"\[[^]]*\]", "", (number_format or "").lower()).split(";")[0]
+    if not any(token in number_format for token in "ymd"):
+        number_format = "m/d/yyyy"
+
+    hour = getattr(value, "hour", 0)
+    twelve_hour = "am/pm" in number_format
+
+    parts = []
+    previous = None
+    tokens = DATE_TOKEN.findall(number_format)
+
+    for index, token in enumerate(tokens):
+        following = next((later for later in tokens[index + 1:] if later[0] in "ymdhs"), "")
+
+        if token in ("yyyy", "yy"):
+            parts.append(f"{value.year:04d}" if token == "yyyy" else f"{value.year % 100:02d}")
+        elif token in ("mm", "m") and (previous in ("h", "hh") or following in ("s", "ss")):
+            parts.append(f"{getattr(value, 'minute', 0):0{len(token)}d}")
+        elif token in ("mmmm", "mmm"):
+            parts.append(value.strftime("%B" if token == "mmmm" else "%b"))
+        elif token in ("mm", "m"):
+            parts.append(f"{value.month:0{len(token)}d}")
+        elif token in ("dddd", "ddd"):
+            parts.append(value.strftime("%A" if token == "dddd" else "%a"))
+        elif token in ("dd", "d"):
+            parts.append(f"{value.day:0{len(token)}d}")
+        elif token in ("hh", "h"):
+            shown = (hour % 12 or 12) if twelve_hour else hour
+            parts.append(f"{shown:0{len(token)}d}")
+        elif token in ("ss", "s"):
+            parts.append(f"{getattr(value, 'second', 0):0{len(token)}d}")
+        elif token == "am/pm":
+            parts.append("AM" if hour < 12 else "PM")
+        elif token.startswith('"'):
+            parts.append(token[1:-1])
+        elif token.startswith("\\"):
+            parts.append(token[1:])
+        else:
+            parts.append(token)
+
+        if token[0] in "ymdhs":
+            previous = token
+
+    return "".join(parts)
+
+
+def _decimals(number_format):
+    match = re.search(r"\.(0+)", number_format)
+    return len(match.group(1)) if match else 0
+
+
+class UnsupportedFormula(Exception):
+    pass
+
+
+class FormulaEvaluator:
+    """Arithmetic, cell references and SUM, which is all the e-ticket writes."""
+
+    TOKEN = re.compile(r"\s*(?:(\$?[A-Z]{1,3}\$?\d+(?::\$?[A-Z]{1,3}\$?\d+)?)|(\d+(?:\.\d*)?|\.\d+)|(SUM)\s*\(|(.))")
+
+    def __init__(self, ws):
+        self.ws = ws
+        self.cache = {}
+
+    def value(self, row, column):
+        if (row, column) in self.cache:
+            return self.cache[(row, column)]
+
+        # Guards against circular references
+        self.cache[(row, column)] = None
+        cell = self.ws._cells.get((row, column))
+        value = cell.value if cell is not None else None
+
+        if isinstance(value, str) and value.startswith("="):
+            try:
+                value = self._evaluate(value[1:])
+            except (UnsupportedFormula, ZeroDivisionError):
+                value = None
+
+        self.cache[(row, column)] = value
+        return value
+
+    def _number(self, reference):
+        column, row = range_boundaries(reference.replace("$", ""))[:2]
+        value = self.value(row, column)
+
+        # Excel reads numeric text as a number in arithmetic
+        try:
+            return float(value) if value not in (None, "") else 0.0
+        except (TypeError, ValueError):
+            raise UnsupportedFormula(reference)
+
+    def _range_sum(self, reference):
+        min_column, min_row, max_column, max_row = range_boundaries(reference.replace("$", ""))
+        total = 0.0
+
+        for row in range(min_row, max_row + 1):
+            for column in range(min_column, max_column + 1):
+                value = self.value(row, column)
+                # SUM skips text, even numeric text
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    total += value
+
+        return total
+
+    def _evaluate(self, formula):
+        tokens = []
+        for match in self.TOKEN.finditer(formula.upper()):
+            reference, number, function, other = match.groups()
+            if reference:
+                tokens.append(("ref", reference))
+            elif number:
+                tokens.append(("number", float(number)))
+            elif function:
+                tokens.append(("sum", None))
+            elif other and other.strip():
+                tokens.append(("op", other))
+
+        # A parser per formula, as references to formula cells not yet
+        # cached evaluate them in the middle of this parse
+        parser = _FormulaParser(self, tokens)
+        result = parser.expression()
+
+        if parser.position != len(tokens):
+            raise UnsupportedFormula(formula)
+        return result
+
+
+class _FormulaParser:
+    def __init__(self, evaluator, tokens):
+        self.evaluator = evaluator
+        self.tokens = tokens
+        self.position = 0
+
+    def _peek(self, ahead=0):
+        position = self.position + ahead
+        return self.tokens[position] if position < len(self.tokens) else (None, None)
+
+    def _take(self):
+        token = self._peek()
+        self.position += 1
+        return token
+
+    def expression(self):
+        value = self._term()
+        while self._peek() in (("op", "+"), ("op", "-")):
+            value = value + self._term() if self._take()[1] == "+" else value - self._term()
+        return value
+
+    def _term(self):
+        value = self._factor()
+        while self._peek() in (("op", "*"), ("op", "/")):
+            value = value * self._factor() if self._take()[1] == "*" else value / self._factor()
+        return value
+
+    def _factor(self):
+        kind, token = self._take()
+
+        if kind == "number":
+            return token
+
+        if kind == "ref":
+            if ":" in token:
+                raise UnsupportedFormula(token)
+            return self.evaluator._number(token)
+
+        if kind == "op" and token == "-":
+            return -self._factor()
+
+        if kind == "op" and token == "(":
+            value = self.expression()
+            if self._take() != ("op", ")"):
+                raise UnsupportedFormula(token)
+            return value
+
+        if kind == "sum":
+            total = 0.0
+            while True:
+                # A bare reference skips text like Excel's SUM does,
+                # anything else is an expression: SUM(I3+1), SUM(A1*2,B1)
+                kind, token = self._peek()
+                if kind == "ref" and self._peek(1) in (("op", ","), ("op", ")")):
+                    self._take()
+                    total += self.evaluator._range_sum(token)
+                else:
+                    total += self.expression()
+
+                separator = self._take()
+                if separator == ("op", ")"):
+                    return total
+                if separator != ("op", ","):
+                    raise UnsupportedFormula("SUM")
+
+        raise UnsupportedFormula(str(token))
@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""
+On-disk cache of parsed ticket listings.
+
+Entries are keyed by the workbook path and validated against its size,
+mtime and content hash, so an edited workbook is never served stale.
+"""
+import os
+import time
+import uuid
+import pickle
+import hashlib
+import threading
+from pathlib import Path
+
+# Bump when the cached frames change shape so old entries are ignored
+SNAPSHOT_VERSION = 2
+
+# Temp files this old were left by a writer that died mid-write
+STALE_TEMP_SECONDS = 60 * 60
+
+
+def default_cache_dir():
+    base = os.environ.get("LOCALAPPDATA") or Path.home() / ".cache"
+    return Path(base) / "FRC_GUI" / "snapshots"
+
+
+class SnapshotCache:
+    def __init__(self, cache_dir=None, max_bytes=256 * 1024 * 1024):
+        self.cache_dir = Path(cache_dir) if cache_dir else default_cache_dir()
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def fingerprint(self, path):
+        path = Path(path).resolve()
+        stat = path.stat()
+
+        digest = hashlib.blake2b(digest_size=20)
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+
+        return {
+            "version": SNAPSHOT_VERSION,
+            "path": str(path),
+            "size": stat.st_size,
+            "mtime": stat.st_mtime_ns,
+            "hash": digest.hexdigest(),
+        }
+
+    def get(self, path, fingerprint=None):
+        """
+        Return the cached frames for path, or None if missing or stale.
+        fingerprint is the workbook's, when the caller already took it.
+        """
+        entry_path = self._entry_path(path)
+
+        try:
+            with open(entry_path, "rb") as f:
+                # The fingerprint is pickled first so stale entries are
+                # rejected without unpickling the frames.
+                cached_fingerprint = pickle.load(f)
+
+                if fingerprint is None:
+                    fingerprint = self.fingerprint(path)
+
+                if cached_fingerprint != fingerprint:
+                    f.close()
+                    entry_path.unlink(missing_ok=True)
+                    self.misses += 1
+                    return None
+
+                frames = pickle.load(f)
+
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError) as e:
+            print(f"Ignoring unreadable snapshot {entry_path.name}: {e}")
+            entry_path.unlink(missing_ok=True)
+            self.misses += 1
+            return None
+
+        # Mark as recently used for LRU eviction
+        os.utime(entry_path)
+        self.hits += 1
+
+        return frames
+
+    def put(self, path, frames, fingerprint):
+        """
+        Store frames for path and evict old entries over the size cap.
+        fingerprint must be taken before the workbook was read, so frames
+        read from a file that changed since are never stored as current.
+        """
+        entry_path = self._entry_path(path)
+        # Load threads, re-reads and portfolio workers can write the same
+        # entry at once, so each writer gets a temp file of its own
+        temp_path = entry_path.with_name(
+            f"{entry_path.stem}.{os.getpid()}-{threading.get_ident()}-{uuid.uuid4().hex[:8]}.tmp")
+
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+            with open(temp_path, "wb") as f:
+                pickle.dump(fingerprint, f, protocol=pickle.HIGHEST_PROTOCOL)
+                pickle.dump(frames, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+            os.replace(temp_path, entry_path)
+
+        except (OSError, pickle.PicklingError) as e:
+            # Only a cache: the frames are rebuilt next time instead
+            print(f"Could not write snapshot for {Path(path).name}: {type(e).__name__}: {e}")
+            temp_path.unlink(missing_ok=True)
+            return
+
+        self._evict()
+
+    def invalidate(self, path):
+        self._entry_path(path).unlink(missing_ok=True)
+
+    def clear(self):
+        for entry in self._entries():
+            entry.unlink(missing_ok=True)
+
+    def _entry_path(self, path):
+        key = hashlib.sha1(str(Path(path).resolve()).lower().encode("utf-8")).hexdigest()
+        return self.cache_dir / f"{key}.snapshot"
+
+    def _entries(self):
+        if not self.cache_dir.exists():
+            return []
+        return list(self.cache_dir.glob("*.snapshot"))
+
+    def _evict(self):
+        entries = []
+        for entry in self._entries():
+            try:
+                entries.append((entry.stat(), entry))
+            except FileNotFoundError:
+                continue
+
+        total = sum(stat.st_size for stat, _ in entries)
+
+        # Least recently used first
+        for stat, entry in sorted(entries, key=lambda item: item[0].st_mtime):
+            if total <= self.max_bytes:
+                break
+            entry.unlink(missing_ok=True)
+            total -= stat.st_size
+
+        cutoff = time.time() - STALE_TEMP_SECONDS
+        for temp_path in self.cache_dir.glob("*.tmp"):
+            try:
+                if temp_path.stat().st_mtime < cutoff:
+                    temp_path.unlink()
+            except OSError:
+                continue
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""
+Where the time goes between starting the app and its window appearing.
+
+    qt6_app.exe --profile-startup
+
+Works in the frozen build, where python -X importtime isn't available. Every
+module imported for the first time is timed, both with the modules it pulls
+in (total) and without them (self), and the app marks milestones like the
+window being shown. The report is printed once the window is up.
+"""
+import sys
+import time
+import builtins
+
+
+class StartupProfile:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.imports = {}   # module name -> [total ms, self ms]
+        self.marks = []     # (label, ms since started)
+
+        self._stack = []
+        self._original_import = None
+
+    @classmethod
+    def install(cls):
+        """Start timing imports from here on."""
+        profile = cls()
+        profile._original_import = builtins.__import__
+        builtins.__import__ = profile._import
+        return profile
+
+    def uninstall(self):
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    def mark(self, label):
+        self.marks.append((label, (time.perf_counter() - self.started) * 1000))
+
+    def report(self, top=15):
+        self.uninstall()
+
+        print("Startup profile (ms since the profile started):")
+        for label, at in self.marks:
+            print(f"  {at:8.1f}  {label}")
+
+        slowest = sorted(self.imports.items(), key=lambda item: item[1][1], reverse=True)[:top]
+        import_ms = sum(self_ms for _, self_ms in self.imports.values())
+
+        print(f"{len(self.imports)} modules imported in {import_ms:.1f} ms, slowest by self time:")
+        print(f"  {'self':>8}  {'total':>8}  module")
+        for name, (total_ms, self_ms) in slowest:
+            print(f"  {self_ms:8.1f}  {total_ms:8.1f}  {name}")
+
+        heavy = [name for name in ("numpy", "pandas", "openpyxl", "PyPDF2", "win32com") if name in sys.modules]
+        print(f"Loaded at startup: {', '.join(heavy) if heavy else 'none of numpy, pandas, openpyxl, PyPDF2, win32com'}")
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        # Relative and already imported modules cost next to nothing
+        if level or name in sys.modules:
+            return self._original_import(name, globals, locals, fromlist, level)
+
+        start = time.perf_counter()
+        self._stack.append(0.0)
+
+        try:
+            return self._original_import(name, globals, locals, fromlist, level)
+
+        finally:
+            total_ms = (time.perf_counter() - start) * 1000
+            children_ms = self._stack.pop()
+            if self._stack:
+                self._stack[-1] += total_ms
+
+            if name not in self.imports:
+                self.imports[name] = [total_ms, total_ms - children_ms]
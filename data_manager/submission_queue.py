@@ -0,0 +1,280 @@
+# -*- coding: utf-8 -*-
+"""
+Background pipeline for submitted tickets.
+
+Each submission goes through up to five stages:
+
+    e-ticket -> pdf -> merge      (only when an e-ticket folder is given)
+    -> optimize                   (if asked for, shrinks the merged PDF)
+    listing                       (always, alongside the e-ticket stages)
+
+A stage starts as soon as the stage it depends on is done, on a small
+thread pool. A failed stage can be retried on its own; the stages after it
+wait, and finished stages are never redone. Listing inserts are run one at
+a time, since they all write the same workbook.
+
+Given a ShareSync, the e-ticket stages write into a local staging folder
+and hand each file to it to be copied to the share, so a slow share
+doesn't hold them up.
+"""
+import os
+import threading
+import traceback
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+STAGES = ("e-ticket", "pdf", "merge", "optimize", "listing")
+
+# Stage -> the stage whose result it needs
+DEPENDS_ON = {"pdf": "e-ticket", "merge": "pdf", "optimize": "merge"}
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+SKIPPED = "skipped"
+
+
+class Submission:
+    """One ticket and where each of its stages has got to."""
+
+    def __init__(self, ticket, excel_manager, e_ticket_folder=None, pdf_backend=None, optimize=False):
+        self.ticket = ticket
+        self.excel_manager = excel_manager
+        self.e_ticket_folder = e_ticket_folder
+        self.pdf_backend = pdf_backend
+        self.optimize = optimize
+
+        self.status = {
+            stage: PENDING if e_ticket_folder or stage == "listing" else SKIPPED
+            for stage in STAGES
+        }
+        if not optimize:
+            self.status["optimize"] = SKIPPED
+        self.errors = {}
+        self.results = {}
+
+        # Set when staging through a ShareSync
+        self.staging_folder = None
+        self.filed_path = None
+
+    @property
+    def ticket_number(self):
+        return self.ticket["Ticket Number"]
+
+    def failed_stages(self):
+        return [stage for stage in STAGES if self.status[stage] == FAILED]
+
+    def ready_stages(self):
+        return [
+            stage for stage in STAGES
+            if self.status[stage] == PENDING
+            and self.status.get(DEPENDS_ON.get(stage), DONE) == DONE
+        ]
+
+    def summary(self):
+        parts = []
+        for stage in STAGES:
+            status = self.status[stage]
+            if status == SKIPPED:
+                continue
+
+            if stage == "optimize" and "optimize" in self.results:
+                from data_manager.pdf_optimizer import describe_sizes
+
+                report = self.results["optimize"]
+                status += f" ({describe_sizes(report)})" if report else " (filed unoptimized)"
+
+            parts.append(f"{stage} {status}")
+
+        return f"Ticket {self.ticket_number}: " + ", ".join(parts)
+
+
+class SubmissionQueue:
+    def __init__(self, max_workers=3, on_change=None, share_sync=None):
+        """
+        on_change(submission, stage) is called from the worker threads
+        whenever a stage starts, finishes or fails.
+        """
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="submission")
+        self.on_change = on_change
+        self.share_sync = share_sync
+        self.submissions = []
+
+        self._lock = threading.Lock()
+        self._listing_lock = threading.Lock()
+        self._closed = False
+
+    def submit(self, ticket, excel_manager, e_ticket_folder=None, pdf_backend=None, optimize=False):
+        submission = Submission(ticket, excel_manager, e_ticket_folder, pdf_backend, optimize)
+
+        with self._lock:
+            self.submissions.append(submission)
+
+        self._start_ready(submission)
+        return submission
+
+    def retry(self, submission):
+        """Run the failed stages again, and whatever was waiting on them."""
+        with self._lock:
+            for stage in submission.failed_stages():
+                submission.status[stage] = PENDING
+                submission.errors.pop(stage, None)
+
+        self._start_ready(submission)
+
+    def retry_failed(self):
+        for submission in list(self.submissions):
+            if submission.failed_stages():
+                self.retry(submission)
+
+    def listing_busy(self):
+        """True while a listing insert is writing the workbook."""
+        with self._lock:
+            return any(submission.status["listing"] == RUNNING for submission in self.submissions)
+
+    def running(self):
+        with self._lock:
+            return any(RUNNING in submission.status.values() for submission in self.submissions)
+
+    def clear_finished(self):
+        """Forget submissions whose every stage is done or skipped."""
+        with self._lock:
+            self.submissions = [
+                submission for submission in self.submissions
+                if any(status not in (DONE, SKIPPED) for status in submission.status.values())
+            ]
+
+    def shutdown(self, wait=True):
+        """Let running stages finish; stages that haven't started stay pending."""
+        self._closed = True
+        self.executor.shutdown(wait=wait)
+
+    def _start_ready(self, submission):
+        with self._lock:
+            if self._closed:
+                return
+
+            ready = submission.ready_stages()
+            for stage in ready:
+                submission.status[stage] = RUNNING
+
+        for stage in ready:
+            self._notify(submission, stage)
+            self.executor.submit(self._run, submission, stage)
+
+    def _run(self, submission, stage):
+        if self._closed:
+            with self._lock:
+                submission.status[stage] = PENDING
+            return
+
+        try:
+            result = getattr(self, "_run_" + stage.replace("-", "_"))(submission)
+
+        except Exception as e:
+            traceback.print_exc()
+            with self._lock:
+                submission.status[stage] = FAILED
+                submission.errors[stage] = f"{type(e).__name__}: {e}"
+
+        else:
+            with self._lock:
+                submission.results[stage] = result
+                submission.status[stage] = DONE
+
+        self._notify(submission, stage)
+        self._start_ready(submission)
+
+    def _notify(self, submission, stage):
+        if self.on_change:
+            try:
+                self.on_change(submission, stage)
+            except Exception:
+                traceback.print_exc()
+
+    def _run_e_ticket(self, submission):
+        from data_manager.e_ticket_creator import ETicketCreator
+
+        creator = ETicketCreator(submission.e_ticket_folder, submission.ticket)
+
+        if self.share_sync is None:
+            return creator.load_ticket()
+
+        save_path = creator.load_ticket(output_folder=self._staging_folder(submission))
+        self.share_sync.send(save_path, Path(submission.e_ticket_folder) / save_path.name)
+
+        return save_path
+
+    def _run_pdf(self, submission):
+        from data_manager.pdf_creator import excel_to_pdf
+
+        pdf_path = excel_to_pdf(submission.results["e-ticket"], backend=submission.pdf_backend)
+
+        if self.share_sync is not None:
+            # excel_to_pdf writes into a pdfs folder beside the workbook
+            self.share_sync.send(pdf_path, Path(submission.e_ticket_folder) / "pdfs" / pdf_path.name)
+
+        return pdf_path
+
+    def _run_merge(self, submission):
+        from data_manager.pdf_creator import merge_ticket_pdf, filed_ticket_path
+
+        ticket = submission.ticket
+        output_path = None
+
+        if self.share_sync is not None:
+            submission.filed_path = filed_ticket_path(
+                submission.results["e-ticket"], ticket["Date"], ticket["Signature"])
+            output_path = self._staging_folder(submission) / submission.filed_path.name
+
+        final_pdf_path = merge_ticket_pdf(
+            submission.results["pdf"], submission.results["e-ticket"], ticket["Date"], ticket["Signature"],
+            output_path)
+
+        if not submission.optimize:
+            self._file(submission, final_pdf_path)
+
+        return final_pdf_path
+
+    def _run_optimize(self, submission):
+        from data_manager.pdf_optimizer import optimize_pdf
+
+        pdf_path = submission.results["merge"]
+
+        # Runs before the PDF is shown or copied, as a viewer holding it
+        # open would stop it being replaced
+        try:
+            report = optimize_pdf(pdf_path)
+
+        except Exception as e:
+            # Optimizing is optional: a PDF it can't rewrite is filed as merged
+            print(f"Could not optimize {Path(pdf_path).name}, filing it as merged: {type(e).__name__}: {e}")
+            report = None
+
+        self._file(submission, pdf_path)
+
+        return report
+
+    def _file(self, submission, pdf_path):
+        """Send the finished ticket PDF to the share, if staged, and show it."""
+        if self.share_sync is not None:
+            self.share_sync.send(pdf_path, submission.filed_path)
+
+        # Same as process_ticket: show the filed ticket when it's ready
+        if hasattr(os, "startfile"):
+            os.startfile(pdf_path)
+
+    def _staging_folder(self, submission):
+        with self._lock:
+            if submission.staging_folder is None:
+                submission.staging_folder = self.share_sync.staging_folder(
+                    f"{submission.ticket['Job Number']} - {submission.ticket_number}")
+
+            return submission.staging_folder
+
+    def _run_listing(self, submission):
+        # The loaded dataframe belongs to the GUI thread, which mirrors the
+        # row once the stage is done (ExcelManager.record_written_rows)
+        with self._listing_lock:
+            return submission.excel_manager.insert_ticket(submission.ticket, record=False)
@@ -1,10 +1,30 @@
+import warnings
+import numpy as np
 import pandas as pd
 from data_manager.excel_manager import ExcelManager
+from data_manager.sheet_layout import LABOR_CATEGORIES
 # from excel_manager import ExcelManager
 
+# Frames stored in the workbook snapshot cache
+SNAPSHOT_FRAMES = (
+    "labor_summary",
+    "labor_ticket_summary",
+    "material_summary",
+    "material_ticket_summary",
+    "ticket_listing",
+    "material_catalog",
+)
+
+
 class TicketDataService:
-    def __init__(self, file_path=None):
+    def __init__(self, file_path=None, excel_manager=None, progress=None):
+        """
+        progress, if given, is called with each stage name ("labor",
+        "material", "listing") before that stage is built. It may raise to
+        abandon the build.
+        """
         self.file_path = file_path
+        self.progress = progress
         
         self.labor_summary = None
         self.labor_ticket_summary = None
@@ -13,17 +33,49 @@ class TicketDataService:
         self.material_ticket_summary = None
         
         self.ticket_listing = None
+        
+        # Every material with its rates and to-date totals, before the
+        # unused columns are dropped from material_summary
+        self.material_catalog = None
+        self.regular_sell_total = 0
 
-        self.excel_manager = ExcelManager(self.file_path)
+        # Reuse an already parsed workbook when the caller has one
+        if excel_manager is None:
+            excel_manager = ExcelManager(self.file_path)
+            
+        self.excel_manager = excel_manager
         
-        self.excel_manager.load()
+        if self.excel_manager.dataframe is None:
+            self.excel_manager.load()
+            
         self.job_number = self.excel_manager.job_number
         self.job_name = self.excel_manager.job_name
         self.job_address = self.excel_manager.job_address
         
-        self.build_labor_data()
-        self.build_material_data()
-        self.build_ticket_listing()
+        snapshot = self.excel_manager.snapshot
+        
+        if snapshot and all(name in snapshot for name in SNAPSHOT_FRAMES):
+            for name in SNAPSHOT_FRAMES:
+                setattr(self, name, snapshot[name])
+                
+            self.regular_sell_total = self._calculate_regular_sell_total()
+        else:
+            self._report_progress("labor")
+            self.build_labor_data()
+            
+            self._report_progress("material")
+            self.build_material_data()
+            
+            self._report_progress("listing")
+            self.build_ticket_listing()
+            
+            self.excel_manager.save_snapshot(
+                {name: getattr(self, name) for name in SNAPSHOT_FRAMES}
+                )
+        
+    def _report_progress(self, stage):
+        if self.progress is not None:
+            self.progress(stage)
         
     def build_labor_data(self):
         self._build_labor_summary()
@@ -51,7 +103,8 @@ class TicketDataService:
         )
         
     def _build_labor_summary(self):
-        df = self.excel_manager.dataframe.iloc[6:12, 11:17]
+        layout = self.excel_manager.layout
+        df = self.excel_manager.dataframe.iloc[layout.labor_block_rows, layout.labor_block_columns]
         df.columns = df.iloc[0]
         df = df[1:]
         df.reset_index(drop=True, inplace=True)
@@ -74,8 +127,12 @@ class TicketDataService:
         self.labor_summary = df
     
     def _build_labor_ticket_summary(self):
-        df = self.excel_manager.dataframe.iloc[13:, :17]
-        df = df.drop(df.columns[-6], axis=1)
+        layout = self.excel_manager.layout
+        labor_end = layout.labor_columns["DT DIFF"] + 1
+        
+        # Everything up to the labor hours, minus the "Hours" spacer before RT
+        df = self.excel_manager.dataframe.iloc[layout.header_row:, :labor_end]
+        df = df.drop(df.columns[layout.labor_columns["RT"] - 1], axis=1)
         
         df.columns = df.iloc[0]
         df = df[1:]
@@ -91,17 +148,15 @@ class TicketDataService:
         self.labor_ticket_summary = df
         
     def build_material_data(self):
-        row5 = self.excel_manager.dataframe.iloc[5]
-        
-        col_index = row5[row5=="Structure Material #"].index[0]
-        col_pos = self.excel_manager.dataframe.columns.get_loc(col_index)
+        layout = self.excel_manager.layout
+        col_pos = layout.material_label_column
         
         self.material_summary = self._build_material_summary(col_pos)
         
         self.material_ticket_summary = self._build_material_ticket_summary(col_pos)
         
         # Update summary up to date columns
-        first_item = '1/4 UNDERLAYMENT 4 X 5"'
+        first_item = layout.first_material
         sliced_ticket_summary = self.material_ticket_summary.loc[:, first_item:]
         
         numeric_slice = sliced_ticket_summary.apply(pd.to_numeric, errors='coerce')
@@ -116,6 +171,8 @@ class TicketDataService:
         sell_to_date_row = self.material_summary.loc["Material Counts to Date"] * self.material_summary.loc["Sell Per Unit"]
         self.material_summary.loc["Sell to Date"] = sell_to_date_row
         
+        self.material_catalog = self.material_summary.copy()
+        
         #Drop zero columns
         
         zero_columns = self.material_summary.loc["Material Counts to Date"] == 0
@@ -140,6 +197,7 @@ class TicketDataService:
             # Rebuild a safe blank summary with required rows + headers
             self.material_summary = (
                 pd.DataFrame(
+                    0,
                     index=[
                         "Cost Per Unit (w/Tax)",
                         "Sell Per Unit",
@@ -148,7 +206,7 @@ class TicketDataService:
                         "Sell to Date"
                     ],
                     columns=STANDARD_MATERIAL_HEADERS
-                ).fillna(0)
+                )
             )
     
         if len(self.material_ticket_summary.columns) == 0:
@@ -180,7 +238,8 @@ class TicketDataService:
         
         
     def _build_material_summary(self, col_pos):
-        df = self.excel_manager.dataframe.iloc[6:12, col_pos:]
+        rows = self.excel_manager.layout.material_block_rows
+        df = self.excel_manager.dataframe.iloc[rows, col_pos:]
         df.columns = df.iloc[0]
         df = df[1:]
         df.reset_index(drop=True, inplace=True)
@@ -190,10 +249,12 @@ class TicketDataService:
     
     def _build_material_ticket_summary(self, col_pos):
         df = self.excel_manager.dataframe
+        layout = self.excel_manager.layout
         
-        list_indices = [*range(0,9), *range(col_pos +1, len(df.columns))]
+        info_end = layout.header_columns["Material Cost"] + 1
+        list_indices = [*range(0, info_end), *range(col_pos +1, len(df.columns))]
         
-        material_ticket_df = df.iloc[13:, list_indices]
+        material_ticket_df = df.iloc[layout.header_row:, list_indices]
         
         start_pos = list_indices.index(col_pos + 1) 
         
@@ -206,7 +267,8 @@ class TicketDataService:
         return material_ticket_df
         
     def _create_material_ticket_headers(self, df, col_pos, start_pos):
-        material_headers = self.excel_manager.dataframe.iloc[6, col_pos + 1 :].values
+        header_row = self.excel_manager.layout.material_header_row
+        material_headers = self.excel_manager.dataframe.iloc[header_row, col_pos + 1 :].values
         
         df.iloc[0, start_pos:] = material_headers
         
@@ -225,22 +287,360 @@ class TicketDataService:
         self.ticket_listing["Total Sell"] = self.ticket_listing["Labor Sell"] + self.ticket_listing["Material Sell"]
         self.ticket_listing["Total Cost"] = self.ticket_listing["Labor Cost"] + self.ticket_listing["Material Cost"]
         
-    def calculate_nte_ratio(self):
-        if self.excel_manager.nte is None:
-            return "N/A"
+        self.regular_sell_total = self._calculate_regular_sell_total()
         
-        if self.ticket_listing is None:
-            raise ValueError("Ticket listing is not built yet.")
-                
+    def _calculate_regular_sell_total(self):
         type_col = "Type\n(Regular, Extra)"
         
         regular_tickets = self.ticket_listing[
             self.ticket_listing[type_col].str.upper() == "REGULAR"
         ]
 
-        total_sell_sum = regular_tickets["Total Sell"].sum()
+        return regular_tickets["Total Sell"].sum()
+        
+    def calculate_nte_ratio(self):
+        if self.excel_manager.nte is None:
+            return "N/A"
+        
+        if self.ticket_listing is None:
+            raise ValueError("Ticket listing is not built yet.")
+
+        total_sell_sum = self.regular_sell_total
         
         return total_sell_sum / self.excel_manager.nte if total_sell_sum else 0
+    
+    def apply_ticket(self, ticket):
+        """
+        Apply a ticket that was just written with ExcelManager.insert_ticket
+        to every frame, without rebuilding them from the workbook.
+        """
+        # An empty listing's frames are placeholders with no material
+        # columns to extend. Building them from the loaded dataframe, which
+        # already has the new row, costs no more than applying it.
+        if self.labor_ticket_summary.empty:
+            self.build_labor_data()
+            self.build_material_data()
+            self.build_ticket_listing()
+            return
+        
+        safe_float = self.excel_manager._safe_float
+        
+        ticket_number = ticket["Ticket Number"]
+        
+        ticket_date = pd.to_datetime(pd.Series([ticket["Date"]]), errors="coerce").dt.strftime("%m/%d/%Y")
+        info = [ticket_date.iloc[0], ticket["Signature"], ticket["Type"], ticket["Description"]]
+        
+        hours = [safe_float(ticket["Labor"][category]["hours"]) for category in LABOR_CATEGORIES]
+        
+        # Same matching as ExcelManager._insert_materials, unknown materials are skipped
+        material_columns = {str(column).strip(): column for column in self.material_catalog.columns}
+        quantities = {}
+        
+        for material_object in ticket["Materials"]:
+            column = material_columns.get(material_object["material"].strip())
+            
+            if column is not None:
+                quantities[column] = safe_float(material_object["quantity"])
+        
+        labor_row = self._apply_labor(ticket_number, info, hours)
+        material_row = self._apply_materials(ticket_number, info, quantities)
+        self._apply_ticket_listing(ticket_number, info, labor_row, material_row)
+        
+    def _new_ticket_row(self, frame, ticket_number, info):
+        row = pd.DataFrame(np.nan, index=pd.Index([ticket_number], name=frame.index.name),
+                           columns=frame.columns, dtype=object)
+        
+        # Ticket info is always the leading columns, in sheet order
+        row.iloc[0, :len(info)] = info
+        
+        return row
+        
+    def _append_row(self, frame, row):
+        """
+        frame with row added at the end. This copies the frame, as pandas
+        columns can't grow in place, so it is O(rows) rather than O(items on
+        the ticket): about 3 ms for an 8000-ticket listing, against seconds
+        for a rebuild.
+        """
+        with warnings.catch_warnings():
+            # Empty cells in the new row shouldn't change the column dtypes
+            warnings.simplefilter("ignore", FutureWarning)
+            return pd.concat([frame, row])
+        
+    def _apply_labor(self, ticket_number, info, hours):
+        row = self._new_ticket_row(self.labor_ticket_summary, ticket_number, info)
+        
+        row.loc[:, "RT":] = [hours]
+        
+        cost_per_unit = self.labor_summary.loc["Cost Per Unit (w/Tax)", "RT":]
+        row["Labor Cost"] = row.loc[:, "RT":].multiply(cost_per_unit, axis=1).sum(axis=1)
+        
+        sell_per_unit = self.labor_summary.loc["Sell Per Unit", "RT":]
+        row["Labor Sell"] = row.loc[:, "RT":].multiply(sell_per_unit, axis=1).sum(axis=1)
+        
+        self.labor_ticket_summary = self._append_row(self.labor_ticket_summary, row)
+        
+        # Summary rows only cover the five labor categories
+        self.labor_summary.loc["Hours to Date"] = self.labor_summary.loc["Hours to Date"].to_numpy() + hours
+        
+        cost_to_date_row = self.labor_summary.loc["Hours to Date"] * self.labor_summary.loc["Cost Per Unit (w/Tax)"]
+        self.labor_summary.loc["Cost to Date"] = cost_to_date_row
+        
+        sell_to_date_row = self.labor_summary.loc["Hours to Date"] * self.labor_summary.loc["Sell Per Unit"]
+        self.labor_summary.loc["Sell to Date"] = sell_to_date_row
+        
+        return row.iloc[0]
+    
+    def _apply_materials(self, ticket_number, info, quantities):
+        safe_float = self.excel_manager._safe_float
+        catalog = self.material_catalog
+        
+        material_cost = 0
+        material_sell = 0
+        
+        for column, quantity in quantities.items():
+            cost_per_unit = safe_float(catalog.loc["Cost Per Unit (w/Tax)", column])
+            sell_per_unit = safe_float(catalog.loc["Sell Per Unit", column])
+            
+            material_cost += quantity * cost_per_unit
+            material_sell += quantity * sell_per_unit
+            
+            count = safe_float(catalog.loc["Material Counts to Date", column]) + quantity
+            catalog.loc["Material Counts to Date", column] = count
+            catalog.loc["Cost to Date", column] = count * catalog.loc["Cost Per Unit (w/Tax)", column]
+            catalog.loc["Sell to Date", column] = count * catalog.loc["Sell Per Unit", column]
+        
+        summary_counts = self.material_summary.loc["Material Counts to Date"]
+        showing_placeholder = bool((summary_counts == 0).all())
+        new_columns = [column for column in quantities if column not in self.material_summary.columns]
+        
+        if new_columns or showing_placeholder:
+            self._add_material_columns(new_columns, showing_placeholder)
+        else:
+            for column in quantities:
+                self.material_summary.loc[:, column] = catalog.loc[self.material_summary.index, column]
+        
+        row = self._new_ticket_row(self.material_ticket_summary, ticket_number, info)
+        
+        for column, quantity in quantities.items():
+            row[column] = quantity
+            
+        row["Material Cost"] = material_cost
+        row["Material Sell"] = material_sell
+        
+        self.material_ticket_summary = self._append_row(self.material_ticket_summary, row)
+        
+        return row.iloc[0]
+    
+    def _add_material_columns(self, new_columns, showing_placeholder):
+        """Bring materials used for the first time back into the filtered frames."""
+        counts = self.material_catalog.loc["Material Counts to Date"]
+        used_columns = counts.index[counts != 0]
+        
+        self.material_summary = self.material_catalog.loc[:, used_columns].copy()
+        
+        if showing_placeholder:
+            # Drop the standard headers shown while nothing had been used
+            placeholder_columns = [
+                column for column in self.material_ticket_summary.columns
+                if column not in self.material_catalog.columns
+                and column not in ("Material Cost", "Material Sell")
+                and self.material_ticket_summary[column].isna().all()
+                ]
+            self.material_ticket_summary = self.material_ticket_summary.drop(columns=placeholder_columns)
+        
+        # Insert each new column after the closest used material before it
+        for column in new_columns:
+            position = used_columns.get_loc(column)
+            previous_columns = [
+                previous for previous in used_columns[:position]
+                if previous in self.material_ticket_summary.columns
+                ]
+            
+            if previous_columns:
+                insert_at = self.material_ticket_summary.columns.get_loc(previous_columns[-1]) + 1
+            else:
+                insert_at = self.material_ticket_summary.columns.get_loc("Material Cost") + 1
+                
+            self.material_ticket_summary.insert(insert_at, column, np.nan)
+    
+    def _apply_ticket_listing(self, ticket_number, info, labor_row, material_row):
+        row = self._new_ticket_row(self.ticket_listing, ticket_number, info)
+        
+        row["Labor Sell"] = labor_row["Labor Sell"]
+        row["Labor Cost"] = labor_row["Labor Cost"]
+        row["Material Sell"] = material_row["Material Sell"]
+        row["Material Cost"] = material_row["Material Cost"]
+        row["Total Sell"] = row["Labor Sell"] + row["Material Sell"]
+        row["Total Cost"] = row["Labor Cost"] + row["Material Cost"]
+        
+        self.ticket_listing = self._append_row(self.ticket_listing, row)
+        
+        if str(info[2]).upper() == "REGULAR":
+            self.regular_sell_total += row["Total Sell"].iloc[0]
+    
+    def sync_with_workbook(self, dataframe, source=None):
+        """
+        Bring the frames in line with a fresh read of the workbook by
+        applying only the ticket rows that were added, changed or removed.
+        source is what ExcelManager.reread returned with dataframe.
+        
+        Returns {"added": n, "changed": n, "removed": n}, or None when the
+        frames need a full rebuild instead (the template area changed, or
+        the frames don't line up with the sheet rows).
+        """
+        manager = self.excel_manager
+        
+        if not manager.same_template(dataframe):
+            return None
+        
+        old_rows = manager.ticket_row_hashes()
+        new_rows = manager.ticket_row_hashes(dataframe)
+        
+        old_keys = list(old_rows)
+        frame_keys = [manager._cell_key(ticket) for ticket in self.labor_ticket_summary.index]
+        
+        # An empty listing's placeholder frames are only built, never applied to
+        if not old_keys and new_rows:
+            return None
+        
+        if frame_keys != [ticket for ticket, _ in old_keys] or len(self.material_ticket_summary) != len(old_keys):
+            return None
+        
+        changed = [key for key in old_keys if key in new_rows and new_rows[key][0] != old_rows[key][0]]
+        removed = [key for key in old_keys if key not in new_rows]
+        added = [key for key in new_rows if key not in old_rows]
+        
+        if changed or removed:
+            old_positions = {key: position for position, key in enumerate(old_keys)}
+            
+            if not self._remove_rows(sorted(old_positions[key] for key in changed + removed)):
+                return None
+        
+        # Changed rows are applied again from their new values
+        outdated = set(changed) | set(removed)
+        frame_keys = [key for key in old_keys if key not in outdated]
+        
+        for key in new_rows:
+            if key in old_rows and key not in changed:
+                continue
+            
+            self.apply_ticket(manager.ticket_from_row(dataframe.iloc[new_rows[key][1]]))
+            frame_keys.append(key)
+        
+        # Appended rows go back to their place in the sheet
+        new_positions = {key: position for position, key in enumerate(new_rows)}
+        order = np.argsort([new_positions[key] for key in frame_keys], kind="stable")
+        
+        self.labor_ticket_summary = self.labor_ticket_summary.iloc[order]
+        self.material_ticket_summary = self.material_ticket_summary.iloc[order]
+        self.ticket_listing = self.ticket_listing.iloc[order]
+        
+        self.regular_sell_total = self._calculate_regular_sell_total()
+        
+        manager.replace_dataframe(dataframe, source)
+        manager.save_snapshot({name: getattr(self, name) for name in SNAPSHOT_FRAMES})
+        
+        return {"added": len(added), "changed": len(changed), "removed": len(removed)}
+    
+    def _remove_rows(self, positions):
+        """
+        Take ticket rows (by position) out of every frame and their hours and
+        material counts out of the summaries. Returns False when that empties
+        the material summary, which only a rebuild restores correctly.
+        """
+        safe_float = self.excel_manager._safe_float
+        
+        keep = np.ones(len(self.labor_ticket_summary), dtype=bool)
+        keep[positions] = False
+        
+        # Labor hours
+        hours = self.labor_ticket_summary.iloc[positions].loc[:, "RT":]
+        hours = hours.apply(pd.to_numeric, errors="coerce").sum().to_numpy()
+        
+        self.labor_summary.loc["Hours to Date"] = self.labor_summary.loc["Hours to Date"].to_numpy() - hours
+        self.labor_summary.loc["Cost to Date"] = self.labor_summary.loc["Hours to Date"] * self.labor_summary.loc["Cost Per Unit (w/Tax)"]
+        self.labor_summary.loc["Sell to Date"] = self.labor_summary.loc["Hours to Date"] * self.labor_summary.loc["Sell Per Unit"]
+        
+        # Material counts
+        catalog = self.material_catalog
+        material_columns = [column for column in self.material_ticket_summary.columns if column in catalog.columns]
+        
+        quantities = self.material_ticket_summary.iloc[positions].loc[:, material_columns]
+        quantities = quantities.apply(pd.to_numeric, errors="coerce").sum()
+        
+        for column, quantity in quantities.items():
+            if not quantity:
+                continue
+            
+            count = safe_float(catalog.loc["Material Counts to Date", column]) - quantity
+            count = 0 if np.isclose(count, 0) else count
+            
+            catalog.loc["Material Counts to Date", column] = count
+            catalog.loc["Cost to Date", column] = count * catalog.loc["Cost Per Unit (w/Tax)", column]
+            catalog.loc["Sell to Date", column] = count * catalog.loc["Sell Per Unit", column]
+        
+        self.labor_ticket_summary = self.labor_ticket_summary[keep]
+        self.material_ticket_summary = self.material_ticket_summary[keep]
+        self.ticket_listing = self.ticket_listing[keep]
+        
+        # Materials no longer used drop out, as in build_material_data
+        counts = catalog.loc["Material Counts to Date"]
+        used_columns = counts.index[counts != 0]
+        
+        if len(used_columns) == 0:
+            return False
+        
+        unused_columns = [column for column in material_columns if column not in used_columns]
+        
+        self.material_summary = catalog.loc[:, used_columns].copy()
+        self.material_ticket_summary = self.material_ticket_summary.drop(columns=unused_columns)
+        
+        return True
+    
+    def compare_with_rebuild(self):
+        """
+        Rebuild every frame from the workbook on disk and list where the
+        incrementally updated frames disagree. An empty list means they match.
+        """
+        rebuilt = TicketDataService(self.file_path)
+        mismatches = []
+        
+        for name in SNAPSHOT_FRAMES:
+            try:
+                pd.testing.assert_frame_equal(
+                    self._comparable(getattr(self, name)),
+                    self._comparable(getattr(rebuilt, name)),
+                    check_dtype=False,
+                    check_names=False,
+                    )
+            except AssertionError as e:
+                mismatches.append(f"{name}: {e}")
+        
+        if not np.isclose(self.regular_sell_total, rebuilt.regular_sell_total):
+            mismatches.append(
+                f"regular_sell_total: {self.regular_sell_total} != {rebuilt.regular_sell_total}"
+                )
+        
+        return mismatches
+    
+    def _comparable(self, frame):
+        """Numeric columns as floats, everything else as text."""
+        columns = []
+        
+        for _, values in frame.items():
+            numeric = pd.to_numeric(values, errors="coerce")
+            
+            if numeric.notna().sum() == values.notna().sum():
+                columns.append(numeric.astype(float))
+            else:
+                columns.append(values.astype(str))
+        
+        comparable = pd.concat(columns, axis=1, ignore_index=True)
+        comparable.columns = [str(column) for column in frame.columns]
+        comparable.index = frame.index.astype(str)
+        
+        return comparable
         
         
 
@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+"""
+Index of the scanned tickets in a job's work-station folder.
+
+    python -m data_manager.ticket_scan_index "F:\\USERS\\Pedro L\\Ticket Work Station\\1234" listing.xlsx
+
+Busy jobs have thousands of "TICKET <n> SIGNED ....pdf" scans, so instead of
+globbing the folder for every ticket, each folder is listed once into a
+ticket number -> scans map. Lookups stat the folder and only list it again
+when its mtime has moved, applying just the files added or removed since.
+"""
+import os
+import re
+import sys
+import threading
+from pathlib import Path
+
+TICKET_SCAN_PATTERN = re.compile(r"^TICKET (\S+) (SIGNED|UNSIGNED).*\.pdf$", re.IGNORECASE)
+
+
+def ticket_key(ticket_number):
+    """
+    Ticket number as the index keys it. The listing can hold 40691.0 for the
+    scan named "TICKET 040691 SIGNED.pdf", so numbers lose their leading
+    zeros and any trailing ".0".
+    """
+    if isinstance(ticket_number, float) and ticket_number.is_integer():
+        ticket_number = int(ticket_number)
+
+    key = str(ticket_number).strip()
+
+    if key.isdigit():
+        key = key.lstrip("0") or "0"
+
+    return key
+
+
+def _scan_order(name):
+    # Same preference as the old globs: SIGNED scans before UNSIGNED ones
+    return (TICKET_SCAN_PATTERN.match(name).group(2).upper() != "SIGNED", name)
+
+
+class TicketScanIndex:
+    def __init__(self, job_folder):
+        self.job_folder = Path(job_folder)
+
+        self.files = {}     # scan file name -> ticket key
+        self.tickets = {}   # ticket key -> scan file names, preferred first
+        self.mtime = None
+        self.scans = 0
+
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        """
+        Bring the index up to date if the folder changed since the last
+        listing. Returns (added, removed) file names, empty when it didn't.
+        """
+        with self._lock:
+            # Stat before listing, so a file added mid-listing moves the
+            # mtime again and is picked up next time
+            mtime = os.stat(self.job_folder).st_mtime_ns
+            if mtime == self.mtime:
+                return [], []
+
+            names = {}
+            with os.scandir(self.job_folder) as entries:
+                for entry in entries:
+                    match = TICKET_SCAN_PATTERN.match(entry.name)
+                    if match and entry.is_file():
+                        names[entry.name] = ticket_key(match.group(1))
+
+            added = [name for name in names if name not in self.files]
+            removed = [name for name in self.files if name not in names]
+            changed = set()
+
+            for name in removed:
+                key = self.files.pop(name)
+                self.tickets[key].remove(name)
+                if not self.tickets[key]:
+                    del self.tickets[key]
+                changed.add(key)
+
+            for name in added:
+                key = names[name]
+                self.files[name] = key
+                self.tickets.setdefault(key, []).append(name)
+                changed.add(key)
+
+            for key in changed:
+                if key in self.tickets:
+                    self.tickets[key].sort(key=_scan_order)
+
+            self.mtime = mtime
+            self.scans += 1
+
+            return added, removed
+
+    def find(self, ticket_number):
+        """The preferred scan for ticket_number."""
+        scans = self.scans_for(ticket_number)
+
+        if not scans:
+            raise FileNotFoundError(
+                f"No pdf found for Ticket {ticket_number}"
+            )
+
+        return scans[0]
+
+    def scans_for(self, ticket_number):
+        """Every scan of ticket_number, SIGNED ones first."""
+        self.refresh()
+        return [self.job_folder / name for name in self.tickets.get(ticket_key(ticket_number), [])]
+
+    def scanned(self):
+        """Ticket keys that have at least one scan."""
+        self.refresh()
+        return set(self.tickets)
+
+    def missing(self, ticket_numbers):
+        """The ticket numbers, in the order given, that have no scan yet."""
+        self.refresh()
+        return [ticket_number for ticket_number in ticket_numbers
+                if ticket_key(ticket_number) not in self.tickets]
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def scan_index(job_folder):
+    """The shared index of job_folder, listed on first use."""
+    key = str(Path(job_folder).resolve()).lower()
+
+    with _indexes_lock:
+        if key not in _indexes:
+            _indexes[key] = TicketScanIndex(job_folder)
+
+        return _indexes[key]
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Usage: python -m data_manager.ticket_scan_index <job folder> <ticket listing.xlsx>")
+        sys.exit(2)
+
+    from data_manager.excel_manager import ExcelManager
+
+    manager = ExcelManager(sys.argv[2])
+    manager.load()
+
+    ticket_numbers = list(dict.fromkeys(ticket for ticket, _ in manager.ticket_row_hashes()))
+
+    index = scan_index(sys.argv[1])
+    missing = index.missing(ticket_numbers)
+
+    print(f"{len(index.files)} scans for {len(index.tickets)} tickets in {index.job_folder}")
+    print(f"{len(ticket_numbers) - len(missing)} of {len(ticket_numbers)} listed tickets are scanned")
+
+    for ticket_number in missing:
+        print(f"  No scan for Ticket {ticket_key(ticket_number)}")
+
+    sys.exit(1 if missing else 0)
@@ -0,0 +1,367 @@
+# -*- coding: utf-8 -*-
+"""
+Fast path for writing ticket rows into a listing.
+
+Rather than loading the whole workbook into openpyxl and re-serializing
+every part, only the target sheet's XML is streamed through and the new
+rows are spliced in at their row index. Every other zip entry keeps its
+contents byte for byte; it is recompressed rather than copied raw, as
+zipfile has no public way to copy compressed data. Anything the scanner
+doesn't recognise raises UnsupportedSheetLayout so the caller can fall
+back to openpyxl.
+"""
+import os
+import re
+import zipfile
+import tempfile
+import posixpath
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+from openpyxl.utils import get_column_letter, column_index_from_string
+
+MAIN_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+REL_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+PACKAGE_REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+
+CHUNK_SIZE = 1024 * 1024
+
+ROW_NUMBER = re.compile(rb'\sr="(\d+)"')
+CELL = re.compile(rb'<c\b[^>]*?(?:/>|>.*?</c>)', re.DOTALL)
+CELL_REF = re.compile(rb'\sr="([A-Z]+)(\d+)"')
+CELL_STYLE = re.compile(rb'\ss="(\d+)"')
+SPANS = re.compile(rb'\sspans="[^"]*"')
+DIMENSION = re.compile(rb'<dimension ref="([A-Z]+)(\d+)(?::([A-Z]+)(\d+))?"\s*/>')
+CALC_PR = re.compile(rb'<calcPr\b[^>]*?/>')
+WHITESPACE = re.compile(rb'\s*')
+
+
+class UnsupportedSheetLayout(Exception):
+    """The sheet XML isn't in a shape the fast path can safely patch."""
+
+
+def append_rows(path, sheet_name, rows):
+    """
+    Write {row_number: {column_number: value}} into sheet_name of the
+    .xlsx at path, replacing the file atomically.
+    """
+    path = Path(path)
+
+    with zipfile.ZipFile(path) as source_zip:
+        sheet_part = find_sheet_part(source_zip, sheet_name)
+
+        handle, temp_name = tempfile.mkstemp(suffix=".xlsx", dir=path.parent)
+        os.close(handle)
+
+        try:
+            with zipfile.ZipFile(temp_name, "w") as target_zip:
+                for info in source_zip.infolist():
+                    if info.filename == sheet_part:
+                        with source_zip.open(info) as source, \
+                                target_zip.open(_copy_info(info), "w", force_zip64=True) as target:
+                            buffered_target = _BufferedTarget(target)
+                            patch_sheet(source, buffered_target, rows)
+                            buffered_target.flush()
+
+                    elif info.filename == "xl/workbook.xml":
+                        target_zip.writestr(_copy_info(info), _request_recalculation(source_zip.read(info)))
+
+                    else:
+                        target_zip.writestr(_copy_info(info), source_zip.read(info))
+
+            os.replace(temp_name, path)
+
+        except BaseException:
+            Path(temp_name).unlink(missing_ok=True)
+            raise
+
+
+def find_sheet_part(source_zip, sheet_name):
+    """Zip entry name of the worksheet called sheet_name."""
+    try:
+        workbook = ET.fromstring(source_zip.read("xl/workbook.xml"))
+        relationships = ET.fromstring(source_zip.read("xl/_rels/workbook.xml.rels"))
+    except (KeyError, ET.ParseError) as e:
+        raise UnsupportedSheetLayout(f"Unreadable workbook parts: {e}")
+
+    relationship_id = None
+    for sheet in workbook.iter(f"{{{MAIN_NS}}}sheet"):
+        if sheet.get("name") == sheet_name:
+            relationship_id = sheet.get(f"{{{REL_NS}}}id")
+
+    if relationship_id is None:
+        raise ValueError(f"The Excel file does not contain a '{sheet_name}' sheet.")
+
+    for relationship in relationships.iter(f"{{{PACKAGE_REL_NS}}}Relationship"):
+        if relationship.get("Id") == relationship_id:
+            target = relationship.get("Target")
+
+            if target.startswith("/"):
+                return target.lstrip("/")
+            return posixpath.normpath(posixpath.join("xl", target))
+
+    raise UnsupportedSheetLayout(f"No relationship for sheet '{sheet_name}'")
+
+
+def patch_sheet(source, target, rows):
+    """Stream sheet XML from source to target with rows merged in."""
+    stream = _XmlStream(source)
+    pending = sorted(rows)
+
+    # Everything before <sheetData> is copied, with the dimension widened
+    start = stream.find(b"<sheetData")
+    if start == -1:
+        raise UnsupportedSheetLayout("No <sheetData> element")
+
+    target.write(_widen_dimension(stream.take(start), rows))
+
+    tag_end = stream.require(b">")
+    tag = stream.take(tag_end + 1)
+
+    if tag.endswith(b"/>"):
+        target.write(tag[:-2].rstrip() + b">")
+        for row_number in pending:
+            target.write(build_row(row_number, rows[row_number]))
+        target.write(b"</sheetData>")
+        stream.copy_rest(target)
+        return
+
+    target.write(tag)
+    previous_row = 0
+
+    while True:
+        target.write(stream.take_whitespace())
+
+        if stream.startswith(b"</sheetData>"):
+            break
+
+        if not stream.startswith(b"<row") or stream.peek(5)[4:5] not in (b" ", b">"):
+            raise UnsupportedSheetLayout("Unexpected element in <sheetData>")
+
+        tag_end = stream.require(b">")
+        row_tag = stream.peek(tag_end + 1)
+
+        match = ROW_NUMBER.search(row_tag)
+        if not match:
+            raise UnsupportedSheetLayout("Row without an r attribute")
+
+        row_number = int(match.group(1))
+        if row_number <= previous_row:
+            raise UnsupportedSheetLayout("Rows out of order")
+        previous_row = row_number
+
+        if row_tag.endswith(b"/>"):
+            element_end = tag_end + 1
+        else:
+            element_end = stream.require(b"</row>") + len(b"</row>")
+
+        while pending and pending[0] < row_number:
+            new_row = pending.pop(0)
+            target.write(build_row(new_row, rows[new_row]))
+
+        element = stream.take(element_end)
+
+        if pending and pending[0] == row_number:
+            pending.pop(0)
+            element = merge_row(element, row_number, rows[row_number])
+
+        target.write(element)
+
+    for new_row in pending:
+        target.write(build_row(new_row, rows[new_row]))
+
+    stream.copy_rest(target)
+
+
+def build_row(row_number, values):
+    cells = b"".join(build_cell(row_number, column, value) for column, value in sorted(values.items()))
+    return b'<row r="%d">%s</row>' % (row_number, cells)
+
+
+def build_cell(row_number, column, value, style=None):
+    reference = f"{get_column_letter(column)}{row_number}".encode("ascii")
+    style_attribute = b' s="%s"' % style if style else b""
+
+    if value is None:
+        return b'<c r="%s"%s/>' % (reference, style_attribute)
+
+    if isinstance(value, bool):
+        return b'<c r="%s"%s t="b"><v>%d</v></c>' % (reference, style_attribute, value)
+
+    if isinstance(value, (int, float)):
+        return b'<c r="%s"%s><v>%s</v></c>' % (reference, style_attribute, repr(value).encode("ascii"))
+
+    text = escape(str(value)).encode("utf-8")
+    space = b' xml:space="preserve"' if text != text.strip() else b""
+
+    return b'<c r="%s"%s t="inlineStr"><is><t%s>%s</t></is></c>' % (
+        reference, style_attribute, space, text)
+
+
+def merge_row(element, row_number, values):
+    """Write values into an existing (usually formatted but empty) row."""
+    if element.rstrip().endswith(b"/>") and b"</row>" not in element:
+        row_tag, body = element[:-2].rstrip() + b">", b""
+    else:
+        tag_end = element.index(b">")
+        row_tag, body = element[:tag_end + 1], element[tag_end + 1:element.rindex(b"</row>")]
+
+    cells = {}
+    for match in CELL.finditer(body):
+        reference = CELL_REF.search(match.group(0)[:match.group(0).index(b">") + 1])
+        if not reference or int(reference.group(2)) != row_number:
+            raise UnsupportedSheetLayout(f"Unrecognised cell in row {row_number}")
+        cells[column_index_from_string(reference.group(1).decode("ascii"))] = match.group(0)
+
+    if CELL.sub(b"", body).strip():
+        raise UnsupportedSheetLayout(f"Unrecognised content in row {row_number}")
+
+    for column, value in values.items():
+        style = None
+        if column in cells:
+            existing = cells[column]
+            style_match = CELL_STYLE.search(existing[:existing.index(b">") + 1])
+            style = style_match.group(1) if style_match else None
+
+        cells[column] = build_cell(row_number, column, value, style)
+
+    # Spans are only a load hint and may no longer cover the new cells
+    row_tag = SPANS.sub(b"", row_tag)
+
+    return row_tag + b"".join(cells[column] for column in sorted(cells)) + b"</row>"
+
+
+def _widen_dimension(head, rows):
+    match = DIMENSION.search(head)
+    if not match or not rows:
+        return head
+
+    first_column, first_row, last_column, last_row = match.groups()
+    last_column = last_column or first_column
+    last_row = last_row or first_row
+
+    new_columns = [column for values in rows.values() for column in values]
+    max_column = max([column_index_from_string(last_column.decode("ascii")), *new_columns])
+    max_row = max(int(last_row), max(rows))
+
+    reference = b"%s%s:%s%d" % (first_column, first_row, get_column_letter(max_column).encode("ascii"), max_row)
+
+    return head[:match.start()] + b'<dimension ref="%s"/>' % reference + head[match.end():]
+
+
+def _request_recalculation(workbook_xml):
+    """Ask Excel to recalculate on open, since formulas depend on the new rows."""
+    match = CALC_PR.search(workbook_xml)
+
+    if match is None:
+        return workbook_xml.replace(b"</workbook>", b'<calcPr fullCalcOnLoad="1"/></workbook>')
+
+    calc_pr = match.group(0)
+    if b"fullCalcOnLoad=" in calc_pr:
+        calc_pr = re.sub(rb'fullCalcOnLoad="[^"]*"', b'fullCalcOnLoad="1"', calc_pr)
+    else:
+        calc_pr = calc_pr[:-2].rstrip() + b' fullCalcOnLoad="1"/>'
+
+    return workbook_xml[:match.start()] + calc_pr + workbook_xml[match.end():]
+
+
+def _copy_info(info):
+    copied = zipfile.ZipInfo(info.filename, date_time=info.date_time)
+    copied.compress_type = info.compress_type
+    copied.external_attr = info.external_attr
+    copied.create_system = info.create_system
+    return copied
+
+
+class _BufferedTarget:
+    """Collects the many small row writes into chunk-sized zip writes."""
+
+    def __init__(self, target):
+        self.target = target
+        self.parts = []
+        self.size = 0
+
+    def write(self, data):
+        self.parts.append(data)
+        self.size += len(data)
+
+        if self.size >= CHUNK_SIZE:
+            self.flush()
+
+    def flush(self):
+        self.target.write(b"".join(self.parts))
+        self.parts = []
+        self.size = 0
+
+
+class _XmlStream:
+    """Byte buffer over a file object that reads ahead only as far as needed."""
+
+    def __init__(self, source):
+        self.source = source
+        self.buffer = b""
+        self.position = 0
+        self.eof = False
+
+    def _fill(self):
+        if self.eof:
+            return False
+
+        chunk = self.source.read(CHUNK_SIZE)
+        if not chunk:
+            self.eof = True
+            return False
+
+        # Drop what has already been consumed before growing the buffer
+        self.buffer = self.buffer[self.position:] + chunk
+        self.position = 0
+        return True
+
+    def find(self, token):
+        """Offset of token from the current position, or -1 if the XML ends first."""
+        searched = 0
+        while True:
+            index = self.buffer.find(token, self.position + searched)
+            if index != -1:
+                return index - self.position
+
+            searched = max(0, len(self.buffer) - self.position - len(token) + 1)
+            if not self._fill():
+                return -1
+
+    def require(self, token):
+        index = self.find(token)
+        if index == -1:
+            raise UnsupportedSheetLayout(f"Truncated sheet XML, expected {token!r}")
+        return index
+
+    def peek(self, size):
+        while len(self.buffer) - self.position < size and self._fill():
+            pass
+        return self.buffer[self.position:self.position + size]
+
+    def startswith(self, prefix):
+        return self.peek(len(prefix)) == prefix
+
+    def take(self, size):
+        data = self.peek(size)
+        self.position += len(data)
+        return data
+
+    def take_whitespace(self):
+        while True:
+            end = WHITESPACE.match(self.buffer, self.position).end()
+            if end < len(self.buffer):
+                return self.take(end - self.position)
+
+            if not self._fill():
+                raise UnsupportedSheetLayout("Unterminated <sheetData>")
+
+    def copy_rest(self, target):
+        target.write(self.buffer[self.position:])
+        self.buffer = b""
+        self.position = 0
+
+        for chunk in iter(lambda: self.source.read(CHUNK_SIZE), b""):
+            target.write(chunk)
@@ -7,23 +7,28 @@ import os
 import re
 import traceback
 
-from data_manager.e_ticket_creator import ETicketCreator
-from data_manager.pdf_creator import excel_to_pdf, process_ticket
+# Before the Qt and data_manager imports, so they are timed too
+if "--profile-startup" in sys.argv:
+    from data_manager.startup_profile import StartupProfile
+    startup_profile = StartupProfile.install()
+else:
+    startup_profile = None
+
+from data_manager.submission_queue import SubmissionQueue, STAGES, DONE, FAILED, SKIPPED
+from data_manager.share_sync import ShareSync
 
 from qtpy.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-    QPushButton, QLabel, QTableWidget, QTableWidgetItem, QFileDialog,
-    QTabWidget, QMessageBox, QHeaderView, QDialog, QLineEdit, QComboBox,
+    QPushButton, QLabel, QTableView, QFileDialog,
+    QTabWidget, QMessageBox, QHeaderView, QDialog, QDateEdit, QLineEdit, QComboBox,
     QTextEdit, QFormLayout, QListWidget, QListWidgetItem, QSpinBox,
-    QDoubleSpinBox, QScrollArea, QCompleter, QCheckBox
+    QDoubleSpinBox, QScrollArea, QCompleter, QCheckBox, QProgressBar
 )
-from qtpy.QtCore import Qt
-from qtpy.QtGui import QFont
-
-import numpy as np
-
-# Config needed for distribution
-np.__config__
+from qtpy.QtCore import (
+    Qt, QAbstractTableModel, QSortFilterProxyModel, QModelIndex, QThread, Signal, QDate,
+    QFileSystemWatcher, QTimer, QObject
+)
+from qtpy.QtGui import QFont, QColor
 
 
 class InlineCompleterLineEdit(QLineEdit):
@@ -67,6 +72,363 @@ class MaterialListWidget(QWidget):
             self.materials_list.takeItem(self.materials_list.row(item))
 
 
+def format_currency(value):
+    try:
+        return f"${float(value):,.2f}"
+    except:
+        return str(value)
+
+
+# Looked up once: attribute access on the Qt enums is slow enough to show
+# up in the per-cell model methods
+DISPLAY_ROLE = Qt.ItemDataRole.DisplayRole
+USER_ROLE = Qt.ItemDataRole.UserRole
+HORIZONTAL = Qt.Orientation.Horizontal
+ASCENDING = Qt.SortOrder.AscendingOrder
+
+
+class DataFrameTableModel(QAbstractTableModel):
+    """
+    Read-only view of a DataFrame. Text is only built for the columns Qt
+    asks to draw, one column at a time, and kept until the frame changes.
+    The raw cell value is available under Qt.UserRole.
+
+    Sorting reorders rows through a permutation (order) computed with
+    pandas, rather than by Qt comparing cells one pair at a time.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.set_frame(None)
+
+    def set_frame(self, df, currency_cols=(), currency_rows=(), index_labels=None):
+        self.beginResetModel()
+
+        self.frame = df
+
+        self.column_text = {}
+        self.column_sort_keys = {}
+
+        # The empty model the window starts with doesn't need numpy, which
+        # is only imported once a listing is loaded
+        if df is None:
+            self.values = None
+            self.column_labels = []
+            self.row_labels = []
+            self.currency_columns = []
+            self.currency_rows = []
+            self.order = []
+        else:
+            import numpy as np
+
+            self.values = df.to_numpy(dtype=object)
+            self.column_labels = [str(col) for col in df.columns]
+            self.row_labels = index_labels if index_labels is not None else [str(idx) for idx in df.index]
+            self.currency_columns = [col in currency_cols for col in df.columns]
+            self.currency_rows = np.array([idx in currency_rows for idx in df.index], dtype=bool)
+            self.order = np.arange(self.values.shape[0])
+
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.order)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.column_labels)
+
+    def data(self, index, role=DISPLAY_ROLE):
+        if not index.isValid():
+            return None
+
+        if role == DISPLAY_ROLE:
+            column = index.column()
+            text = self.column_text.get(column) or self.text_for_column(column)
+            return text[self.order[index.row()]]
+
+        if role == USER_ROLE:
+            return self.values[self.order[index.row()], index.column()]
+
+        return None
+
+    def headerData(self, section, orientation, role=DISPLAY_ROLE):
+        if role != DISPLAY_ROLE:
+            return None
+
+        if orientation == HORIZONTAL:
+            return self.column_labels[section]
+
+        return self.row_labels[self.order[section]]
+
+    def sort(self, column, order=ASCENDING):
+        # Also called on the empty model when sorting is switched on
+        if self.frame is None or not 0 <= column < self.values.shape[1]:
+            return
+
+        import numpy as np
+
+        self.layoutAboutToBeChanged.emit()
+
+        if column not in self.column_sort_keys:
+            self.column_sort_keys[column] = self.sort_keys(column)
+
+        keys = self.column_sort_keys[column]
+        ascending = order == ASCENDING
+        new_order = keys.sort_values(ascending=ascending, kind="stable", na_position="last").index.to_numpy()
+
+        # Keep selections and the current cell on the same tickets
+        new_positions = np.empty_like(new_order)
+        new_positions[new_order] = np.arange(len(new_order))
+
+        for index in self.persistentIndexList():
+            row = new_positions[self.order[index.row()]]
+            self.changePersistentIndex(index, self.index(row, index.column()))
+
+        self.order = new_order
+
+        self.layoutChanged.emit()
+
+    def sort_keys(self, column):
+        """Numbers sort numerically, the Date column by date, the rest as text."""
+        import pandas as pd
+
+        values = pd.Series(self.values[:, column])
+
+        if self.column_labels[column] == "Date":
+            dates = pd.to_datetime(values, format="%m/%d/%Y", errors="coerce")
+            if dates.notna().any():
+                return dates
+
+        numbers = pd.to_numeric(values, errors="coerce")
+        if numbers.notna().sum() == values.notna().sum():
+            return numbers
+
+        return values.astype(str).str.lower()
+
+    def text_for_column(self, column):
+        """Display strings for a whole column, formatted on first use."""
+        if column not in self.column_text:
+            self.column_text[column] = self.format_rows(column, range(self.values.shape[0]))
+
+        return self.column_text[column]
+
+    def sample_text(self, column, count):
+        """Header plus the first count cells of a column, for sizing it."""
+        if column in self.column_text:
+            text = self.column_text[column][:count]
+        else:
+            text = self.format_rows(column, range(min(count, self.values.shape[0])))
+
+        return [self.column_labels[column], *text]
+
+    def format_rows(self, column, rows):
+        values = self.values[:, column]
+
+        if self.currency_columns[column]:
+            return [format_currency(values[row]) for row in rows]
+
+        return [format_currency(values[row]) if self.currency_rows[row] else str(values[row]) for row in rows]
+
+
+class TicketFilterProxyModel(QSortFilterProxyModel):
+    """
+    Filters a DataFrameTableModel of tickets by type, signature, date range
+    and ticket number. The accepted rows are worked out for the whole frame
+    in one pandas pass, so filterAcceptsRow is just a lookup.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.filters = {}
+        self.accepted = None
+        self.accepted_frame = None
+
+    def set_filters(self, ticket_type=None, signature=None, date_from=None, date_to=None, ticket_text=""):
+        self.filters = {
+            "ticket_type": ticket_type,
+            "signature": signature,
+            "date_from": date_from,
+            "date_to": date_to,
+            "ticket_text": ticket_text,
+        }
+        self.accepted_frame = None
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        model = self.sourceModel()
+
+        # Recompute the mask once per filter change or new frame
+        if self.accepted_frame is not model.frame:
+            self.accepted = self.filter_mask(model)
+            self.accepted_frame = model.frame
+
+        if self.accepted is None:
+            return True
+
+        return bool(self.accepted[model.order[source_row]])
+
+    def filter_mask(self, model):
+        import numpy as np
+        import pandas as pd
+
+        df = model.frame
+        if df is None or not any(self.filters.values()):
+            return None
+
+        mask = np.ones(len(df), dtype=bool)
+
+        type_column = next((col for col in df.columns if str(col).startswith("Type")), None)
+        if self.filters["ticket_type"] and type_column is not None:
+            mask &= (df[type_column].astype(str).str.strip().str.upper() == self.filters["ticket_type"]).to_numpy()
+
+        if self.filters["signature"] and "Signature" in df.columns:
+            mask &= (df["Signature"].astype(str).str.strip().str.upper() == self.filters["signature"]).to_numpy()
+
+        if (self.filters["date_from"] or self.filters["date_to"]) and "Date" in df.columns:
+            dates = pd.to_datetime(df["Date"], format="%m/%d/%Y", errors="coerce")
+            if self.filters["date_from"]:
+                mask &= (dates >= pd.Timestamp(self.filters["date_from"])).to_numpy()
+            if self.filters["date_to"]:
+                mask &= (dates <= pd.Timestamp(self.filters["date_to"])).to_numpy()
+
+        if self.filters["ticket_text"]:
+            labels = pd.Series(model.row_labels, dtype=str)
+            mask &= labels.str.contains(self.filters["ticket_text"], case=False, regex=False).to_numpy()
+
+        return mask
+
+    def sort(self, column, order=ASCENDING):
+        # Sorted by the source model, so the proxy keeps its row order
+        self.sourceModel().sort(column, order)
+
+
+def create_table_view(sortable=False):
+    table = QTableView()
+    model = DataFrameTableModel(table)
+
+    if sortable:
+        proxy = TicketFilterProxyModel(table)
+        proxy.setSourceModel(model)
+        table.setModel(proxy)
+        table.setSortingEnabled(True)
+        table.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+    else:
+        table.setModel(model)
+
+    # Uniform row heights, so scrolling never measures rows
+    table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+    table.verticalHeader().setDefaultSectionSize(table.fontMetrics().height() + 8)
+    return table
+
+
+def source_model(table):
+    model = table.model()
+    return model.sourceModel() if isinstance(model, QSortFilterProxyModel) else model
+
+
+def fit_columns(table, sample_rows=50):
+    """
+    Size columns from the header and first rows of each column. Qt's own
+    resizeColumnsToContents asks the model for every role of every cell.
+    """
+    model = source_model(table)
+    metrics = table.fontMetrics()
+    header = table.horizontalHeader()
+    padding = 2 * metrics.averageCharWidth() + 8
+
+    for column in range(model.columnCount()):
+        width = max(metrics.horizontalAdvance(text) for text in model.sample_text(column, sample_rows))
+        header.resizeSection(column, width + padding)
+
+
+class LoadCancelled(Exception):
+    pass
+
+
+class WorkbookLoadThread(QThread):
+    """
+    Parses a listing and builds its frames off the GUI thread. Nothing is
+    handed back until every stage is done, so the window can swap all the
+    results in at once. cancel() stops the load at the next stage.
+    """
+    # (stage label, percent done)
+    STAGES = {
+        "parse": ("Reading workbook", 5),
+        "labor": ("Building labor data", 40),
+        "material": ("Building material data", 60),
+        "listing": ("Building ticket listing", 80),
+    }
+
+    progress = Signal(str, int)
+    loaded = Signal(object, object)
+    failed = Signal(str)
+
+    def __init__(self, file_path, snapshot_cache, parent=None):
+        super().__init__(parent)
+        self.file_path = file_path
+        self.snapshot_cache = snapshot_cache
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+    def report(self, stage):
+        if self.cancelled:
+            raise LoadCancelled()
+
+        self.progress.emit(*self.STAGES[stage])
+
+    def run(self):
+        from data_manager.excel_manager import ExcelManager
+        from data_manager.ticket_data_service import TicketDataService
+
+        try:
+            self.report("parse")
+            manager = ExcelManager(self.file_path, snapshot_cache=self.snapshot_cache)
+            manager.load()
+
+            ticket_data_service = TicketDataService(self.file_path, excel_manager=manager, progress=self.report)
+
+            if self.cancelled:
+                raise LoadCancelled()
+
+        except LoadCancelled:
+            print(f"Cancelled loading {self.file_path}")
+            return
+
+        except Exception as e:
+            traceback.print_exc()
+            self.failed.emit(str(e))
+            return
+
+        self.loaded.emit(manager, ticket_data_service)
+
+
+class WorkbookRereadThread(QThread):
+    """Parses the open workbook again after it changed on disk."""
+    reread = Signal(object, object)
+    failed = Signal(str)
+
+    def __init__(self, manager, parent=None):
+        super().__init__(parent)
+        self.manager = manager
+        # An insert after this point may or may not be in what gets read
+        self.insert_count = manager.insert_count
+
+    def run(self):
+        try:
+            dataframe, source = self.manager.reread()
+        except Exception as e:
+            # Usually Excel still writing the file
+            self.failed.emit(f"{type(e).__name__}: {e}")
+            return
+
+        self.reread.emit(dataframe, source)
+
+
+class SubmissionSignals(QObject):
+    """Carries SubmissionQueue and ShareSync updates from their worker threads to the GUI thread."""
+    changed = Signal(object, str)
+    synced = Signal(object)
+
+
 class AddTicketDialog(QDialog):
     """Dialog for adding a new ticket"""
     
@@ -75,6 +437,8 @@ class AddTicketDialog(QDialog):
         self.excel_manager = excel_manager
         self.available_materials = list(self.excel_manager.material_map.keys())
         self.materials_to_add = []
+        self.ticket_data = None
+        self.e_ticket_folder = None
         self.init_ui()
     
     def init_ui(self):
@@ -453,29 +817,118 @@ class AddTicketDialog(QDialog):
             QMessageBox.warning(self, "Validation Errors", error_msg)
             return
         
-        # Try to save
+        # The e-ticket, PDFs and listing insert run on the main window's
+        # submission queue once the dialog closes
+        self.ticket_data = ticket_data
+        if self.use_eticket_checkbox.isChecked():
+            self.e_ticket_folder = self.selected_folder_path
+        
+        self.accept()
+
+
+class PortfolioThread(QThread):
+    """Summarizes listings in worker processes, emitting each job as it finishes."""
+    job_summarized = Signal(object)
+
+    def __init__(self, paths, parent=None):
+        super().__init__(parent)
+        self.paths = paths
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+    def run(self):
+        from data_manager.portfolio import summarize_jobs
+
+        jobs = summarize_jobs(self.paths)
         try:
-            # create and save e-ticket files
-            if self.use_eticket_checkbox.isChecked():
-                e_ticket_creator = ETicketCreator(self.selected_folder_path, ticket_data)
-                e_ticket_creator.load_ticket()
-                
-                # Save PDF
-                excel_file_path = os.path.join(
-                    self.selected_folder_path,
-                    f"{ticket_data['Job Number']} - {ticket_data['Ticket Number']}.xlsx"
-                )
-                process_ticket(excel_file_path, ticket_data["Date"], ticket_data["Signature"])
+            for summary in jobs:
+                if self.cancelled:
+                    break
+                self.job_summarized.emit(summary)
+        finally:
+            jobs.close()
 
-            # Insert row to ticket listing
-            self.excel_manager.insert_ticket(ticket_data)
-            self.excel_manager.load()
 
-            QMessageBox.information(self, "Success", "✅ Ticket created and saved successfully!")
-            self.accept()
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"❌ Failed to save ticket: {str(e)}")
-            traceback.print_exc()
+class PortfolioDialog(QDialog):
+    """NTE, totals and labor hours for every listing in a folder, plus material usage across them."""
+    def __init__(self, folder, parent=None):
+        super().__init__(parent)
+        from data_manager.portfolio import find_listings
+
+        self.setWindowTitle(f"Portfolio - {folder}")
+        self.resize(1100, 700)
+
+        self.paths = find_listings(folder)
+        self.summaries = []
+
+        layout = QVBoxLayout(self)
+
+        self.status_label = QLabel()
+        layout.addWidget(self.status_label)
+
+        self.progress = QProgressBar()
+        self.progress.setRange(0, len(self.paths))
+        layout.addWidget(self.progress)
+
+        tabs = QTabWidget()
+        self.jobs_table = create_table_view(sortable=True)
+        self.materials_table = create_table_view(sortable=True)
+        self.errors_list = QListWidget()
+        tabs.addTab(self.jobs_table, "Jobs")
+        tabs.addTab(self.materials_table, "Materials")
+        tabs.addTab(self.errors_list, "Errors")
+        layout.addWidget(tabs)
+
+        self.thread = PortfolioThread(self.paths, self)
+        self.thread.job_summarized.connect(self.add_summary)
+        self.thread.finished.connect(self.update_status)
+
+        self.update_status()
+        self.thread.start()
+
+    def add_summary(self, summary):
+        from data_manager.portfolio import job_table, material_totals
+
+        self.summaries.append(summary)
+        self.progress.setValue(len(self.summaries))
+
+        if summary["error"]:
+            self.errors_list.addItem(f"{os.path.basename(summary['path'])}: {summary['error']}")
+        else:
+            jobs = job_table(self.summaries)
+            self.populate(self.jobs_table, jobs, ["NTE", "Total Sell", "Total Cost"])
+            self.populate(self.materials_table, material_totals(self.summaries), ["Sell", "Cost"])
+
+        self.update_status()
+
+    def populate(self, table, df, currency_cols):
+        model = source_model(table)
+        model.set_frame(df, currency_cols, index_labels=[str(idx) for idx in df.index])
+
+        header = table.horizontalHeader()
+        if header.sortIndicatorSection() >= 0:
+            model.sort(header.sortIndicatorSection(), header.sortIndicatorOrder())
+
+        fit_columns(table)
+
+    def update_status(self):
+        done = len(self.summaries)
+        failed = sum(1 for summary in self.summaries if summary["error"])
+        state = "Loading" if self.thread.isRunning() or done < len(self.paths) else "Loaded"
+
+        self.status_label.setText(f"{state} {done} of {len(self.paths)} listings ({failed} failed)")
+
+    def done(self, result):
+        # A job already running can take a while to finish, so the dialog
+        # closes now and is deleted once the thread has wound down
+        self.thread.cancel()
+        super().done(result)
+
+        self.thread.finished.connect(self.deleteLater)
+        if not self.thread.isRunning():
+            self.deleteLater()
 
 
 class FRCTicketGUI(QMainWindow):
@@ -484,7 +937,40 @@ class FRCTicketGUI(QMainWindow):
         self.file_path = None
         self.manager = None
         self.ticket_data_service = None
+        self.snapshot_cache = None
+        self.load_thread = None
+        self.retired_load_threads = []
+        self.stale_tabs = set()
+        
+        # Edits saved by others reach the open workbook through the watcher
+        self.reread_thread = None
+        self.reread_retries = 0
+        self.quiet_load = False
+        self.file_watcher = QFileSystemWatcher(self)
+        self.file_watcher.fileChanged.connect(self.on_workbook_changed)
+        self.reread_timer = QTimer(self)
+        self.reread_timer.setSingleShot(True)
+        self.reread_timer.setInterval(1500)
+        self.reread_timer.timeout.connect(self.reread_workbook)
+        
+        # Submitted tickets are written in the background, stage by stage
+        self.submission_signals = SubmissionSignals(self)
+        self.submission_signals.changed.connect(self.on_submission_changed)
+        self.submission_signals.synced.connect(self.on_share_sync_changed)
+        
+        # Their files are staged locally and copied to the shares from here
+        self.share_sync = ShareSync(on_change=self.submission_signals.synced.emit)
+        self.submission_queue = SubmissionQueue(on_change=self.submission_signals.changed.emit,
+                                                share_sync=self.share_sync)
+        self.submission_items = {}
+        
+        # Merged tickets are shrunk before they're shown, see pdf_optimizer
+        self.optimize_pdfs = True
+        
         self.init_ui()
+        
+        self.share_sync.start()
+        self.on_share_sync_changed()
     
     def init_ui(self):
         self.setWindowTitle("FRC Ticket GUI")
@@ -517,8 +1003,19 @@ class FRCTicketGUI(QMainWindow):
         self.change_file_btn.setMinimumHeight(40)
         file_layout.addWidget(self.change_file_btn)
         
+        self.portfolio_btn = QPushButton("Portfolio")
+        self.portfolio_btn.clicked.connect(self.open_portfolio)
+        self.portfolio_btn.setMinimumHeight(40)
+        file_layout.addWidget(self.portfolio_btn)
+        
         main_layout.addLayout(file_layout)
         
+        # Load progress, only shown while a workbook is loading
+        self.load_progress = QProgressBar()
+        self.load_progress.setRange(0, 100)
+        self.load_progress.setVisible(False)
+        main_layout.addWidget(self.load_progress)
+        
         # Tab widget for different views
         self.tabs = QTabWidget()
         main_layout.addWidget(self.tabs)
@@ -543,6 +1040,16 @@ class FRCTicketGUI(QMainWindow):
         self.setup_material_summary_tab()
         self.setup_material_details_tab()
         
+        # Tables are only filled when their tab is shown
+        self.tab_populators = {
+            self.ticket_listing_tab: self.populate_ticket_listing,
+            self.labor_summary_tab: self.populate_labor_summary,
+            self.labor_details_tab: self.populate_labor_details,
+            self.material_summary_tab: self.populate_material_summary,
+            self.material_details_tab: self.populate_material_details,
+        }
+        self.tabs.currentChanged.connect(self.populate_current_tab)
+        
         # Initially disable tabs
         self.tabs.setEnabled(False)
     
@@ -568,28 +1075,134 @@ class FRCTicketGUI(QMainWindow):
         btn_layout.addWidget(self.add_row_btn)
         layout.addLayout(btn_layout)
         
+        layout.addLayout(self.create_ticket_filters())
+        
         # Table
-        self.ticket_listing_table = QTableWidget()
+        self.ticket_listing_table = create_table_view(sortable=True)
+        self.ticket_listing_proxy = self.ticket_listing_table.model()
         layout.addWidget(self.ticket_listing_table)
+        
+        layout.addWidget(self.create_submission_panel())
+    
+    def create_submission_panel(self):
+        """Stage by stage progress of submitted tickets, shown once there are any"""
+        self.submission_panel = QWidget()
+        panel_layout = QVBoxLayout(self.submission_panel)
+        panel_layout.setContentsMargins(0, 0, 0, 0)
+        
+        header_layout = QHBoxLayout()
+        header_layout.addWidget(QLabel("Submissions"))
+        
+        self.share_sync_label = QLabel()
+        header_layout.addWidget(self.share_sync_label)
+        header_layout.addStretch()
+        
+        retry_btn = QPushButton("Retry Failed")
+        retry_btn.clicked.connect(self.submission_queue.retry_failed)
+        retry_btn.clicked.connect(self.share_sync.retry_now)
+        header_layout.addWidget(retry_btn)
+        
+        clear_btn = QPushButton("Clear Finished")
+        clear_btn.clicked.connect(self.clear_finished_submissions)
+        header_layout.addWidget(clear_btn)
+        panel_layout.addLayout(header_layout)
+        
+        self.submission_list = QListWidget()
+        self.submission_list.setMaximumHeight(110)
+        self.submission_list.itemDoubleClicked.connect(self.retry_submission)
+        panel_layout.addWidget(self.submission_list)
+        
+        self.submission_panel.setVisible(False)
+        return self.submission_panel
+    
+    def create_ticket_filters(self):
+        filter_layout = QHBoxLayout()
+        
+        self.type_filter = QComboBox()
+        self.signature_filter = QComboBox()
+        for combo in (self.type_filter, self.signature_filter):
+            combo.addItem("All")
+            combo.currentIndexChanged.connect(self.apply_ticket_filters)
+        
+        self.date_filter_check = QCheckBox("Dates")
+        self.date_from_filter = QDateEdit(QDate.currentDate().addMonths(-1))
+        self.date_to_filter = QDateEdit(QDate.currentDate())
+        self.date_filter_check.toggled.connect(self.apply_ticket_filters)
+        for date_edit in (self.date_from_filter, self.date_to_filter):
+            date_edit.setCalendarPopup(True)
+            date_edit.setDisplayFormat("MM/dd/yyyy")
+            date_edit.dateChanged.connect(self.apply_ticket_filters)
+        
+        self.ticket_number_filter = QLineEdit()
+        self.ticket_number_filter.setPlaceholderText("Ticket #")
+        self.ticket_number_filter.textChanged.connect(self.apply_ticket_filters)
+        
+        clear_btn = QPushButton("Clear Filters")
+        clear_btn.clicked.connect(self.clear_ticket_filters)
+        
+        filter_layout.addWidget(QLabel("Type:"))
+        filter_layout.addWidget(self.type_filter)
+        filter_layout.addWidget(QLabel("Signature:"))
+        filter_layout.addWidget(self.signature_filter)
+        filter_layout.addWidget(self.date_filter_check)
+        filter_layout.addWidget(self.date_from_filter)
+        filter_layout.addWidget(QLabel("to"))
+        filter_layout.addWidget(self.date_to_filter)
+        filter_layout.addWidget(self.ticket_number_filter)
+        filter_layout.addWidget(clear_btn)
+        filter_layout.addStretch()
+        
+        return filter_layout
+    
+    def apply_ticket_filters(self, *args):
+        def combo_value(combo):
+            return None if combo.currentIndex() <= 0 else combo.currentText()
+        
+        dates_on = self.date_filter_check.isChecked()
+        
+        self.ticket_listing_proxy.set_filters(
+            ticket_type=combo_value(self.type_filter),
+            signature=combo_value(self.signature_filter),
+            date_from=self.date_from_filter.date().toString("yyyy-MM-dd") if dates_on else None,
+            date_to=self.date_to_filter.date().toString("yyyy-MM-dd") if dates_on else None,
+            ticket_text=self.ticket_number_filter.text().strip(),
+        )
+    
+    def clear_ticket_filters(self):
+        self.type_filter.setCurrentIndex(0)
+        self.signature_filter.setCurrentIndex(0)
+        self.date_filter_check.setChecked(False)
+        self.ticket_number_filter.clear()
+    
+    def update_filter_choices(self, combo, values):
+        """Offer the distinct values of a column, keeping the current pick."""
+        current = combo.currentText()
+        choices = sorted({str(value).strip().upper() for value in values if str(value).strip() not in ("", "nan")})
+        
+        combo.blockSignals(True)
+        combo.clear()
+        combo.addItems(["All", *choices])
+        combo.setCurrentIndex(max(combo.findText(current), 0))
+        combo.blockSignals(False)
     
     def setup_labor_summary_tab(self):
         layout = QVBoxLayout(self.labor_summary_tab)
-        self.labor_summary_table = QTableWidget()
+        self.labor_summary_table = create_table_view()
         layout.addWidget(self.labor_summary_table)
     
     def setup_labor_details_tab(self):
         layout = QVBoxLayout(self.labor_details_tab)
-        self.labor_details_table = QTableWidget()
+        self.labor_details_table = create_table_view(sortable=True)
         layout.addWidget(self.labor_details_table)
     
     def setup_material_summary_tab(self):
         layout = QVBoxLayout(self.material_summary_tab)
-        self.material_summary_table = QTableWidget()
+        self.material_summary_table = create_table_view()
         layout.addWidget(self.material_summary_table)
     
     def setup_material_details_tab(self):
         layout = QVBoxLayout(self.material_details_tab)
-        self.material_details_table = QTableWidget()
+        self.material_details_table = create_table_view(sortable=True)
         layout.addWidget(self.material_details_table)
     
     def select_file(self):
@@ -606,75 +1219,236 @@ class FRCTicketGUI(QMainWindow):
             self.file_label.setText(f"Selected file: {file_path}")
             self.load_data()
     
-    def load_data(self):
-        """Load data from selected Excel file"""
-        from data_manager.excel_manager import ExcelManager
-        from data_manager.ticket_data_service import TicketDataService
+    def open_portfolio(self):
+        """Summarize every ticket listing in a folder"""
+        folder = QFileDialog.getExistingDirectory(self, "Select Folder of Ticket Listings")
+        
+        if folder:
+            dialog = PortfolioDialog(folder, self)
+            dialog.exec()
+    
+    def load_data(self, quiet=False):
+        """Start loading the selected Excel file in the background"""
+        from data_manager.snapshot_cache import SnapshotCache
+
+        if self.snapshot_cache is None:
+            self.snapshot_cache = SnapshotCache()
+
+        # A newer pick replaces any load still running
+        if self.load_thread is not None:
+            self.load_thread.cancel()
+            self.retired_load_threads.append(self.load_thread)
+
+        thread = WorkbookLoadThread(self.file_path, self.snapshot_cache, self)
+        thread.progress.connect(lambda stage, percent, thread=thread: self.on_load_progress(thread, stage, percent))
+        thread.loaded.connect(lambda manager, service, thread=thread: self.on_load_finished(thread, manager, service))
+        thread.failed.connect(lambda message, thread=thread: self.on_load_failed(thread, message))
+        thread.finished.connect(lambda thread=thread: self.on_load_thread_done(thread))
+
+        self.load_thread = thread
+        self.quiet_load = quiet
+        self.add_row_btn.setEnabled(False)
+        self.load_progress.setVisible(True)
+        self.on_load_progress(thread, "Reading workbook", 0)
+
+        thread.start()
+    
+    def on_load_progress(self, thread, stage, percent):
+        if thread is not self.load_thread:
+            return
+
+        self.load_progress.setValue(percent)
+        self.load_progress.setFormat(f"{stage}... %p%")
+    
+    def on_load_finished(self, thread, manager, ticket_data_service):
+        if thread is not self.load_thread:
+            return
+
+        self.on_load_progress(thread, "Rendering tables", 90)
 
         try:
-            # Load with ExcelManager
-            self.manager = ExcelManager(self.file_path)
-            self.manager.load()
-            
-            # Create ticket data service
-            self.ticket_data_service = TicketDataService(self.file_path)
+            # Swap the new workbook in only once everything has been built
+            self.manager = manager
+            self.ticket_data_service = ticket_data_service
             
             # Enable tabs and add row button
             self.tabs.setEnabled(True)
             self.add_row_btn.setEnabled(True)
-            self.update_nte_badge()
-
-            # Populate all tables
-            self.populate_ticket_listing()
-            self.populate_labor_summary()
-            self.populate_labor_details()
-            self.populate_material_summary()
-            self.populate_material_details()
-            
-            QMessageBox.information(self, "Success", "Load Successful!")
+
+            self.refresh_views()
+            self.watch_workbook(manager.file_path)
             
         except Exception as e:
+            self.on_load_failed(thread, str(e))
             traceback.print_exc()
-            QMessageBox.critical(self, "Error", f"Error loading file: {str(e)}")
+            return
+
+        self.load_progress.setVisible(False)
+        
+        if self.quiet_load:
+            self.statusBar().showMessage("Reloaded after the workbook changed on disk", 5000)
+        else:
+            QMessageBox.information(self, "Success", "Load Successful!")
+    
+    def watch_workbook(self, path):
+        watched = self.file_watcher.files()
+        if watched:
+            self.file_watcher.removePaths(watched)
+        
+        self.file_watcher.addPath(path)
+    
+    def on_workbook_changed(self, path):
+        # Excel saves by replacing the file, which drops it from the watcher
+        if path not in self.file_watcher.files() and os.path.exists(path):
+            self.file_watcher.addPath(path)
+        
+        # Wait for the burst of writes from one save to settle
+        self.reread_retries = 0
+        self.reread_timer.start()
     
-    def populate_table(self, table, df, currency_cols=[], currency_rows=[]):
-        """Generic method to populate a QTableWidget with DataFrame data"""
-        # Clear existing data
-        table.clear()
+    def reread_workbook(self):
+        if self.manager is None:
+            return
         
-        # Set dimensions
-        table.setRowCount(len(df))
-        table.setColumnCount(len(df.columns))
+        if (self.load_thread is not None or self.reread_thread is not None
+                or self.submission_queue.listing_busy()):
+            self.reread_timer.start()
+            return
         
-        # Set headers
-        table.setHorizontalHeaderLabels([str(col) for col in df.columns])
-        table.setVerticalHeaderLabels([str(idx) for idx in df.index])
+        # The change was our own insert, already applied in memory
+        if not self.manager.changed_on_disk():
+            return
         
-        # Populate data
-        for i in range(len(df)):
-            row_idx = df.index[i]
-            row_values = df.iloc[i]
+        thread = WorkbookRereadThread(self.manager, self)
+        thread.reread.connect(
+            lambda dataframe, source, thread=thread: self.on_workbook_reread(thread, dataframe, source))
+        thread.failed.connect(self.on_workbook_reread_failed)
+        thread.finished.connect(self.on_reread_thread_done)
+        
+        self.reread_thread = thread
+        thread.start()
+    
+    def on_workbook_reread(self, thread, dataframe, source):
+        # A reload started meanwhile replaces whatever this read saw
+        if self.manager is not thread.manager or self.load_thread is not None:
+            return
+        
+        # A queued ticket is being written, or was written while this read
+        # ran and is already in the frames, so look again once it's in
+        if self.submission_queue.listing_busy() or thread.insert_count != self.manager.insert_count:
+            self.reread_timer.start()
+            return
+        
+        try:
+            changes = self.ticket_data_service.sync_with_workbook(dataframe, source)
+        except Exception:
+            traceback.print_exc()
+            changes = None
+        
+        if changes is None:
+            self.statusBar().showMessage("Workbook header or rates changed on disk, reloading")
+            self.load_data(quiet=True)
+            return
+        
+        if any(changes.values()):
+            self.refresh_views()
+            
+            self.statusBar().showMessage(
+                "Updated from disk: {added} added, {changed} changed, {removed} removed".format(**changes), 5000)
+    
+    def on_workbook_reread_failed(self, message):
+        if self.reread_retries < 3:
+            self.reread_retries += 1
+            self.reread_timer.start()
+            self.statusBar().showMessage(f"Could not re-read the workbook, trying again: {message}", 5000)
+        else:
+            self.statusBar().showMessage(f"Could not re-read the workbook: {message}")
+    
+    def on_reread_thread_done(self):
+        self.reread_thread.deleteLater()
+        self.reread_thread = None
+    
+    def on_load_failed(self, thread, message):
+        if thread is not self.load_thread:
+            return
 
-            for j, col in enumerate(df.columns):
-                value = row_values[col]
+        self.load_progress.setVisible(False)
+        self.add_row_btn.setEnabled(self.manager is not None)
+        QMessageBox.critical(self, "Error", f"Error loading file: {message}")
+    
+    def on_load_thread_done(self, thread):
+        if thread is self.load_thread:
+            self.load_thread = None
+        elif thread in self.retired_load_threads:
+            self.retired_load_threads.remove(thread)
 
-                if col in currency_cols or row_idx in currency_rows:
-                    value = self.format_currency(value)
+        thread.deleteLater()
+    
+    def closeEvent(self, event):
+        # Let background loads wind down before their thread objects go away
+        self.reread_timer.stop()
+        
+        # Stages already running finish, ones that haven't started are reported
+        self.submission_queue.shutdown()
+        for submission in self.submission_queue.submissions:
+            unfinished = [stage for stage in STAGES if submission.status[stage] not in (DONE, SKIPPED)]
+            if unfinished:
+                print(f"Ticket {submission.ticket_number} not finished: {', '.join(unfinished)}")
+        
+        # Copies still waiting are kept on disk and carried on next start
+        self.share_sync.shutdown(timeout=10)
+        
+        for thread in [self.load_thread, *self.retired_load_threads]:
+            if thread is not None:
+                thread.cancel()
+                thread.wait()
+        
+        # Closed portfolio dialogs stay around until their thread is done
+        for dialog in self.findChildren(PortfolioDialog):
+            dialog.thread.cancel()
+            dialog.thread.wait()
+        
+        if self.reread_thread is not None:
+            self.reread_thread.wait()
 
-                item = QTableWidgetItem(str(value))
-                table.setItem(i, j, item)
+        super().closeEvent(event)
+    
+    def refresh_views(self):
+        """
+        Redraw the NTE badge and the visible table from ticket_data_service.
+        The other tables are marked stale and redrawn when next shown.
+        """
+        self.update_nte_badge()
+
+        self.stale_tabs = set(self.tab_populators)
+        self.populate_current_tab()
+    
+    def populate_current_tab(self, *args):
+        tab = self.tabs.currentWidget()
+
+        if tab not in self.stale_tabs or self.ticket_data_service is None:
+            return
+
+        self.tab_populators[tab]()
+        self.stale_tabs.discard(tab)
+    
+    def populate_table(self, table, df, currency_cols=[], currency_rows=[], index_labels=None):
+        """Point a table view's model at DataFrame data"""
+        model = source_model(table)
+        model.set_frame(df, currency_cols, currency_rows, index_labels)
         
-        # Auto-resize columns to contents
-        try:
-            # PyQt6/PySide6 style
-            table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
-        except AttributeError:
-            # PyQt5/PySide2 style
-            table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        # Keep the user's sort across reloads
+        header = table.horizontalHeader()
+        if table.isSortingEnabled() and header.sortIndicatorSection() >= 0:
+            model.sort(header.sortIndicatorSection(), header.sortIndicatorOrder())
+        
+        fit_columns(table)
+    
+    def ticket_index_labels(self, df):
+        return [str(idx).replace(",", "") for idx in df.index]
     
     def populate_ticket_listing(self):
-        df = self.ticket_data_service.ticket_listing.copy()
-        df.index = df.index.astype(str).str.replace(",", "")
+        df = self.ticket_data_service.ticket_listing
         self.populate_table(
             self.ticket_listing_table, 
             df, 
@@ -685,8 +1459,15 @@ class FRCTicketGUI(QMainWindow):
                 "Material Cost", 
                 "Total Sell", 
                 "Total Cost"
-            ]
+            ],
+            index_labels=self.ticket_index_labels(df)
         )
+        
+        type_column = next((col for col in df.columns if str(col).startswith("Type")), None)
+        if type_column is not None:
+            self.update_filter_choices(self.type_filter, df[type_column])
+        if "Signature" in df.columns:
+            self.update_filter_choices(self.signature_filter, df["Signature"])
     
     def populate_labor_summary(self):
         self.populate_table(self.labor_summary_table, self.ticket_data_service.labor_summary, 
@@ -694,24 +1475,22 @@ class FRCTicketGUI(QMainWindow):
         )
     
     def populate_labor_details(self):
-        df = self.ticket_data_service.labor_ticket_summary.copy()
-        df.index = df.index.astype(str).str.replace(",", "")
+        df = self.ticket_data_service.labor_ticket_summary
         self.populate_table(self.labor_details_table, df, currency_cols=[
                 "Labor Sell", 
                 "Labor Cost", 
-            ])
+            ], index_labels=self.ticket_index_labels(df))
     
     def populate_material_summary(self):
         self.populate_table(self.material_summary_table, self.ticket_data_service.material_summary,
         currency_rows=["Sell to Date", "Cost to Date", "Sell Per Unit", "Cost Per Unit (w/Tax)"])
     
     def populate_material_details(self):
-        df = self.ticket_data_service.material_ticket_summary.copy()
-        df.index = df.index.astype(str).str.replace(",", "")
+        df = self.ticket_data_service.material_ticket_summary
         self.populate_table(self.material_details_table, df, currency_cols=[
                 "Material Sell", 
                 "Material Cost", 
-            ])
+            ], index_labels=self.ticket_index_labels(df))
 
     def update_nte_badge(self):
         if not self.manager:
@@ -752,10 +1531,7 @@ class FRCTicketGUI(QMainWindow):
         """)
 
     def format_currency(self, value):
-        try:
-            return f"${float(value):,.2f}"
-        except:
-            return str(value)
+        return format_currency(value)
     
     def add_ticket_row(self):
         """Open dialog to add a new ticket row"""        
@@ -763,11 +1539,102 @@ class FRCTicketGUI(QMainWindow):
 
         # PyQt6/PySide6 style
         if dialog.exec() == QDialog.DialogCode.Accepted:
-            self.load_data()
+            submission = self.submission_queue.submit(
+                dialog.ticket_data, self.manager, e_ticket_folder=dialog.e_ticket_folder,
+                optimize=self.optimize_pdfs)
+            
+            self.statusBar().showMessage(f"Ticket {submission.ticket_number} queued", 5000)
+    
+    def on_submission_changed(self, submission, stage):
+        item = self.submission_items.get(submission)
+        if item is None:
+            item = QListWidgetItem()
+            self.submission_items[submission] = item
+            self.submission_list.addItem(item)
+            self.submission_panel.setVisible(True)
+        
+        item.setText(submission.summary())
+        item.setToolTip("\n".join(f"{stage}: {error}" for stage, error in submission.errors.items()))
+        
+        if submission.failed_stages():
+            item.setForeground(QColor("#d32f2f"))
+        elif all(status in (DONE, SKIPPED) for status in submission.status.values()):
+            item.setForeground(QColor("#388e3c"))
+        else:
+            item.setForeground(QColor("black"))
+        
+        status = submission.status[stage]
+        
+        if status == FAILED:
+            self.statusBar().showMessage(
+                f"Ticket {submission.ticket_number}: {stage} failed, double-click it to retry", 10000)
+        
+        elif status == DONE and stage == "listing":
+            self.apply_submitted_ticket(submission)
+    
+    def apply_submitted_ticket(self, submission):
+        # A workbook opened since was read after the insert, or will be
+        # picked up by the watcher
+        if submission.excel_manager is not self.manager:
+            return
+        
+        # The insert ran on a worker thread and left the loaded dataframe
+        # alone, so the new row is mirrored here. Only this ticket's row:
+        # apply_ticket handles one ticket, and later submissions apply theirs.
+        self.manager.record_written_rows([submission.results["listing"]["Row"]])
+        
+        if self.ticket_data_service is None:
+            return
+        
+        # Apply the new row in memory instead of reloading the workbook
+        try:
+            self.ticket_data_service.apply_ticket(submission.ticket)
+            self.refresh_views()
+        except Exception:
+            traceback.print_exc()
+            self.load_data(quiet=True)
+    
+    def on_share_sync_changed(self, job=None):
+        pending = self.share_sync.pending()
+        
+        if not pending:
+            self.share_sync_label.setText("")
+            self.share_sync_label.setToolTip("")
+            self.submission_panel.setVisible(bool(self.submission_items))
+            return
+        
+        failing = [queued for queued in pending if queued["error"]]
+        
+        text = f"({len(pending)} file{'s' if len(pending) != 1 else ''} waiting for the share"
+        text += f", {len(failing)} failing)" if failing else ")"
+        
+        self.share_sync_label.setText(text)
+        self.share_sync_label.setStyleSheet("color: #d32f2f;" if failing else "")
+        self.share_sync_label.setToolTip("\n".join(
+            f"{os.path.basename(queued['destination'])}: {queued['error'] or 'waiting'}" for queued in pending))
+        self.submission_panel.setVisible(True)
+    
+    def retry_submission(self, item):
+        for submission, submission_item in self.submission_items.items():
+            if submission_item is item and submission.failed_stages():
+                self.submission_queue.retry(submission)
+    
+    def clear_finished_submissions(self):
+        self.submission_queue.clear_finished()
+        
+        for submission in list(self.submission_items):
+            if submission not in self.submission_queue.submissions:
+                item = self.submission_items.pop(submission)
+                self.submission_list.takeItem(self.submission_list.row(item))
+        
+        self.submission_panel.setVisible(bool(self.submission_items or self.share_sync.pending()))
 
 
 
 def main():
+    if startup_profile:
+        startup_profile.mark("imports done")
+    
     app = QApplication(sys.argv)
     
     # Set application style
@@ -778,8 +1645,18 @@ def main():
     
     window = FRCTicketGUI()
     window.show()
+    
+    if startup_profile:
+        startup_profile.mark("window built")
+        # Runs once the event loop has painted the window
+        QTimer.singleShot(0, lambda: (startup_profile.mark("window shown"), startup_profile.report()))
+    
     sys.exit(app.exec() if hasattr(app, 'exec') else app.exec_())
 
 
 if __name__ == "__main__":
+    # The portfolio worker processes re-enter here in the frozen build
+    import multiprocessing
+    multiprocessing.freeze_support()
+    
     main()
\ No newline at end of file
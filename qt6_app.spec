@@ -3,15 +3,39 @@
 import sys
 import os
 import PySide6
-from PyInstaller.utils.hooks import collect_submodules, collect_dynamic_libs
 
 block_cipher = None
 
 conda_plugins = os.path.join(sys.prefix, "Library", "plugins")
 
-numpy_hiddenimports = collect_submodules('numpy')
+# pandas, openpyxl, PyPDF2 and the COM backend are imported inside the
+# functions that use them, so they are listed here to be bundled. numpy comes
+# in with pandas and its own hook finds the submodules and DLLs it needs.
+lazy_imports = [
+    "pandas",
+    "openpyxl",
+    "win32com",
+    "win32com.client",
+    "pythoncom",
+    "pywintypes",
+    "PyPDF2",
+]
 
-numpy_binaries = collect_dynamic_libs('numpy')
+# qtpy tries these optionally at import; leaving them out of the bundle saves
+# their DLLs and the time spent loading them before the window appears
+unused_modules = [
+    "PySide6.QtOpenGL",
+    "PySide6.QtOpenGLWidgets",
+    "PySide6.QtDataVisualization",
+    "PySide6.QtNetwork",
+    "PySide6.QtPrintSupport",
+    "PySide6.QtQml",
+    "PySide6.QtQuick",
+    "tkinter",
+    "matplotlib",
+    "IPython",
+    "scipy",
+]
 
 a = Analysis(
     ['qt6_app.py'],
@@ -20,32 +44,20 @@ a = Analysis(
         (os.path.join(sys.base_prefix, "python313.dll"), "."),
         (os.path.join(sys.base_prefix, "vcruntime140.dll"), "."),
         (os.path.join(sys.base_prefix, "vcruntime140_1.dll"), ".")
-    ] + numpy_binaries,
+    ],
     datas=[
     ],
     hiddenimports=[
         "qtpy",
-        "numpy",
-        "numpy.core._methods",
-        "numpy.lib.format",
-        "pandas",
-        "openpyxl",
-        "win32com",
-        "win32com.client",
-        "pythoncom",
-        "pywintypes",
-        "PyPDF2",
         "PySide6",
         "PySide6.QtCore",
         "PySide6.QtGui",
-        "PySide6.QtWidgets",
-        "PySide6.QtNetwork",
-        "PySide6.QtPrintSupport"
-    ] + numpy_hiddenimports,
+        "PySide6.QtWidgets"
+    ] + lazy_imports,
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
-    excludes=[],
+    excludes=unused_modules,
     noarchive=False,
     optimize=0,
 )
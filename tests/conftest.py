@@ -0,0 +1,203 @@
+import sys
+import warnings
+from pathlib import Path
+
+import pytest
+from openpyxl import Workbook
+from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+MATERIALS = ['1/4 UNDERLAYMENT 4 X 5"', "MAPEI PLANIPREP SC 10LB BAG", "PRIMER X", "MAT 3", "MAT 4", "MAT 5"]
+
+TICKET_HEADER = ["Date", "Signature", "Ticket #", "Type\n(Regular, Extra)", "Description",
+                 "Labor Sell", "Labor Cost", "Material Sell", "Material Cost", "Total Sell", "Total Cost",
+                 "Hours", "RT", "OT", "DT", "OT DIFF", "DT DIFF"]
+
+# Frame positions (sheet column - 7) the listing template uses
+MATERIAL_LABEL_COLUMN = 30
+FIRST_TICKET_ROW = 14
+
+
+def sheet_cell(ws, row, column, value):
+    """Write at a frame (row, column), which start at sheet row 1 and column G."""
+    ws.cell(row + 1, column + 7, value)
+
+
+def write_ticket_row(ws, row, ticket_number, hours=(8, 0, 0, 0, 0), materials=None, ticket_type="REGULAR"):
+    sheet_cell(ws, row, 0, f"01/{row % 28 + 1:02d}/26")
+    sheet_cell(ws, row, 1, "YES")
+    sheet_cell(ws, row, 2, ticket_number)
+    sheet_cell(ws, row, 3, ticket_type)
+    sheet_cell(ws, row, 4, f"ticket {ticket_number}")
+
+    for offset, value in enumerate(hours):
+        sheet_cell(ws, row, 12 + offset, value)
+
+    for material, quantity in (materials or {}).items():
+        sheet_cell(ws, row, MATERIAL_LABEL_COLUMN + 1 + MATERIALS.index(material), quantity)
+
+
+def build_listing(path, tickets=5, trailing_formatted_rows=20):
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "TICKET TRACKING"
+
+    sheet_cell(ws, 1, 8, "123456")
+    sheet_cell(ws, 2, 8, "Test Job")
+    sheet_cell(ws, 3, 8, "1 Fake St")
+    sheet_cell(ws, 1, 5, 50000)
+
+    labels = ["Hours to Date", "Cost to Date", "Cost Per Unit (w/Tax)", "Sell Per Unit", "Sell to Date"]
+
+    # The template's DIFF labels carry a trailing space and no rates of
+    # their own; the service works them out from RT, OT and DT
+    for offset, label in enumerate(["Labor", "RT", "OT", "DT", "OT DIFF ", "DT DIFF "]):
+        sheet_cell(ws, 6, 11 + offset, label)
+
+    rates = {"Cost Per Unit (w/Tax)": [100.0, 130.0, 160.0], "Sell Per Unit": [153.15, 197.7, 237.72]}
+    for offset, label in enumerate(labels):
+        sheet_cell(ws, 7 + offset, 11, label)
+        for category, value in enumerate(rates.get(label, [0] * 5)):
+            sheet_cell(ws, 7 + offset, 12 + category, value)
+
+    sheet_cell(ws, 5, MATERIAL_LABEL_COLUMN, "Structure Material #")
+    sheet_cell(ws, 6, MATERIAL_LABEL_COLUMN, "Material")
+    for offset, material in enumerate(MATERIALS):
+        column = MATERIAL_LABEL_COLUMN + 1 + offset
+        sheet_cell(ws, 4, column, "EA")
+        sheet_cell(ws, 5, column, 1000 + offset)
+        sheet_cell(ws, 6, column, material)
+
+    for offset, label in enumerate(["Material Counts to Date"] + labels[1:]):
+        sheet_cell(ws, 7 + offset, MATERIAL_LABEL_COLUMN, label)
+        for material in range(len(MATERIALS)):
+            value = {"Cost Per Unit (w/Tax)": 10 + material * 1.5, "Sell Per Unit": 20 + material * 2.25}
+            sheet_cell(ws, 7 + offset, MATERIAL_LABEL_COLUMN + 1 + material, value.get(label, 0))
+
+    for column, label in enumerate(TICKET_HEADER):
+        sheet_cell(ws, 13, column, label)
+
+    for ticket in range(tickets):
+        write_ticket_row(ws, FIRST_TICKET_ROW + ticket, 1000 + ticket,
+                         hours=(ticket % 3 * 4, ticket % 2 * 2, 0, 1, 0),
+                         materials={MATERIALS[ticket % len(MATERIALS)]: ticket + 1, "PRIMER X": 2},
+                         ticket_type="EXTRA" if ticket % 3 == 2 else "REGULAR")
+
+    # Formatted but empty rows below the tickets, like the real template
+    bold = Font(bold=True)
+    for row in range(FIRST_TICKET_ROW + tickets, FIRST_TICKET_ROW + tickets + trailing_formatted_rows):
+        for column in range(20):
+            ws.cell(row + 1, column + 7).font = bold
+
+    wb.save(path)
+    return path
+
+
+def new_ticket(ticket_number, materials=(), ticket_type="REGULAR"):
+    """A ticket in the shape AddTicketDialog builds."""
+    return {
+        "Ticket Number": ticket_number,
+        "Date": "02/03/26",
+        "Signature": "YES",
+        "Type": ticket_type,
+        "Description": "added",
+        "Labor": {
+            "RT": {"hours": "6"}, "OT": {"hours": "2"}, "DT": {"hours": ""},
+            "OT DIFF": {"hours": "1.5"}, "DT DIFF": {"hours": "0"},
+        },
+        "Materials": [{"material": material, "quantity": quantity} for material, quantity in materials],
+    }
+
+
+def build_e_ticket_template(folder):
+    """An e-ticket template with every label ETicketCreator looks for."""
+    from data_manager.e_ticket_creator import TEMPLATE_NAME
+
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "E-TICKET"
+    bold = Font(bold=True, size=11)
+    thin = Side(style="thin")
+    box = Border(left=thin, right=thin, top=thin, bottom=thin)
+
+    ws["A1"] = "EXTRA WORK TICKET"
+    ws["A1"].font = Font(bold=True, size=16)
+    ws["A1"].alignment = Alignment(horizontal="center")
+    ws.merge_cells("A1:I2")
+
+    for row, label in zip(range(4, 9), ["Job #", "Job Name", "Address", "Installers", "Location"]):
+        ws[f"A{row}"] = label
+        ws[f"A{row}"].font = bold
+        ws.merge_cells(f"B{row}:E{row}")
+    for row, label in zip(range(4, 7), ["Ticket #", "Date", "Work Date"]):
+        ws[f"G{row}"] = label
+    ws["A10"] = "Description"
+    ws.merge_cells("B10:I13")
+
+    for column, label in zip("BCFI", ["Hours", "Labor", "Rate", "Amount"]):
+        ws[f"{column}16"] = label
+        ws[f"{column}16"].fill = PatternFill("solid", fgColor="DDDDDD")
+    for column in "ABCDEFGHI":
+        ws[f"{column}17"].border = box
+        ws[f"{column}17"].font = Font(size=10)
+        ws[f"{column}22"].border = box
+    ws.merge_cells("C17:D17")
+    ws.row_dimensions[17].height = 20
+
+    ws["G19"] = "Total Hours"
+    ws["A21"] = "Material Used:"
+    ws["G24"] = "Total Material"
+    ws["G26"] = "Total Ticket"
+    ws["A28"] = "Notes"
+    ws.merge_cells("A28:I29")
+    ws.row_dimensions[29].height = 40
+
+    ws["A32"] = "Work Status"
+    ws.merge_cells("A32:B32")
+    ws["A34"] = "Authorization Status"
+    ws.merge_cells("C34:I34")
+    ws["A38"] = "Field Supervisor"
+    ws["A40"] = "Project Manager"
+    for row in range(42, 46):
+        ws[f"A{row}"] = f"Terms line {row}"
+        ws.merge_cells(f"A{row}:I{row}")
+
+    path = Path(folder) / TEMPLATE_NAME
+    wb.save(path)
+    return path
+
+
+def e_ticket(ticket_number, labor_hours=("8", "2", "0", "1", "0"), materials=2):
+    """A ticket as the e-ticket stage gets it, with rates and units."""
+    categories = ("RT", "OT", "DT", "OT DIFF", "DT DIFF")
+    rates = ("153.15", "197.70", "237.72", "40.55", "80.57")
+
+    return {
+        "Job Number": "123456",
+        "Job Name": "Test Job",
+        "Job Address": "1 Fake St",
+        "Ticket Number": ticket_number,
+        "Date": "02/03/26",
+        "Signature": "YES",
+        "Type": "EXTRA",
+        "Installers": "Crew",
+        "Work Location": "3RD FLR",
+        "Description": "added",
+        "Labor": {category: {"hours": hours, "rate": rate}
+                  for category, hours, rate in zip(categories, labor_hours, rates)},
+        "Materials": [{"material": MATERIALS[index], "quantity": str(index + 1), "units": "EA",
+                       "sell price": f"{20 + index}.5"} for index in range(materials)],
+    }
+
+
+@pytest.fixture
+def listing(tmp_path):
+    return build_listing(tmp_path / "listing.xlsx")
+
+
+@pytest.fixture(autouse=True)
+def quiet_date_parsing():
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", message="Could not infer format")
+        yield
@@ -0,0 +1,81 @@
+import os
+
+import pytest
+
+from data_manager.bid_index import BidFolderIndex, MIN_RESCAN_INTERVAL
+
+
+@pytest.fixture
+def bids(tmp_path):
+    """A local stand-in for the bids share."""
+    root = tmp_path / "Bids"
+    for name in ("100 - Alpha", "100-Beta", "101-Gamma"):
+        (root / name).mkdir(parents=True)
+    (root / "102 - notes.txt").write_text("not a folder")
+    return root
+
+
+def index(bids, tmp_path, **kwargs):
+    return BidFolderIndex(bids, index_dir=tmp_path / "index", **kwargs)
+
+
+def test_lookups_prefer_the_spaced_folder_name(bids, tmp_path):
+    bid_index = index(bids, tmp_path)
+
+    assert bid_index.find("100") == bids / "100 - Alpha"
+    assert bid_index.find(101) == bids / "101-Gamma"
+    assert bid_index.scans == 1
+
+
+def test_files_are_not_bid_folders(bids, tmp_path):
+    with pytest.raises(FileNotFoundError):
+        index(bids, tmp_path).find("102")
+
+
+def test_unknown_job_rescans_at_most_once_per_interval(bids, tmp_path):
+    bid_index = index(bids, tmp_path)
+    bid_index.find("100")
+
+    (bids / "103 - New").mkdir()
+
+    with pytest.raises(FileNotFoundError):
+        bid_index.find("103")
+    assert bid_index.scans == 1
+
+    bid_index.scanned_at -= MIN_RESCAN_INTERVAL
+    assert bid_index.find("103") == bids / "103 - New"
+    assert bid_index.scans == 2
+
+
+def test_stale_index_refreshes_in_the_background(bids, tmp_path):
+    bid_index = index(bids, tmp_path, ttl=60)
+    bid_index.find("100")
+
+    (bids / "104 - Later").mkdir()
+    bid_index.scanned_at -= 60
+
+    # Answered from the old index while the rescan runs
+    assert bid_index.find("100") == bids / "100 - Alpha"
+    bid_index.wait()
+
+    assert "104" in bid_index.folders
+
+
+def test_renamed_folder_is_found_with_rescan(bids, tmp_path):
+    bid_index = index(bids, tmp_path)
+    bid_index.find("100")
+
+    os.rename(bids / "100 - Alpha", bids / "100 - Alpha Renamed")
+
+    assert bid_index.find("100", rescan=True) == bids / "100 - Alpha Renamed"
+
+
+def test_index_is_kept_between_runs(bids, tmp_path):
+    bid_index = index(bids, tmp_path)
+    bid_index.find("100")
+
+    reopened = index(bids, tmp_path)
+
+    assert reopened.folders == bid_index.folders
+    assert reopened.find("101") == bids / "101-Gamma"
+    assert reopened.scans == 0
@@ -0,0 +1,39 @@
+from data_manager import e_ticket_batch
+from data_manager.e_ticket_creator import TEMPLATE_NAME
+
+
+def ticket(ticket_number, job_number="123456"):
+    return {"Job Number": job_number, "Ticket Number": ticket_number}
+
+
+def run_batch(tmp_path, monkeypatch, tickets):
+    (tmp_path / TEMPLATE_NAME).touch()
+
+    def create_e_ticket(folder, ticket):
+        return {"ticket_number": ticket["Ticket Number"], "path": None, "seconds": 0.0, "error": None}
+
+    monkeypatch.setattr(e_ticket_batch, "create_e_ticket", create_e_ticket)
+
+    reported = []
+    results = e_ticket_batch.create_e_tickets(
+        tmp_path, tickets, max_workers=1, progress=lambda done, total, result: reported.append((done, total, result)))
+
+    return results, reported
+
+
+def test_names_differing_only_in_case_are_duplicates(tmp_path, monkeypatch):
+    results, _ = run_batch(tmp_path, monkeypatch, [ticket("A100"), ticket("a100")])
+
+    assert results[0]["error"] is None
+    assert results[1]["error"] == "Duplicate of an earlier ticket: 123456 - a100.xlsx"
+
+
+def test_tickets_turned_away_up_front_are_reported(tmp_path, monkeypatch):
+    tickets = [ticket("100"), {"Job Number": "123456"}, ticket("100"), ticket("101")]
+
+    results, reported = run_batch(tmp_path, monkeypatch, tickets)
+
+    assert [done for done, _, _ in reported] == [1, 2, 3, 4]
+    assert all(total == 4 for _, total, _ in reported)
+    assert sorted(map(id, (result for _, _, result in reported))) == sorted(map(id, results))
+    assert [bool(result["error"]) for result in results] == [False, True, True, False]
@@ -0,0 +1,112 @@
+from types import SimpleNamespace
+
+import openpyxl
+import pytest
+from openpyxl import load_workbook
+
+from conftest import build_e_ticket_template, e_ticket
+from data_manager.e_ticket_creator import FOOTER_START_ROW, LABOR_ROW, TEMPLATE_ANCHORS, ETicketCreator
+
+TICKETS = [
+    e_ticket("100", labor_hours=("8", "2", "0", "1.5", "0"), materials=3),
+    e_ticket("101", labor_hours=("0", "0", "0", "0", "0"), materials=0),
+]
+
+
+class InsertRowsCreator(ETicketCreator):
+    """
+    The e-ticket as it was built before the template cache: a fresh load
+    per ticket, insert_rows per extra line and the anchors found again.
+    """
+    def _load_template(self, path):
+        return SimpleNamespace(anchor_rows=None, clone=lambda: self._fresh_workbook(path))
+
+    def _fresh_workbook(self, path):
+        wb = load_workbook(path)
+        self._unmerge_from_row(wb.active, start_row=FOOTER_START_ROW)
+        return wb
+
+    def _layout_rows(self, ws, anchor_rows, labor_count, material_count):
+        first_material_row = self._find_material_row(ws) + 1
+
+        for offset in range(1, labor_count):
+            ws.insert_rows(LABOR_ROW + offset)
+        for offset in range(1, material_count):
+            ws.insert_rows(first_material_row + labor_count - 1 + offset)
+
+        rows = {label: self._find_material_row(ws, label, column) for label, column in TEMPLATE_ANCHORS.items()}
+        rows["First Material"] = first_material_row + labor_count - 1
+        return rows
+
+    def _merge_like_row(self, ws, src_row, dest_row, start_column, end_column):
+        ws.merge_cells(start_row=dest_row, end_row=dest_row, start_column=start_column, end_column=end_column)
+
+
+def saved_sheet(creator, path):
+    creator.build_workbook().save(path)
+    return load_workbook(path).active
+
+
+def cell_state(cell):
+    return (cell.value, cell.number_format,
+            *(repr(style) for style in (cell.font, cell.fill, cell.border, cell.alignment)))
+
+
+def assert_same_sheet(ws, expected):
+    assert (ws.max_row, ws.max_column) == (expected.max_row, expected.max_column)
+    assert sorted(map(str, ws.merged_cells.ranges)) == sorted(map(str, expected.merged_cells.ranges))
+
+    for row in range(1, expected.max_row + 1):
+        assert ws.row_dimensions[row].height == expected.row_dimensions[row].height, row
+
+        for column in range(1, expected.max_column + 1):
+            # H5 is stamped with the time the ticket was made
+            if (row, column) != (5, 8):
+                assert cell_state(ws.cell(row, column)) == cell_state(expected.cell(row, column)), (row, column)
+
+
+@pytest.mark.parametrize("ticket", TICKETS, ids=["lines", "empty"])
+def test_cached_template_matches_insert_rows(tmp_path, monkeypatch, ticket):
+    build_e_ticket_template(tmp_path)
+
+    loads = []
+    real_load_workbook = openpyxl.load_workbook
+    monkeypatch.setattr(openpyxl, "load_workbook", lambda *args, **kwargs: loads.append(args) or
+                        real_load_workbook(*args, **kwargs))
+
+    # The second ticket is filled from the cached, pickled template
+    saved_sheet(ETicketCreator(str(tmp_path), e_ticket("099")), tmp_path / "first.xlsx")
+    ws = saved_sheet(ETicketCreator(str(tmp_path), ticket), tmp_path / "cached.xlsx")
+    template_loads = len(loads)
+
+    expected = saved_sheet(InsertRowsCreator(str(tmp_path), ticket), tmp_path / "expected.xlsx")
+
+    assert template_loads == 1
+    assert_same_sheet(ws, expected)
+
+
+def test_cached_anchors_match_a_fresh_scan(tmp_path):
+    build_e_ticket_template(tmp_path)
+    creator = ETicketCreator(str(tmp_path), TICKETS[0])
+    ws = creator.build_workbook().active
+
+    anchors = {label: row for label, row in creator.rows.items() if label != "First Material"}
+    assert anchors == {label: creator._find_material_row(ws, label, column)
+                       for label, column in TEMPLATE_ANCHORS.items()}
+    assert creator.rows["First Material"] == creator._find_material_row(ws) + 1
+
+
+def test_shifted_lines_keep_their_merges(tmp_path):
+    build_e_ticket_template(tmp_path)
+    creator = ETicketCreator(str(tmp_path), TICKETS[0])
+    ws = creator.build_workbook().active
+    merged = set(map(str, ws.merged_cells.ranges))
+
+    labor_rows = range(LABOR_ROW, LABOR_ROW + 3)
+    material_rows = range(creator.rows["First Material"], creator.rows["First Material"] + 3)
+
+    assert {f"C{row}:D{row}" for row in [*labor_rows, *material_rows]} <= merged
+    # Merges above the lines stay where they were
+    assert {"A1:I2", "B10:I13"} <= merged
+    # The merged cells of an added line are styled like the first line's
+    assert ws.cell(material_rows[-1], 4).border.bottom.style == "thin"
@@ -0,0 +1,150 @@
+import re
+import zipfile
+import threading
+
+import pandas as pd
+from openpyxl import load_workbook
+
+from conftest import FIRST_TICKET_ROW, new_ticket, write_ticket_row
+from data_manager.excel_manager import ExcelManager
+from data_manager.ticket_data_service import TicketDataService
+
+
+def loaded(path):
+    manager = ExcelManager(str(path))
+    manager.load()
+    return manager
+
+
+def save_external_edit(path, row, ticket_number):
+    wb = load_workbook(path)
+    write_ticket_row(wb.active, row, ticket_number)
+    wb.save(path)
+
+
+def test_own_insert_is_not_a_change_on_disk(listing):
+    manager = loaded(listing)
+    assert not manager.changed_on_disk()
+
+    manager.insert_ticket(new_ticket("3000"))
+
+    assert manager.insert_count == 1
+    assert not manager.changed_on_disk()
+
+
+def test_external_edit_is_a_change_on_disk(listing):
+    manager = loaded(listing)
+
+    save_external_edit(listing, FIRST_TICKET_ROW + 5, 2000)
+
+    assert manager.changed_on_disk()
+
+
+def test_insert_over_an_external_edit_still_needs_a_reread(listing):
+    manager = loaded(listing)
+
+    save_external_edit(listing, FIRST_TICKET_ROW + 5, 2000)
+    manager.insert_ticket(new_ticket("3000"))
+
+    assert manager.changed_on_disk()
+
+    dataframe, source = manager.reread()
+    manager.replace_dataframe(dataframe, source)
+
+    assert not manager.changed_on_disk()
+
+
+def test_open_and_insert_parse_the_workbook_once(listing, monkeypatch):
+    monkeypatch.setattr(ExcelManager, "parse_count", 0)
+
+    # The same path the window takes: load, build the frames, file a ticket
+    manager = loaded(listing)
+    ticket_data_service = TicketDataService(str(listing), excel_manager=manager)
+    ticket = new_ticket("3000", [("PRIMER X", "1")])
+    manager.insert_ticket(ticket)
+    ticket_data_service.apply_ticket(ticket)
+
+    assert ExcelManager.parse_count == 1
+
+
+def test_unrecorded_inserts_wait_for_record_written_rows(listing):
+    manager = loaded(listing)
+    before = manager.dataframe.copy()
+
+    # As the submission queue's worker does, one ticket per insert
+    first = manager.insert_ticket(new_ticket("3000"), record=False)
+    second = manager.insert_ticket(new_ticket("3001"), record=False)
+
+    assert second["Row"] == first["Row"] + 1
+    pd.testing.assert_frame_equal(manager.dataframe, before)
+
+    manager.record_written_rows()
+
+    assert not manager.unrecorded_rows
+    reopened = loaded(listing)
+    assert list(manager.data_rows) == list(reopened.data_rows)
+    pd.testing.assert_frame_equal(manager.dataframe.iloc[manager.data_rows],
+                                  reopened.dataframe.iloc[reopened.data_rows], check_dtype=False)
+
+
+def test_insert_during_the_mirror_goes_below_the_mirrored_rows(listing, monkeypatch):
+    manager = loaded(listing)
+    first = manager.insert_ticket(new_ticket("3000"), record=False)
+
+    # A queued insert starting while the GUI thread mirrors the first row
+    second = {}
+    worker = threading.Thread(
+        target=lambda: second.update(manager.insert_ticket(new_ticket("3001"), record=False)))
+    record_ticket_row = ExcelManager._record_ticket_row
+
+    def record_with_insert(self, ticket_row, row_values):
+        worker.start()
+        worker.join(timeout=0.5)
+        record_ticket_row(self, ticket_row, row_values)
+
+    monkeypatch.setattr(ExcelManager, "_record_ticket_row", record_with_insert)
+    manager.record_written_rows([first["Row"]])
+    worker.join()
+
+    assert second["Row"] == first["Row"] + 1
+    reopened = loaded(listing)
+    assert list(reopened.dataframe.iloc[reopened.data_rows[-2:], 2]) == ["3000", "3001"]
+
+
+def pandas_and_streaming_frames(path):
+    manager = ExcelManager(str(path))
+    return manager._read_dataframe_pandas(path), manager._read_dataframe_streaming(path)
+
+
+def assert_same_frame(path):
+    expected, streamed = pandas_and_streaming_frames(path)
+    pd.testing.assert_frame_equal(streamed, expected, check_dtype=False)
+
+
+def test_streaming_read_keeps_trailing_zero_and_false_rows(listing):
+    wb = load_workbook(listing)
+    ws = wb.active
+    last_row = ws.max_row
+    ws.cell(last_row + 3, 9, 0)
+    ws.cell(last_row + 5, 12, False)
+    wb.save(listing)
+
+    assert_same_frame(listing)
+
+
+def test_streaming_read_ignores_a_wrong_dimension_tag(listing, tmp_path):
+    cut = tmp_path / "cut.xlsx"
+
+    with zipfile.ZipFile(listing) as source, zipfile.ZipFile(cut, "w", zipfile.ZIP_DEFLATED) as target:
+        for item in source.infolist():
+            data = source.read(item.filename)
+            if item.filename == "xl/worksheets/sheet1.xml":
+                data = re.sub(rb'<dimension ref="[^"]*" ?/>', b'<dimension ref="A1:H5"/>', data)
+            target.writestr(item, data)
+
+    assert b'<dimension ref="A1:H5"/>' in zipfile.ZipFile(cut).read("xl/worksheets/sheet1.xml")
+
+    expected, _ = pandas_and_streaming_frames(listing)
+    _, streamed = pandas_and_streaming_frames(cut)
+
+    assert streamed.shape == expected.shape
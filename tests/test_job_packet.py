@@ -0,0 +1,50 @@
+from PyPDF2 import PdfReader
+
+from data_manager.job_packet import build_job_packet
+from data_manager.sheet_pdf import PdfDocument
+
+
+def ticket_pdf(path, ticket_number, pages):
+    pdf = PdfDocument()
+    for page in range(pages):
+        pdf.new_page()
+        pdf.text(72, 72, f"Ticket {ticket_number} page {page + 1}", 12)
+        pdf.text(72, 96, "Signed", 10, bold=True)
+    pdf.write(path)
+    return path
+
+
+def broken_second_page(path):
+    """A two-page ticket whose second page's content can't be read."""
+    ticket_pdf(path, 102, 2)
+    data = path.read_bytes()
+    start = data.index(b"7 0 obj")
+    path.write_bytes(data[:start] + b"X" * len(b"7 0 obj") + data[start + len(b"7 0 obj"):])
+    return path
+
+
+def test_packet_of_filed_tickets(tmp_path):
+    folder = tmp_path / "TICKETS"
+    folder.mkdir()
+    ticket_pdf(folder / "123456 01-05-26 100 SIGNED.pdf", 100, 1)
+    ticket_pdf(folder / "123456 01-06-26 101 SIGNED.pdf", 101, 2)
+    broken_second_page(folder / "123456 01-07-26 102 SIGNED.pdf")
+    (folder / "123456 01-08-26 103 SIGNED.pdf").write_bytes(b"not a pdf")
+
+    summary = build_job_packet("123456", tmp_path / "packet.pdf", tickets_folder=folder)
+
+    assert summary["tickets"] == 2
+    assert summary["pages"] == 3
+    assert [name for name, _ in summary["skipped"]] == ["123456 01-07-26 102 SIGNED.pdf",
+                                                        "123456 01-08-26 103 SIGNED.pdf"]
+    # The fonts every ticket embeds are written once
+    assert summary["shared_objects"] >= 2
+
+    reader = PdfReader(tmp_path / "packet.pdf")
+
+    # Nothing of the ticket that broke part way, not even its good page
+    assert [page.extract_text().splitlines()[0] for page in reader.pages] == [
+        "Ticket 100 page 1", "Ticket 101 page 1", "Ticket 101 page 2"]
+
+    bookmarks = [(item.title, reader.get_destination_page_number(item)) for item in reader.outline]
+    assert bookmarks == [("Ticket 100 (01/05/26)", 0), ("Ticket 101 (01/06/26)", 1)]
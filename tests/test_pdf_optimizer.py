@@ -0,0 +1,127 @@
+import random
+import zlib
+
+import pytest
+from PyPDF2 import PdfReader
+
+from data_manager.pdf_optimizer import optimize_pdf
+from data_manager.sheet_pdf import PdfDocument
+
+# A 400 x 400 image on a one-inch page is a 400 dpi scan
+SIDE = 400
+
+
+def noise(size):
+    # Doesn't compress, like a scan
+    return random.Random(0).randbytes(size)
+
+
+def image_pdf(path, image_entries, image_data, extra_objects=()):
+    """One page with one image drawn over all of it, in objects numbered from 1."""
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 72 72] "
+        b"/Resources << /XObject << /Im0 4 0 R >> >> /Contents 5 0 R >>",
+        b"<< /Type /XObject /Subtype /Image %s /Length %d >>\nstream\n%s\nendstream"
+        % (image_entries, len(image_data), image_data),
+        b"<< /Length 27 >>\nstream\nq 72 0 0 72 0 0 cm /Im0 Do Q\nendstream",
+        *extra_objects,
+    ]
+
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+
+    xref = len(output)
+    output += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    output += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    output += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+
+    path.write_bytes(bytes(output))
+    return path
+
+
+def scan_pdf(path, color_space=b"/DeviceRGB", components=3):
+    return image_pdf(path, b"/Width %d /Height %d /ColorSpace %s /BitsPerComponent 8 /Filter /FlateDecode"
+                     % (SIDE, SIDE, color_space), zlib.compress(noise(SIDE * SIDE * components)))
+
+
+def output_image(path):
+    return PdfReader(path).pages[0]["/Resources"]["/XObject"]["/Im0"].get_object()
+
+
+@pytest.mark.parametrize("color_space, components", [(b"/DeviceRGB", 3), (b"/DeviceGray", 1)])
+def test_scan_over_max_dpi_is_downsampled_to_jpeg(tmp_path, color_space, components):
+    path = scan_pdf(tmp_path / "scan.pdf", color_space, components)
+    before = path.stat().st_size
+
+    report = optimize_pdf(path, max_dpi=150)
+
+    assert report["downsampled"] == 1
+    assert report["after"] == path.stat().st_size < before
+
+    image = output_image(path)
+    assert image["/Filter"] == "/DCTDecode"
+    assert (image["/Width"], image["/Height"]) == (150, 150)
+
+
+LEFT_ALONE = {
+    "soft mask": (b"/Width %d /Height %d /ColorSpace /DeviceRGB /BitsPerComponent 8 /SMask 6 0 R" % (SIDE, SIDE),
+                  noise(SIDE * SIDE * 3),
+                  [b"<< /Type /XObject /Subtype /Image /Width 1 /Height 1 /ColorSpace /DeviceGray "
+                   b"/BitsPerComponent 8 /Length 1 >>\nstream\n\xff\nendstream"]),
+    "image mask": (b"/Width %d /Height %d /ImageMask true /BitsPerComponent 1" % (SIDE, SIDE),
+                   noise(SIDE * SIDE // 8), []),
+    "1 bit": (b"/Width %d /Height %d /ColorSpace /DeviceGray /BitsPerComponent 1" % (SIDE, SIDE),
+              noise(SIDE * SIDE // 8), []),
+    "cmyk": (b"/Width %d /Height %d /ColorSpace /DeviceCMYK /BitsPerComponent 8" % (SIDE, SIDE),
+             noise(SIDE * SIDE * 4), []),
+    "indexed": (b"/Width %d /Height %d /ColorSpace [/Indexed /DeviceRGB 1 <000000FFFFFF>] /BitsPerComponent 8"
+                % (SIDE, SIDE), noise(SIDE * SIDE), []),
+}
+
+
+@pytest.mark.parametrize("kind", LEFT_ALONE)
+def test_images_it_cannot_resample_are_left_alone(tmp_path, kind):
+    entries, data, extra_objects = LEFT_ALONE[kind]
+    path = image_pdf(tmp_path / "scan.pdf", entries, data, extra_objects)
+
+    report = optimize_pdf(path, tmp_path / "out.pdf", max_dpi=150)
+
+    assert report["downsampled"] == 0
+    image = output_image(tmp_path / "out.pdf")
+    assert (image["/Width"], image["/Height"]) == (SIDE, SIDE)
+    assert image.get("/Filter") != "/DCTDecode"
+
+
+def test_uncompressed_streams_are_recompressed(tmp_path):
+    entries = b"/Width %d /Height %d /ColorSpace /DeviceGray /BitsPerComponent 8" % (SIDE, SIDE)
+    path = image_pdf(tmp_path / "flat.pdf", entries, bytes(SIDE * SIDE))
+
+    report = optimize_pdf(path, max_dpi=None)
+
+    assert report["recompressed"] >= 1
+    assert report["after"] < report["before"]
+    image = output_image(path)
+    assert image["/Filter"] == "/FlateDecode"
+    assert image.get_data() == bytes(SIDE * SIDE)
+
+
+def test_file_is_kept_when_the_rewrite_is_not_smaller(tmp_path):
+    pdf = PdfDocument()
+    pdf.new_page()
+    pdf.text(72, 72, "Ticket 100", 12)
+    path = tmp_path / "small.pdf"
+    pdf.write(path)
+    original = path.read_bytes()
+
+    report = optimize_pdf(path)
+    copy_report = optimize_pdf(path, tmp_path / "copy.pdf")
+
+    assert path.read_bytes() == original
+    assert (tmp_path / "copy.pdf").read_bytes() == original
+    assert report["after"] == report["before"] == copy_report["after"]
+    assert not list(tmp_path.glob("*.tmp"))
@@ -0,0 +1,114 @@
+import os
+
+import pytest
+
+from data_manager.share_sync import ShareSync
+
+
+@pytest.fixture
+def share(tmp_path):
+    """A local stand-in for the network share."""
+    share = tmp_path / "share"
+    share.mkdir()
+    return share
+
+
+@pytest.fixture
+def sync(tmp_path):
+    share_sync = ShareSync(tmp_path / "outbox", base_delay=0.05, max_delay=0.2)
+    yield share_sync
+    share_sync.shutdown(timeout=5)
+
+
+def staged_file(share_sync, name, content):
+    path = share_sync.staging_folder("1234 - 5") / name
+    path.write_bytes(content)
+    return path
+
+
+def test_copies_into_the_last_folder_level(sync, share):
+    (share / "1234 - Job").mkdir()
+    source = staged_file(sync, "a.pdf", b"A" * 1000)
+
+    sync.start()
+    sync.send(source, share / "1234 - Job" / "TICKETS" / "a.pdf")
+
+    assert sync.wait(5)
+    assert (share / "1234 - Job" / "TICKETS" / "a.pdf").read_bytes() == b"A" * 1000
+    assert os.listdir(share / "1234 - Job" / "TICKETS") == ["a.pdf"]
+
+
+def test_unavailable_share_is_retried_until_it_comes_back(sync, share):
+    source = staged_file(sync, "a.pdf", b"A")
+    destination = share / "1234 - Job" / "TICKETS" / "a.pdf"
+
+    sync.start()
+    sync.send(source, destination)
+
+    # The job folder is missing, as with the share not mounted
+    assert not sync.wait(0.5)
+    job = sync.pending()[0]
+    assert job["attempts"] >= 2
+    assert job["error"].startswith("FileNotFoundError")
+
+    (share / "1234 - Job").mkdir()
+    sync.retry_now()
+
+    assert sync.wait(5)
+    assert destination.read_bytes() == b"A"
+
+
+def test_newest_send_to_a_destination_wins(sync, share):
+    old = staged_file(sync, "old.txt", b"old")
+    new = staged_file(sync, "new.txt", b"new")
+
+    sync.send(old, share / "b.txt")
+    sync.send(new, share / "b.txt")
+    assert len(sync.pending()) == 1
+
+    sync.start()
+
+    assert sync.wait(5)
+    assert (share / "b.txt").read_bytes() == b"new"
+
+
+def test_queue_is_picked_up_after_a_restart(tmp_path, share):
+    first = ShareSync(tmp_path / "outbox")
+    source = staged_file(first, "a.pdf", b"A")
+    first.send(source, share / "a.pdf")
+
+    restarted = ShareSync(tmp_path / "outbox")
+    assert [job["destination"] for job in restarted.pending()] == [str(share / "a.pdf")]
+
+    restarted.start()
+    try:
+        assert restarted.wait(5)
+    finally:
+        restarted.shutdown(timeout=5)
+
+    assert (share / "a.pdf").read_bytes() == b"A"
+
+
+def test_copy_whose_staged_file_is_gone_is_dropped(sync, share, tmp_path):
+    sync.start()
+    sync.send(tmp_path / "missing.pdf", share / "missing.pdf")
+
+    assert sync.wait(5)
+    assert not (share / "missing.pdf").exists()
+
+
+def test_prune_keeps_recent_and_waiting_folders(sync, share):
+    old = sync.staging_folder("old")
+    os.utime(old, (0, 0))
+
+    waiting = staged_file(sync, "a.pdf", b"A").parent
+    os.utime(waiting, (0, 0))
+    sync.send(waiting / "a.pdf", share / "missing folder" / "x" / "a.pdf")
+
+    recent = sync.staging_folder("recent")
+
+    sync.prune()
+
+    assert not old.exists()
+    assert waiting.exists()
+    assert recent.exists()
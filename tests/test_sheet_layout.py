@@ -0,0 +1,42 @@
+from openpyxl import load_workbook
+
+from conftest import build_listing
+from data_manager import sheet_layout
+from data_manager.excel_manager import ExcelManager
+
+
+def read_frame(path):
+    return ExcelManager(str(path))._read_dataframe(path)
+
+
+def test_same_labels_at_other_rows_get_their_own_layout(tmp_path):
+    path = build_listing(tmp_path / "listing.xlsx")
+    moved = build_listing(tmp_path / "moved.xlsx")
+
+    # Same template, one row further down
+    wb = load_workbook(moved)
+    wb.active.insert_rows(1)
+    wb.save(moved)
+
+    layout = sheet_layout.load_layout(read_frame(path))
+    moved_layout = sheet_layout.load_layout(read_frame(moved))
+
+    assert moved_layout is not layout
+    assert moved_layout.header_row == layout.header_row + 1
+    assert moved_layout.labor_rate_row == layout.labor_rate_row + 1
+
+
+def test_layout_cache_is_bounded(listing, monkeypatch):
+    monkeypatch.setattr(sheet_layout, "_LAYOUT_CACHE", {})
+    monkeypatch.setattr(sheet_layout, "_LAYOUT_CACHE_SIZE", 2)
+
+    frame = read_frame(listing)
+    header_row = sheet_layout.load_layout(frame).header_row
+    frame.isetitem(20, frame.iloc[:, 20].astype(object))
+
+    for name in ("Job A", "Job B", "Job C"):
+        # An extra label in the header row makes a different template
+        frame.iloc[header_row, 20] = name
+        sheet_layout.load_layout(frame)
+
+    assert len(sheet_layout._LAYOUT_CACHE) == 2
@@ -0,0 +1,68 @@
+from openpyxl import Workbook
+from PyPDF2 import PdfReader
+
+from data_manager.sheet_pdf import FormulaEvaluator, render_worksheet
+
+
+def evaluator(cells):
+    ws = Workbook().active
+    for reference, value in cells.items():
+        ws[reference] = value
+    return FormulaEvaluator(ws)
+
+
+def test_reference_to_uncached_formula_cells():
+    formulas = evaluator({"A1": "=B1+C1", "B1": "=2*3", "C1": 4})
+
+    assert formulas.value(1, 1) == 10
+
+
+def test_sum_of_formula_cells_below():
+    formulas = evaluator({
+        "A1": "=SUM(B2:B3)+C2",
+        "B2": "=1+1",
+        "B3": "=B2*(C2-1)",
+        "C2": 5,
+    })
+
+    assert formulas.value(1, 1) == 15
+
+
+def test_circular_reference_stops():
+    formulas = evaluator({"A1": "=B1+1", "B1": "=A1+1"})
+
+    # The inner A1 reads as empty rather than recursing forever
+    assert formulas.value(1, 1) == 2
+
+
+def test_sum_arguments_are_full_expressions():
+    formulas = evaluator({
+        "A1": "=SUM(I3+1)",
+        "A2": "=SUM(B1*2,C1)",
+        "A3": "=SUM(B1:C1,-C1,(B1+1)*2)",
+        "B1": 3,
+        "C1": 4,
+        "I3": 5,
+    })
+
+    assert formulas.value(1, 1) == 6
+    assert formulas.value(2, 1) == 10
+    assert formulas.value(3, 1) == 11
+
+
+def test_sum_skips_text_in_references():
+    formulas = evaluator({"A1": "=SUM(B1,C1:C2)", "B1": "7", "C1": 2, "C2": "x"})
+
+    assert formulas.value(1, 1) == 2
+
+
+def test_rows_past_max_pages_are_left_out(tmp_path):
+    ws = Workbook().active
+    for row in range(1, 201):
+        ws.cell(row, 1, f"row {row}")
+
+    render_worksheet(ws, tmp_path / "all.pdf")
+    render_worksheet(ws, tmp_path / "first.pdf", max_pages=1)
+
+    assert len(PdfReader(tmp_path / "all.pdf").pages) > 1
+    assert len(PdfReader(tmp_path / "first.pdf").pages) == 1
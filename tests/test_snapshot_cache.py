@@ -0,0 +1,71 @@
+import os
+
+from openpyxl import load_workbook
+
+from conftest import FIRST_TICKET_ROW, write_ticket_row
+from data_manager import snapshot_cache
+from data_manager.excel_manager import ExcelManager
+from data_manager.snapshot_cache import SnapshotCache
+from data_manager.ticket_data_service import TicketDataService
+
+
+def add_ticket_row(path, row, ticket_number):
+    wb = load_workbook(path)
+    write_ticket_row(wb.active, row, ticket_number)
+    wb.save(path)
+
+
+def test_snapshot_is_reused_when_unchanged(listing, tmp_path):
+    cache = SnapshotCache(tmp_path / "snapshots")
+
+    TicketDataService(str(listing), excel_manager=ExcelManager(str(listing), snapshot_cache=cache))
+    manager = ExcelManager(str(listing), snapshot_cache=cache)
+    manager.load()
+
+    assert cache.hits == 1
+    assert manager.snapshot is not None
+
+
+def test_workbook_saved_during_read_is_not_cached_as_current(listing, tmp_path, monkeypatch):
+    cache = SnapshotCache(tmp_path / "snapshots")
+    manager = ExcelManager(str(listing), snapshot_cache=cache)
+    read = manager._read_dataframe
+
+    def read_then_save(path):
+        dataframe = read(path)
+        # Excel, or a queued insert, saving while the frames are parsed
+        add_ticket_row(listing, FIRST_TICKET_ROW + 5, 2000)
+        return dataframe
+
+    monkeypatch.setattr(manager, "_read_dataframe", read_then_save)
+    manager.load()
+    TicketDataService(str(listing), excel_manager=manager)
+
+    reopened = ExcelManager(str(listing), snapshot_cache=cache)
+    reopened.load()
+
+    assert reopened.snapshot is None
+    assert 2000 in set(reopened.dataframe.iloc[reopened.data_rows, 2])
+
+
+
+def test_each_write_goes_through_its_own_temp_file(listing, tmp_path, monkeypatch):
+    cache = SnapshotCache(tmp_path / "snapshots")
+    fingerprint = cache.fingerprint(listing)
+    frames = {"dataframe": ExcelManager(str(listing))._read_dataframe(listing)}
+
+    temp_paths = []
+    replace = os.replace
+
+    def record_replace(source, destination):
+        temp_paths.append(source)
+        replace(source, destination)
+
+    monkeypatch.setattr(snapshot_cache.os, "replace", record_replace)
+
+    cache.put(listing, frames, fingerprint)
+    cache.put(listing, frames, fingerprint)
+
+    assert len(set(temp_paths)) == 2
+    assert cache.get(listing)["dataframe"].equals(frames["dataframe"])
+    assert list((tmp_path / "snapshots").glob("*.tmp")) == []
@@ -0,0 +1,93 @@
+import time
+import shutil
+from pathlib import Path
+
+import pytest
+
+from data_manager import pdf_creator
+from data_manager.excel_manager import ExcelManager
+from data_manager.share_sync import ShareSync
+from data_manager.submission_queue import DONE, PENDING, RUNNING, Submission, SubmissionQueue
+
+from conftest import build_e_ticket_template, e_ticket, new_ticket
+from test_pdf_optimizer import scan_pdf
+
+
+def test_pdf_the_optimizer_cannot_read_is_filed_as_merged(tmp_path):
+    share_sync = ShareSync(tmp_path / "outbox")
+    queue = SubmissionQueue(share_sync=share_sync)
+
+    merged = tmp_path / "027386 01-15-26 040691 SIGNED.pdf"
+    merged.write_bytes(b"not really a pdf")
+
+    submission = Submission(new_ticket("040691"), None, e_ticket_folder=tmp_path, optimize=True)
+    submission.results["merge"] = merged
+    submission.filed_path = tmp_path / "share" / merged.name
+
+    report = queue._run_optimize(submission)
+    submission.results["optimize"] = report
+    submission.status["optimize"] = DONE
+    queue.shutdown()
+
+    assert report is None
+    assert merged.read_bytes() == b"not really a pdf"
+    assert [job["destination"] for job in share_sync.pending()] == [str(submission.filed_path)]
+    assert "optimize done (filed unoptimized)" in submission.summary()
+
+
+def wait_until_finished(submission, timeout=30):
+    # shutdown() leaves stages that haven't started pending, so wait first
+    deadline = time.monotonic() + timeout
+    while any(status in (PENDING, RUNNING) for status in submission.status.values()):
+        assert time.monotonic() < deadline, submission.status
+        time.sleep(0.02)
+
+
+@pytest.mark.parametrize("scan", ["over max dpi", "unreadable"])
+def test_optimize_stage_files_the_merged_ticket_once(listing, tmp_path, monkeypatch, scan):
+    e_ticket_folder = tmp_path / "e-tickets"
+    e_ticket_folder.mkdir()
+    build_e_ticket_template(e_ticket_folder)
+
+    if scan == "unreadable":
+        (tmp_path / "scan.pdf").write_bytes(b"not really a pdf")
+    else:
+        scan_pdf(tmp_path / "scan.pdf")
+
+    filed_path = tmp_path / "share" / "123456 02-03-26 100 SIGNED.pdf"
+
+    # The scan lookup and the bids share don't exist here
+    def merge_ticket_pdf(pdf_location, input_path, date, ticket_status, output_path=None):
+        shutil.copyfile(tmp_path / "scan.pdf", output_path)
+        return output_path
+
+    monkeypatch.setattr(pdf_creator, "merge_ticket_pdf", merge_ticket_pdf)
+    monkeypatch.setattr(pdf_creator, "filed_ticket_path", lambda *args: filed_path)
+
+    share_sync = ShareSync(tmp_path / "outbox")
+    sent = []
+    send = share_sync.send
+    monkeypatch.setattr(share_sync, "send", lambda source, destination: sent.append(destination) or
+                        send(source, destination))
+
+    manager = ExcelManager(str(listing))
+    manager.load()
+
+    queue = SubmissionQueue(share_sync=share_sync)
+    submission = queue.submit(e_ticket("100"), manager, e_ticket_folder=e_ticket_folder, optimize=True)
+    wait_until_finished(submission)
+    queue.shutdown()
+
+    assert set(submission.status.values()) == {DONE}, submission.errors
+    assert sent.count(filed_path) == 1
+
+    report = submission.results["optimize"]
+    filed = next(job for job in share_sync.pending() if job["destination"] == str(filed_path))
+
+    if scan == "unreadable":
+        assert report is None
+        assert "optimize done (filed unoptimized)" in submission.summary()
+    else:
+        assert report["downsampled"] == 1
+        assert report["after"] < report["before"]
+        assert Path(filed["source"]).stat().st_size == report["after"]
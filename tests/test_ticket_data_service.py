@@ -0,0 +1,75 @@
+from openpyxl import load_workbook
+
+from conftest import FIRST_TICKET_ROW, MATERIALS, build_listing, new_ticket, write_ticket_row
+from data_manager.excel_manager import ExcelManager
+from data_manager.ticket_data_service import TicketDataService
+
+
+def service(path):
+    return TicketDataService(str(path), excel_manager=ExcelManager(str(path)))
+
+
+def insert_and_apply(ticket_data_service, ticket):
+    ticket_data_service.excel_manager.insert_ticket(ticket)
+    ticket_data_service.apply_ticket(ticket)
+
+
+def test_applied_tickets_match_a_rebuild(listing):
+    ticket_data_service = service(listing)
+
+    insert_and_apply(ticket_data_service, new_ticket("3001", [(MATERIALS[0], "3"), ("PRIMER X", "2")]))
+    # A material no ticket used yet, and one the listing doesn't have
+    insert_and_apply(ticket_data_service, new_ticket("3002", [("MAT 5", "1.5"), ("NOT A MATERIAL", "1")], "EXTRA"))
+    insert_and_apply(ticket_data_service, new_ticket("3003"))
+
+    assert ticket_data_service.compare_with_rebuild() == []
+    assert list(ticket_data_service.ticket_listing.index[-3:].astype(str)) == ["3001", "3002", "3003"]
+
+
+def test_applying_to_an_empty_listing_matches_a_rebuild(tmp_path):
+    ticket_data_service = service(build_listing(tmp_path / "empty.xlsx", tickets=0))
+
+    insert_and_apply(ticket_data_service, new_ticket("1", [("MAT 4", "2")]))
+
+    assert ticket_data_service.compare_with_rebuild() == []
+
+
+def test_queued_tickets_on_an_empty_listing_are_applied_once(tmp_path):
+    ticket_data_service = service(build_listing(tmp_path / "empty.xlsx", tickets=0))
+    manager = ticket_data_service.excel_manager
+    tickets = [new_ticket("1", [("MAT 4", "2")]), new_ticket("2", [("MAT 5", "1")])]
+
+    # Both written by the queue before the GUI thread applies the first
+    results = [manager.insert_ticket(ticket, record=False) for ticket in tickets]
+
+    for ticket, result in zip(tickets, results):
+        manager.record_written_rows([result["Row"]])
+        ticket_data_service.apply_ticket(ticket)
+
+    assert ticket_data_service.compare_with_rebuild() == []
+    assert list(ticket_data_service.ticket_listing.index.astype(str)) == ["1", "2"]
+
+
+def test_rebuild_check_reports_a_difference(listing):
+    ticket_data_service = service(listing)
+    insert_and_apply(ticket_data_service, new_ticket("3001", [("PRIMER X", "2")]))
+
+    ticket_data_service.ticket_listing.iloc[-1, 5] = 999
+
+    mismatches = ticket_data_service.compare_with_rebuild()
+    assert len(mismatches) == 1
+    assert mismatches[0].startswith("ticket_listing")
+
+
+def test_rows_added_on_disk_are_synced(listing):
+    ticket_data_service = service(listing)
+    manager = ticket_data_service.excel_manager
+
+    wb = load_workbook(listing)
+    write_ticket_row(wb.active, FIRST_TICKET_ROW + 5, 2000, materials={"MAT 5": 4})
+    wb.save(listing)
+
+    changes = ticket_data_service.sync_with_workbook(*manager.reread())
+
+    assert changes == {"added": 1, "changed": 0, "removed": 0}
+    assert ticket_data_service.compare_with_rebuild() == []
@@ -0,0 +1,92 @@
+import os
+
+import pytest
+
+from data_manager.ticket_scan_index import TicketScanIndex, ticket_key
+
+
+def scan(folder, name):
+    (folder / name).write_bytes(b"%PDF-1.4")
+
+
+def set_mtime(folder, seconds):
+    # Explicit folder mtimes, so the test doesn't rely on the clock's resolution
+    os.utime(folder, ns=(seconds * 10**9, seconds * 10**9))
+
+
+@pytest.fixture
+def job_folder(tmp_path):
+    for name in ("TICKET 040691 SIGNED.pdf", "TICKET 12 UNSIGNED.pdf", "TICKET 12 SIGNED.pdf", "notes.pdf"):
+        scan(tmp_path, name)
+    set_mtime(tmp_path, 1000)
+    return tmp_path
+
+
+def test_folder_is_listed_again_only_when_its_mtime_changes(job_folder):
+    index = TicketScanIndex(job_folder)
+    index.scanned()
+    index.scanned()
+    assert index.scans == 1
+
+    # A file whose arrival didn't move the mtime isn't seen
+    scan(job_folder, "TICKET 13 SIGNED.pdf")
+    set_mtime(job_folder, 1000)
+    assert "13" not in index.scanned()
+    assert index.scans == 1
+
+    set_mtime(job_folder, 1001)
+    assert "13" in index.scanned()
+    assert index.scans == 2
+
+
+def test_added_and_removed_files_are_applied(job_folder):
+    index = TicketScanIndex(job_folder)
+    index.refresh()
+
+    (job_folder / "TICKET 040691 SIGNED.pdf").unlink()
+    (job_folder / "TICKET 12 SIGNED.pdf").unlink()
+    scan(job_folder, "TICKET 14 SIGNED.pdf")
+    set_mtime(job_folder, 1001)
+
+    added, removed = index.refresh()
+
+    assert added == ["TICKET 14 SIGNED.pdf"]
+    assert sorted(removed) == ["TICKET 040691 SIGNED.pdf", "TICKET 12 SIGNED.pdf"]
+    assert index.tickets == {"12": ["TICKET 12 UNSIGNED.pdf"], "14": ["TICKET 14 SIGNED.pdf"]}
+    assert index.refresh() == ([], [])
+
+
+def test_signed_scans_come_before_unsigned(job_folder):
+    index = TicketScanIndex(job_folder)
+    assert index.find("12") == job_folder / "TICKET 12 SIGNED.pdf"
+
+    # Also when the signed scan arrives after the unsigned one was indexed
+    scan(job_folder, "TICKET 15 UNSIGNED.pdf")
+    set_mtime(job_folder, 1001)
+    index.refresh()
+    scan(job_folder, "ticket 15 signed (2).PDF")
+    set_mtime(job_folder, 1002)
+
+    assert [path.name for path in index.scans_for(15)] == ["ticket 15 signed (2).PDF", "TICKET 15 UNSIGNED.pdf"]
+
+
+@pytest.mark.parametrize("ticket_number, key", [
+    (40691.0, "40691"), ("040691", "40691"), (40691, "40691"), (" 040691 ", "40691"),
+    ("000", "0"), ("A0123", "A0123"), (12.5, "12.5"),
+])
+def test_ticket_numbers_are_normalized(ticket_number, key):
+    assert ticket_key(ticket_number) == key
+
+
+def test_listing_numbers_find_zero_padded_scans(job_folder):
+    index = TicketScanIndex(job_folder)
+
+    assert index.find(40691.0) == job_folder / "TICKET 040691 SIGNED.pdf"
+    with pytest.raises(FileNotFoundError):
+        index.find("99")
+
+
+def test_missing_keeps_the_given_order(job_folder):
+    index = TicketScanIndex(job_folder)
+
+    assert index.missing(["99", 40691.0, "7", "012", 12.0]) == ["99", "7"]
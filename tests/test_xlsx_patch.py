@@ -0,0 +1,115 @@
+import shutil
+import zipfile
+
+from openpyxl import load_workbook
+from openpyxl.styles import PatternFill
+
+from conftest import FIRST_TICKET_ROW, new_ticket
+from data_manager import excel_manager
+from data_manager.excel_manager import ExcelManager
+from data_manager.xlsx_patch import UnsupportedSheetLayout, append_rows
+
+SHEET = "TICKET TRACKING"
+
+# Sheet rows: the first formatted empty row below the tickets, and one
+# past the formatted rows the template has
+FORMATTED_ROW = FIRST_TICKET_ROW + 5 + 1
+BARE_ROW = FORMATTED_ROW + 30
+
+
+def template(path):
+    """The conftest listing with merged, filled cells on its empty rows."""
+    wb = load_workbook(path)
+    ws = wb[SHEET]
+    fill = PatternFill("solid", fgColor="FFFF00")
+
+    for row in (FORMATTED_ROW, FORMATTED_ROW + 1):
+        ws.merge_cells(start_row=row, start_column=11, end_row=row, end_column=13)
+        ws.cell(row, 11).fill = fill
+        ws.cell(row, 9).number_format = "0.00"
+
+    wb.save(path)
+    return path
+
+
+def written_with_openpyxl(path, rows):
+    wb = load_workbook(path)
+    ws = wb[SHEET]
+    for row, values in rows.items():
+        for column, value in values.items():
+            ws.cell(row, column, value)
+    wb.save(path)
+
+
+def cell_state(cell):
+    # Style ids differ once openpyxl re-saves, so the styles are compared
+    return (cell.value, cell.number_format,
+            *(repr(style) for style in (cell.font, cell.fill, cell.border, cell.alignment)))
+
+
+def assert_same_sheet(path, expected_path):
+    ws = load_workbook(path)[SHEET]
+    expected = load_workbook(expected_path)[SHEET]
+
+    assert ws.max_row == expected.max_row
+    assert sorted(map(str, ws.merged_cells.ranges)) == sorted(map(str, expected.merged_cells.ranges))
+
+    for row in range(1, expected.max_row + 1):
+        for column in range(1, expected.max_column + 1):
+            assert cell_state(ws.cell(row, column)) == cell_state(expected.cell(row, column)), (row, column)
+
+
+def copies(listing, tmp_path):
+    template(listing)
+    patched, expected = tmp_path / "patched.xlsx", tmp_path / "expected.xlsx"
+    shutil.copy(listing, patched)
+    shutil.copy(listing, expected)
+    return patched, expected
+
+
+def test_appended_rows_match_an_openpyxl_save(listing, tmp_path):
+    patched, expected = copies(listing, tmp_path)
+    rows = {
+        FORMATTED_ROW: {7: "02/03/26", 9: 3000, 11: "  merged text  ", 19: 6.5},
+        FORMATTED_ROW + 1: {9: 3001.25, 10: True, 12: None},
+        BARE_ROW: {7: "a < b & c", 40: 2},
+    }
+
+    append_rows(patched, SHEET, rows)
+    written_with_openpyxl(expected, rows)
+
+    assert_same_sheet(patched, expected)
+
+
+def test_parts_other_than_the_sheet_keep_their_contents(listing, tmp_path):
+    patched, _ = copies(listing, tmp_path)
+
+    append_rows(patched, SHEET, {BARE_ROW: {7: "x"}})
+
+    with zipfile.ZipFile(listing) as before, zipfile.ZipFile(patched) as after:
+        assert before.namelist() == after.namelist()
+        for name in before.namelist():
+            if name not in ("xl/worksheets/sheet1.xml", "xl/workbook.xml"):
+                assert before.read(name) == after.read(name), name
+
+        assert b'fullCalcOnLoad="1"' in after.read("xl/workbook.xml")
+
+
+def test_openpyxl_fallback_matches_the_fast_path(listing, tmp_path, monkeypatch):
+    patched, expected = copies(listing, tmp_path)
+    tickets = [new_ticket("3000", [("PRIMER X", "2")]), new_ticket("3001")]
+
+    manager = ExcelManager(str(patched))
+    manager.load()
+    manager.insert_tickets(tickets)
+
+    def unsupported(*args):
+        raise UnsupportedSheetLayout("test")
+
+    monkeypatch.setattr(excel_manager, "append_rows", unsupported)
+
+    manager = ExcelManager(str(expected))
+    manager.load()
+    manager.insert_tickets(tickets)
+
+    assert_same_sheet(patched, expected)